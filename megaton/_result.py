@@ -9,14 +9,19 @@ preserved by re-export from ``start``.
 
 from __future__ import annotations
 
-import re
+import contextlib
+import copy
+import functools
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import TYPE_CHECKING, Callable, Optional, Self
+from typing import TYPE_CHECKING, Callable, Concatenate, Optional, ParamSpec, Self, TypeVar
 from urllib.parse import urlparse
 
+import numpy as np
 import pandas as pd
 
-from . import errors
+from . import errors, profiling
+from .transform.text import RegexMapper, _is_text_column, apply_unique, normalize_url, transform_unique
 
 if TYPE_CHECKING:  # type hints only; avoids a start <-> _result import cycle
     from .start import Megaton  # noqa: F401
@@ -40,6 +45,14 @@ KNOWN_GA4_METRICS = {
     'cv', 'ad_cost', 'cost', 'impressions', 'clicks',
 }
 
+# 行を合計しても意味を持たない比率・平均系の指標（ReportResult.cube の対象外）
+NON_ADDITIVE_METRICS = {
+    'engagementRate', 'bounceRate', 'sessionConversionRate', 'userConversionRate',
+    'averageSessionDuration', 'averagePurchaseRevenue', 'averageRevenuePerUser',
+    'eventCountPerUser', 'screenPageViewsPerSession', 'screenPageViewsPerUser',
+    'sessionsPerUser', 'ctr', 'position',
+}
+
 # GA4の既知のディメンション名（数値化され得るディメンションを保護）
 KNOWN_GA4_DIMENSIONS = {
     # 日付・時間系（数値型になり得る）
@@ -55,17 +68,254 @@ KNOWN_GA4_DIMENSIONS = {
 MappingRule = dict[str, str] | Callable[[object], object | None]
 
 
+_GSC_METRICS = frozenset({"clicks", "impressions", "ctr", "position"})
+
+
+_PANDAS_COW_DEFAULT = int(pd.__version__.split(".", 1)[0]) >= 3
+
+
+def _copy_on_write() -> bool:
+    """True when pandas copy-on-write is on (always on pandas>=3, opt-in on 2.x).
+
+    Without it, a shallow copy shares its blocks with the source, and
+    in-place edits of ``result.df`` (``.loc[...] = ...``) would leak into the
+    caller's frame or the parent result.
+    """
+    if _PANDAS_COW_DEFAULT:
+        return True
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except (AttributeError, KeyError):  # pandas<1.5: no such option
+        return False
+
+
+def _shallow_copy(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy ``df`` for a transform that only adds or replaces whole columns.
+
+    Under copy-on-write untouched columns keep sharing their buffers with
+    ``df``; otherwise a deep copy is made.
+    """
+    return df.copy(deep=not _copy_on_write())
+
+
+def _per_unique_safe(series: pd.Series) -> bool:
+    """値ごとの変換をユニーク値ごとに 1 回だけ実行しても結果が変わらない列か
+
+    文字列列と numpy の整数 / datetime 列のみ（object 列のハッシュは 1, 1.0,
+    True を同じ値とみなすため対象外）。category 列は元の実装でカテゴリ単位に
+    処理されるので対象外。
+    """
+    if len(series) < 2 or isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuM":
+        return True
+    return _is_text_column(series)
+
+
+def _is_non_additive(metric: str) -> bool:
+    """比率・平均系の指標名か（既知の名前、または *Rate / average* / *Per* の命名）"""
+    return (
+        metric in NON_ADDITIVE_METRICS
+        or metric.endswith('Rate')
+        or metric.startswith('average')
+        or 'PerUser' in metric
+        or 'PerSession' in metric
+    )
+
+
+def _can_aggregate_with_top(df: pd.DataFrame, prefer_by: str) -> bool:
+    """normalize_queries の 1-pass 集約 (``gsc.aggregate_with_top``) が使えるか"""
+    if df.empty or prefer_by not in df.columns:
+        return False
+    if 'clicks' not in df.columns and 'impressions' not in df.columns:
+        return False
+    values = df[prefer_by]
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return False
+    return not np.isinf(values.to_numpy(dtype=float, na_value=np.nan)).any()
+
+
+def _site_thresholds(site_col: pd.Series, sites: list[dict[str, object]], site_key: str, key: str) -> np.ndarray:
+    """sites の ``key`` 閾値を行ごとの float 配列に展開（未設定・未知サイトは NaN）
+
+    閾値表はサイトごとに 1 回だけ作り、site 列の factorize コードで行に展開する。
+    同じサイトが複数回あれば後勝ち。
+    """
+    table = {site.get(site_key): site.get(key) for site in sites if site.get(site_key)}
+    codes, uniques = pd.factorize(site_col)
+    per_site = np.array(
+        [np.nan if (value := table.get(name)) is None else value for name in uniques] + [np.nan],
+        dtype=float,
+    )
+    # コード -1（site 欠損）は末尾の NaN を指す
+    return per_site[codes]
+
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R", bound="_ResultBase")
+
+
+def _profiled(method: Callable[Concatenate[_R, _P], _R]) -> Callable[Concatenate[_R, _P], _R]:
+    """Record each call of a chain method as one step while profiling is on (``megaton.profiling``).
+
+    Chain methods called from inside another one count towards the outer step.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: _R, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        options = profiling.settings(self._profiling)
+        if options is None:
+            return method(self, *args, **kwargs)
+        memory, log = options
+        with profiling.measure(name, len(self._df), memory=memory, log=log) as step:
+            result = copy.copy(method(self, *args, **kwargs))
+            # a lazy SearchResult has not run yet: its rows are known at collect()
+            step["rows_out"] = len(result._df) if getattr(result, "_plan", None) is None else None
+        result._trace = self._trace + (step,)
+        return result
+
+    return wrapper
+
+
+@dataclass(frozen=True)
+class _Step:
+    """One chain operation, run immediately (eager) or recorded (lazy).
+
+    ``kind="map"``: ``func(Series) -> Series`` is applied elementwise to
+    ``column`` (skipped when the column is missing, unless ``required``), then
+    the frame is GSC-aggregated by ``dims`` when ``group`` is set. A map step
+    without ``column`` is a pure aggregation.
+
+    ``kind="frame"``: ``func(df) -> df`` with arbitrary semantics. Metric
+    filters set ``reads`` (the columns they depend on) so a lazy plan can run
+    them before column transforms that do not touch those columns.
+    """
+
+    kind: str
+    func: Callable | None = None
+    column: str | None = None
+    required: bool = False
+    group: bool = False
+    dims: tuple[str, ...] = ()
+    reads: tuple[str, ...] | None = None
+    mutates: bool = True
+
+
+@dataclass(frozen=True)
+class _Cube:
+    """Per-group partial aggregates of a ReportResult (``ReportResult.cube``).
+
+    ``keys`` holds one row per distinct combination of ``dims`` (missing
+    values kept); ``stats[method]`` the per-metric sum / count / min / max of
+    each row, aligned with ``keys``. Coarser groupings are exact reductions of
+    these: sums and counts add up, minima and maxima of minima and maxima.
+    """
+
+    dims: tuple[str, ...]
+    metrics: tuple[str, ...]
+    keys: pd.DataFrame
+    stats: dict[str, pd.DataFrame]
+
+    def covers(self, by: list[str], metrics: list[str], method: str) -> bool:
+        return method in self.stats and set(by) <= set(self.dims) and set(metrics) <= set(self.metrics)
+
+    def group(self, by: list[str], metrics: list[str], method: str, *, dropna: bool,
+              min_count: int | None) -> pd.DataFrame:
+        reduce = 'sum' if method == 'count' else method
+        frame = pd.concat([self.keys[by], self.stats[method][metrics]], axis=1)
+        grouped = frame.groupby(by, as_index=False, dropna=dropna, observed=True).agg(
+            {col: reduce for col in metrics}
+        )
+        if min_count is not None and method == 'sum':
+            counts = pd.concat([self.keys[by], self.stats['count'][metrics]], axis=1)
+            counts = counts.groupby(by, as_index=False, dropna=dropna, observed=True)[metrics].sum()
+            for col in metrics:
+                grouped[col] = grouped[col].where(counts[col] >= min_count)
+        return grouped
+
+
 class _ResultBase:
     """Shared chainable transforms for SearchResult/ReportResult.
 
     Subclasses implement ``_with_df(df, dimensions)`` to clone themselves
     with a new DataFrame; the shared methods below stay implementation-free
-    of the concrete result type.
+    of the concrete result type. Methods describe their work as ``_Step``
+    objects and hand them to ``_run``.
     """
 
+    # Aggregation engine ("pandas" / "polars"); carried over by _with_df.
+    _engine: str = "pandas"
+    # Process pool for per-value transforms ((workers, min_values), or None
+    # for in-process); carried over by _with_df.
+    _workers: tuple[int, int] | None = None
+    # Profiling: (memory, log) from mg.set.profile, or None; the steps recorded
+    # so far along the chain. Both carried over by _with_df.
+    _profiling: tuple[bool, bool] | None = None
+    _trace: tuple[dict, ...] = ()
+
+    def _parallel(self) -> contextlib.AbstractContextManager:
+        from megaton.transform import parallel
+
+        return contextlib.nullcontext() if self._workers is None else parallel.workers(*self._workers)
+
     def _with_df(self, df: pd.DataFrame, dimensions: list[str]) -> Self:
         raise NotImplementedError
 
+    def _aggregate_gsc(self, df: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def _run(self, steps: list[_Step], dimensions: list[str] | None = None) -> Self:
+        """Execute ``steps`` on a (shallow) copy of the current frame."""
+        dims = self.dimensions if dimensions is None else dimensions
+        df = _shallow_copy(self._df) if any(step.mutates for step in steps) else self._df
+        with self._parallel():
+            df = self._execute(df, steps)
+        return self._with_df(df, dims)
+
+    def _execute(self, df: pd.DataFrame, steps: list[_Step], *, fuse: bool = False) -> pd.DataFrame:
+        """Run steps on ``df`` (owned by the caller; steps only add or replace columns).
+
+        With ``fuse``, consecutive non-grouping map steps on the same column
+        are run together once per unique value (``transform_unique``) when
+        the column holds strings; other columns run the steps one by one.
+        """
+        i = 0
+        while i < len(steps):
+            step = steps[i]
+            if step.kind == "frame":
+                df = step.func(df)
+                i += 1
+                continue
+
+            run = 1
+            if fuse and step.column is not None:
+                while (
+                    i + run < len(steps)
+                    and not steps[i + run - 1].group
+                    and steps[i + run].kind == "map"
+                    and steps[i + run].column == step.column
+                ):
+                    run += 1
+            chunk = steps[i:i + run]
+            column = step.column
+            if column is not None:
+                if column not in df.columns:
+                    if any(s.required for s in chunk):
+                        raise ValueError(f"Column '{column}' not found in DataFrame")
+                elif run > 1 and _is_text_column(df[column]):
+                    df[column] = transform_unique(df[column], [s.func for s in chunk])
+                else:
+                    # 文字列以外の object 列は 1 / 1.0 / True が同じユニーク値になるため順に実行
+                    for s in chunk:
+                        df[column] = s.func(df[column])
+
+            last = chunk[-1]
+            if last.group:
+                df = self._aggregate_gsc(df, list(last.dims))
+            i += run
+        return df
+
     def _normalize_value(self, value: object, *, lower: bool, strip: bool) -> object:
         if pd.isna(value):
             return value
@@ -78,55 +328,198 @@ class _ResultBase:
             text = text.lower()
         return text
 
-    def _map_value(self, value: object, by: MappingRule, *, default: str | None = None) -> object:
+    @staticmethod
+    def _compile_rule(by: MappingRule) -> MappingRule | RegexMapper:
+        """dict ルールは RegexMapper に一度だけコンパイルする（callable はそのまま）"""
+        if isinstance(by, dict):
+            return RegexMapper(by)
+        return by
+
+    def _map_value(self, value: object, by: MappingRule | RegexMapper, *, default: str | None = None) -> object:
         if pd.isna(value):
             return default if default is not None else value
         if callable(by):
             mapped = by(value)
             return default if mapped is None else mapped
         if isinstance(by, dict):
+            by = RegexMapper(by)
+        if isinstance(by, RegexMapper):
             if isinstance(value, str):
-                for pattern, mapped in by.items():
-                    try:
-                        if re.search(pattern, value):
-                            return mapped
-                    except re.error:
-                        continue
+                index = by.search(value)
+                if index >= 0:
+                    return by.values[index]
             return default if default is not None else value
         raise TypeError("by must be a dict or callable.")
 
-    def normalize(self, dimension: str, by: MappingRule, *, lower: bool = True, strip: bool = True) -> Self:
-        """
-        既存ディメンションの値を正規化（上書き、集約なし）
-        """
-        df = self._df.copy()
-        if dimension not in df.columns:
-            raise ValueError(f"Column '{dimension}' not found in DataFrame")
+    def _normalize_step(self, dimension: str, by: MappingRule, *, lower: bool, strip: bool, group: bool = False) -> _Step:
+        rule = self._compile_rule(by)
 
         def _apply(value):
             normalized = self._normalize_value(value, lower=lower, strip=strip)
-            return self._map_value(normalized, by, default=None)
+            return self._map_value(normalized, rule, default=None)
+
+        return _Step(
+            "map",
+            lambda series: apply_unique(series, _apply),
+            column=dimension,
+            required=True,
+            group=group,
+            dims=tuple(self.dimensions),
+        )
 
-        df[dimension] = df[dimension].apply(_apply)
-        return self._with_df(df, self.dimensions)
+    @_profiled
+    def normalize(self, dimension: str, by: MappingRule, *, lower: bool = True, strip: bool = True) -> Self:
+        """
+        既存ディメンションの値を正規化（上書き、集約なし）
+        """
+        return self._run([self._normalize_step(dimension, by, lower=lower, strip=strip)])
 
+    @_profiled
     def categorize(self, dimension: str, by: MappingRule, *, into: str | None = None, default: str = "(other)") -> Self:
         """
         既存ディメンションからカテゴリ列を追加（集約なし）
         """
-        df = self._df.copy()
-        if dimension not in df.columns:
-            raise ValueError(f"Column '{dimension}' not found in DataFrame")
-
         if into is None:
             into = f"{dimension}_category"
 
-        df[into] = df[dimension].apply(lambda value: self._map_value(value, by, default=default))
+        rule = self._compile_rule(by)
+
+        def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+            if dimension not in df.columns:
+                raise ValueError(f"Column '{dimension}' not found in DataFrame")
+            df[into] = apply_unique(df[dimension], lambda value: self._map_value(value, rule, default=default))
+            return df
 
         new_dimensions = list(self.dimensions)
         if into not in new_dimensions:
             new_dimensions.append(into)
-        return self._with_df(df, new_dimensions)
+        return self._run([_Step("frame", _categorize)], new_dimensions)
+
+    @_profiled
+    def compact(self, *, max_unique_ratio: float = 0.5) -> Self:
+        """
+        メモリ効率の良い dtype に変換（値は変わらない）
+
+        文字列ディメンションを category に、int64 の指標を int32 に変換します
+        （合計が int32 に収まる列のみ。詳細は ``transform.table.compact_frame``）。
+        category のディメンションは以降の集約（observed=True）や
+        normalize / categorize / clean_url などでも category のまま扱われます。
+
+        Args:
+            max_unique_ratio: ユニーク値の割合がこれ以下の列のみ category にする
+                （ほぼ一意な列は category にしても小さくならない）
+
+        Returns:
+            同じ型の Result
+        """
+        from megaton.transform.table import compact_frame
+
+        dims = list(self.dimensions)
+        step = _Step("frame", lambda df: compact_frame(df, dims, max_unique_ratio), mutates=False)
+        return self._run([step])
+
+    @_profiled
+    def convert_dtypes(self, dtype_backend: str = "pyarrow") -> Self:
+        """
+        DataFrame の dtype バックエンドを変換（値は変わらない）
+
+        ``"pyarrow"`` では文字列が ``string[pyarrow]``、指標が Arrow の数値型になり、
+        Parquet / Feather への書き出しでコピーが発生しません。
+        ``"numpy_nullable"`` は pandas の nullable 型（``string`` / ``Int64`` など）、
+        ``"numpy"`` は何もしません。category の列はそのまま残ります。
+
+        Args:
+            dtype_backend: ``"pyarrow"`` / ``"numpy_nullable"`` / ``"numpy"``
+
+        Returns:
+            同じ型の Result
+
+        Raises:
+            ValueError: 不明な dtype_backend
+            ImportError: pyarrow（または pandas>=2）が無い場合（チェーンの実行前に発生）
+        """
+        from megaton.transform.table import check_dtype_backend, convert_backend
+
+        check_dtype_backend(dtype_backend)
+        step = _Step("frame", lambda df: convert_backend(df, dtype_backend), mutates=False)
+        return self._run([step])
+
+    def with_engine(self, engine: str) -> Self:
+        """
+        以降のチェーンの集約エンジンを切り替え（値は変わらない）
+
+        ``"polars"`` では集約（SearchResult の group=True / aggregate / classify /
+        normalize_queries、ReportResult の group / classify）を Polars の
+        マルチスレッドな lazy クエリで実行し、結果は pandas の DataFrame で返します。
+        グループの並び順・dtype の扱いは pandas と同じです（position の重み付き平均は
+        合計順の違いで 6 桁丸めの範囲の差が出ることがあります）。
+        文字列変換（decode / normalize など）はユニーク値ごとの pandas 実装のままです。
+        ReportResult.group の sum / mean / count / min / max 以外は pandas で実行します。
+
+        Args:
+            engine: ``"polars"`` または ``"pandas"``（既定）
+
+        Returns:
+            同じ型の Result
+
+        Raises:
+            ValueError: 不明な engine
+            ImportError: polars / pyarrow が無い場合
+        """
+        from megaton.transform.polars_engine import check_engine
+
+        check_engine(engine)
+        result = copy.copy(self)
+        result._engine = engine
+        return result
+
+    def with_workers(self, workers: int, *, min_values: int | None = None) -> Self:
+        """
+        以降のチェーンの値ごとの変換を複数プロセスで実行（値は変わらない）
+
+        ユニーク値ごとの変換（normalize / categorize / classify / clean_url /
+        decode / remove_params / month_key / replace など）で、ユニーク値が
+        ``min_values`` 以上ある場合に値を ``workers`` 個に分割し、fork した
+        プロセスで並列に変換します。DataFrame は pickle せず（子プロセスは fork 時の
+        メモリを参照）、変換後の値だけを受け取って元の順序で戻します。
+        ``fork`` が使えない環境（Windows / macOS の既定）や小さな入力ではそのまま
+        1 プロセスで実行します。
+
+        Args:
+            workers: プロセス数（1 で無効）
+            min_values: プールを使う最小のユニーク値数
+                （default: ``megaton.transform.parallel.MIN_VALUES``）
+
+        Returns:
+            同じ型の Result
+
+        Raises:
+            ValueError: workers / min_values が正の整数でない場合
+        """
+        from megaton.transform import parallel
+
+        min_values = parallel.MIN_VALUES if min_values is None else min_values
+        parallel.check_workers(workers, min_values)
+        result = copy.copy(self)
+        result._workers = None if workers == 1 else (workers, min_values)
+        return result
+
+    def profile(self) -> pd.DataFrame:
+        """
+        プロファイルで記録したチェーンの各ステップを DataFrame で返す
+
+        ``mg.set.profile(True)`` の間に返された結果、または
+        ``with megaton.profiling.enabled():`` の中で呼んだチェーンのメソッドを
+        1 呼び出し 1 行で記録します（この結果に至るまでのステップのみ）。
+        lazy モードのメソッドは記録のみ（``rows_out`` は None）で、実行時間は
+        ``collect`` の行に入ります。
+
+        Returns:
+            pd.DataFrame: ``step``（メソッド名）/ ``seconds``（実行時間）/
+            ``rows_in`` / ``rows_out``（行数）/ ``peak_bytes``（実行中に確保した
+            メモリのピーク。``memory=False`` では None）/ ``aggregated``（集約したか）
+        """
+        return pd.DataFrame(list(self._trace), columns=profiling.COLUMNS)
 
 
 class SearchResult(_ResultBase):
@@ -142,49 +535,147 @@ class SearchResult(_ResultBase):
         self._df = df
         self.parent = parent
         self.dimensions = dimensions
+        # lazy モードでは実行待ちの _Step を保持（None なら eager）
+        self._plan: list[_Step] | None = None
+        self._collected: SearchResult | None = None
 
     @property
     def df(self) -> pd.DataFrame:
-        """DataFrame として直接アクセス（後方互換性）"""
+        """DataFrame として直接アクセス（後方互換性）。lazy モードでは collect() する"""
+        if self._plan is not None:
+            return self.collect().df
         return self._df
 
+    def lazy(self) -> Self:
+        """
+        以降のチェーンを記録だけして、collect() でまとめて実行する lazy モードに切り替え
+
+        collect() では DataFrame のコピーは 1 回だけ行い、次の最適化をかけます。
+
+        - 指標フィルタ（filter_*）を、その列に触れない集約なしの列変換より前に実行
+        - 同じ dimensions での連続した group=True の集約を、最後の 1 回にまとめる
+          （間に挟まるのが dimensions 列への変換だけの場合）
+        - 同じ列への連続した変換を、ユニーク値ごとに 1 回だけ実行
+
+        結果は eager と同じです（position の重み付き平均は中間の丸めを挟まない
+        ため、6 桁丸めの範囲で差が出ることがあります）。列の存在チェックなどの
+        例外は collect() 時に送出されます。``.df`` へのアクセスも collect() します。
+
+        Returns:
+            SearchResult（lazy）
+
+        Example:
+            result = (mg.search.run(dimensions=['query', 'page'])
+                .lazy()
+                .decode()
+                .clean_url()
+                .classify('page', by=page_map)
+                .filter_impressions(min=10)
+                .collect())
+        """
+        if self._plan is not None:
+            return self
+        lazy = self._with_df(self._df, self.dimensions)
+        lazy._plan = []
+        return lazy
+
+    @_profiled
+    def collect(self) -> Self:
+        """
+        lazy モードで記録したチェーンを実行して eager な SearchResult を返す
+
+        eager な SearchResult に対してはそのまま自身を返します。
+        """
+        if self._plan is None:
+            return self
+        if self._collected is None:
+            with self._parallel():
+                df = self._execute(_shallow_copy(self._df), self._optimize(self._plan), fuse=True)
+            self._collected = self._with_df(df, self.dimensions)
+        return self._collected
+
+    def with_engine(self, engine: str) -> Self:
+        result = super().with_engine(engine)
+        result._collected = None  # a lazy plan is collected again with the new engine
+        return result
+
+    @staticmethod
+    def _optimize(plan: list[_Step]) -> list[_Step]:
+        """Reorder / drop steps of a lazy plan without changing the result."""
+        steps = list(plan)
+
+        # 1) Metric filters commute with column maps that neither aggregate nor
+        #    touch the columns the filter reads; run them first so the maps see
+        #    fewer rows.
+        for i in range(len(steps)):
+            j = i
+            while (
+                j > 0
+                and steps[j].reads is not None
+                and steps[j - 1].kind == "map"
+                and not steps[j - 1].group
+                and steps[j - 1].column is not None
+                and steps[j - 1].column not in steps[j].reads
+            ):
+                steps[j - 1], steps[j] = steps[j], steps[j - 1]
+                j -= 1
+
+        # 2) An aggregation is redundant when a later aggregation by the same
+        #    dims follows and only maps on dimension columns lie in between:
+        #    the maps are per-value, so grouping once at the end yields the
+        #    same groups and sums.
+        for i, step in enumerate(steps):
+            if not step.group:
+                continue
+            for later in steps[i + 1:]:
+                if later.kind != "map" or later.dims != step.dims:
+                    break
+                column = later.column
+                if column is not None and (
+                    column in _GSC_METRICS or (later.required and column not in step.dims)
+                ):
+                    break
+                if later.group:
+                    steps[i] = replace(step, group=False)
+                    break
+        return steps
+
+    def _run(self, steps: list[_Step], dimensions: list[str] | None = None) -> Self:
+        if self._plan is None:
+            return super()._run(steps, dimensions)
+        lazy = self._with_df(self._df, self.dimensions if dimensions is None else dimensions)
+        lazy._plan = self._plan + steps
+        return lazy
+
+    def _map(self, column: str | None, func: Callable | None, *, required: bool = False, group: bool = False) -> _Step:
+        return _Step("map", func, column=column, required=required, group=group, dims=tuple(self.dimensions))
+
+    def _map_columns(self, columns: list[str], func: Callable, group: bool) -> Self:
+        """Apply ``func`` to each present column, then aggregate once if ``group``."""
+        steps = [self._map(col, func) for col in columns]
+        if group:
+            if steps:
+                steps[-1] = replace(steps[-1], group=True)
+            else:
+                steps.append(self._map(None, None, group=True))
+        return self._run(steps)
+
     def _aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
         """dimensions に基づいて集計 (位置は重み付き平均、他は合計)"""
         return self._aggregate_gsc(df, self.dimensions)
 
     def _aggregate_gsc(self, df: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
         """GSC データを集計 (位置は重み付き平均、CTR は再計算、他は合計)"""
-        if df.empty:
-            return df
-        
-        # 位置の重み付き処理
-        if 'position' in df.columns and 'impressions' in df.columns:
-            df = df.copy()
-            df['weighted_position'] = df['position'] * df['impressions']
-        
-        # 集計対象の指標列を特定（CTR は除外して後で再計算）
-        metric_cols = [col for col in ['clicks', 'impressions'] if col in df.columns]
-        if 'weighted_position' in df.columns:
-            metric_cols.append('weighted_position')
-        
-        if not metric_cols:
-            # 指標列がない場合はそのまま返す
-            return df
-        
-        # 集計
-        grouped = df.groupby(dims, as_index=False)[metric_cols].sum()
-        
-        # 位置の計算
-        if 'weighted_position' in grouped.columns:
-            grouped['position'] = (grouped['weighted_position'] / grouped['impressions']).round(6)
-            grouped = grouped.drop(columns=['weighted_position'])
-        
-        # CTR の再計算（元データに ctr 列があった場合のみ）
-        if 'ctr' in df.columns and 'clicks' in grouped.columns and 'impressions' in grouped.columns:
-            grouped['ctr'] = (grouped['clicks'] / grouped['impressions'].replace(0, float('nan'))).fillna(0)
-        
-        return grouped
+        profiling.note_aggregation()
+        if self._engine == "polars":
+            from megaton.transform import polars_engine
+
+            return polars_engine.aggregate(df, dims)
+        from megaton.transform import gsc
+
+        return gsc.aggregate(df, dims)
     
+    @_profiled
     def decode(self, group: bool = True) -> Self:
         """
         URL デコード（%xx → 文字）
@@ -195,21 +686,14 @@ class SearchResult(_ResultBase):
         Returns:
             SearchResult
         """
-        from urllib.parse import unquote
-        
-        df = self._df.copy()
-        
         # query, page 列が存在する場合にデコード
-        if 'query' in df.columns:
-            df['query'] = df['query'].apply(lambda x: unquote(str(x)) if pd.notna(x) else x)
-        if 'page' in df.columns:
-            df['page'] = df['page'].apply(lambda x: unquote(str(x)) if pd.notna(x) else x)
-        
-        if group:
-            df = self._aggregate(df)
-        
-        return SearchResult(df, self.parent, self.dimensions)
+        return self._map_columns(
+            ['query', 'page'],
+            lambda series: normalize_url(series, decode=True, coerce=True),
+            group,
+        )
     
+    @_profiled
     def remove_params(self, keep: list[str] | None = None, group: bool = True) -> Self:
         """
         クエリパラメータを削除
@@ -221,32 +705,13 @@ class SearchResult(_ResultBase):
         Returns:
             SearchResult
         """
-        from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-        
-        df = self._df.copy()
-        
-        if 'page' in df.columns:
-            def clean_params(url):
-                if pd.isna(url):
-                    return url
-                parsed = urlparse(str(url))
-                if keep:
-                    # keep リストのパラメータのみ保持
-                    params = parse_qs(parsed.query)
-                    kept_params = {k: v for k, v in params.items() if k in keep}
-                    new_query = urlencode(kept_params, doseq=True)
-                    return urlunparse(parsed._replace(query=new_query))
-                else:
-                    # 全パラメータを削除
-                    return urlunparse(parsed._replace(query=''))
-            
-            df['page'] = df['page'].apply(clean_params)
-        
-        if group:
-            df = self._aggregate(df)
-        
-        return SearchResult(df, self.parent, self.dimensions)
+        return self._map_columns(
+            ['page'],
+            lambda series: normalize_url(series, drop_query=True, keep=keep, coerce=True, params=True),
+            group,
+        )
     
+    @_profiled
     def remove_fragment(self, group: bool = True) -> Self:
         """
         # 以降のフラグメントを削除
@@ -257,24 +722,13 @@ class SearchResult(_ResultBase):
         Returns:
             SearchResult
         """
-        from urllib.parse import urlparse, urlunparse
-        
-        df = self._df.copy()
-        
-        if 'page' in df.columns:
-            def clean_fragment(url):
-                if pd.isna(url):
-                    return url
-                parsed = urlparse(str(url))
-                return urlunparse(parsed._replace(fragment=''))
-            
-            df['page'] = df['page'].apply(clean_fragment)
-        
-        if group:
-            df = self._aggregate(df)
-        
-        return SearchResult(df, self.parent, self.dimensions)
+        return self._map_columns(
+            ['page'],
+            lambda series: normalize_url(series, drop_hash=True, coerce=True, params=True),
+            group,
+        )
 
+    @_profiled
     def clean_url(
         self,
         dimension: str = 'page',
@@ -301,24 +755,18 @@ class SearchResult(_ResultBase):
         """
         from megaton.transform.text import clean_url
 
-        df = self._df.copy()
-
-        if dimension not in df.columns:
-            raise ValueError(f"Column '{dimension}' not found in DataFrame")
-
-        df[dimension] = clean_url(
-            df[dimension],
-            unquote=unquote,
-            drop_query=drop_query,
-            drop_hash=drop_hash,
-            lower=lower,
-        )
-
-        if group:
-            df = self._aggregate(df)
+        def _clean(series: pd.Series) -> pd.Series:
+            return clean_url(
+                series,
+                unquote=unquote,
+                drop_query=drop_query,
+                drop_hash=drop_hash,
+                lower=lower,
+            )
 
-        return SearchResult(df, self.parent, self.dimensions)
+        return self._run([self._map(dimension, _clean, required=True, group=group)])
 
+    @_profiled
     def lower(self, columns: list[str] | None = None, group: bool = True) -> Self:
         """
         指定列を小文字化
@@ -332,36 +780,24 @@ class SearchResult(_ResultBase):
         """
         if columns is None:
             columns = ['page']
-        df = self._df.copy()
-        
-        for col in columns:
-            if col in df.columns:
-                df[col] = df[col].str.lower()
-        
-        if group:
-            df = self._aggregate(df)
-        
-        return SearchResult(df, self.parent, self.dimensions)
+        return self._map_columns(list(columns), lambda series: series.str.lower(), group)
     
     def _with_df(self, df: pd.DataFrame, dimensions: list[str]) -> "SearchResult":
-        return SearchResult(df, self.parent, dimensions)
-
+        result = SearchResult(df, self.parent, dimensions)
+        result._engine = self._engine
+        result._workers = self._workers
+        result._profiling = self._profiling
+        result._trace = self._trace
+        return result
+
+    @_profiled
     def classify(self, dimension: str, by: MappingRule, *, lower: bool = True, strip: bool = True) -> Self:
         """
         正規化 + 集約（ディメンション上書き、常に集約）
         """
-        df = self._df.copy()
-        if dimension not in df.columns:
-            raise ValueError(f"Column '{dimension}' not found in DataFrame")
-
-        def _apply(value):
-            normalized = self._normalize_value(value, lower=lower, strip=strip)
-            return self._map_value(normalized, by, default=None)
-
-        df[dimension] = df[dimension].apply(_apply)
-        df = self._aggregate_gsc(df, self.dimensions)
-        return SearchResult(df, self.parent, self.dimensions)
+        return self._run([self._normalize_step(dimension, by, lower=lower, strip=strip, group=True)])
     
+    @_profiled
     def normalize_queries(self, mode: str = 'remove_all', prefer_by: str = 'impressions', group: bool = True) -> Self:
         """
         クエリの空白を正規化して重複を排除
@@ -392,54 +828,68 @@ class SearchResult(_ResultBase):
                 .normalize_queries(prefer_by='impressions')
                 .classify('query', by=cfg.query_map))
         """
+        from megaton.transform import gsc, polars_engine
         from megaton.transform.text import normalize_whitespace
         from megaton.transform.table import dedup_by_key
-        
-        df = self._df.copy()
-        
-        if 'query' not in df.columns:
+
+        dimensions = list(self.dimensions)
+
+        def _normalize_queries(df: pd.DataFrame) -> pd.DataFrame:
+            if 'query' not in df.columns:
+                return df
+
+            # prefer_by は文字列のみ（単一指標での選択）
+            if not isinstance(prefer_by, str):
+                raise TypeError(f"prefer_by must be a string, got {type(prefer_by).__name__}")
+
+            # query_key を作成（空白を正規化）
+            df['query_key'] = normalize_whitespace(df['query'], mode=mode)
+
+            # dimensions から query を除外し、query_key を追加したキー列を作成
+            key_cols = [d for d in dimensions if d != 'query']
+            key_cols.append('query_key')
+
+            if group:
+                # 各 query_key の代表クエリを取得
+                # position は最小値（最良順位）、その他は最大値を選択
+                prefer_ascending = (prefer_by == 'position')
+                if _can_aggregate_with_top(df, prefer_by):
+                    # 集約と代表クエリの選択を 1 回の groupby で行う
+                    profiling.note_aggregation()
+                    engine = polars_engine if self._engine == 'polars' else gsc
+                    df = engine.aggregate_with_top(df, key_cols, 'query', prefer_by, prefer_ascending)
+                    return df.drop(columns=['query_key'])
+
+                top_queries = dedup_by_key(
+                    df,
+                    key_cols=key_cols,
+                    prefer_by=prefer_by,
+                    prefer_ascending=prefer_ascending,
+                    keep='first',
+                )
+
+                # query_key で集約
+                df = self._aggregate_gsc(df, key_cols)
+
+                # 代表クエリを戻す
+                df = df.merge(
+                    top_queries[key_cols + ['query']],
+                    on=key_cols,
+                    how='left',
+                )
+
+                # query_key 列を削除
+                df = df.drop(columns=['query_key'])
+            # else: query_key 列のみ追加（集約なし）
+            return df
+
+        if self._plan is None and 'query' not in self._df.columns:
             return self
-        
-        # prefer_by は文字列のみ（単一指標での選択）
-        if not isinstance(prefer_by, str):
-            raise TypeError(f"prefer_by must be a string, got {type(prefer_by).__name__}")
-        
-        # query_key を作成（空白を正規化）
-        df['query_key'] = normalize_whitespace(df['query'], mode=mode)
-        
-        # dimensions から query を除外し、query_key を追加したキー列を作成
-        key_cols = [d for d in self.dimensions if d != 'query']
-        key_cols.append('query_key')
-        
-        if group:
-            # 各 query_key の代表クエリを取得
-            # position は最小値（最良順位）、その他は最大値を選択
-            prefer_ascending = (prefer_by == 'position')
-            top_queries = dedup_by_key(
-                df,
-                key_cols=key_cols,
-                prefer_by=prefer_by,
-                prefer_ascending=prefer_ascending,
-                keep='first',
-            )
-            
-            # query_key で集約
-            df = self._aggregate_gsc(df, key_cols)
-            
-            # 代表クエリを戻す
-            df = df.merge(
-                top_queries[key_cols + ['query']],
-                on=key_cols,
-                how='left',
-            )
-            
-            # query_key 列を削除
-            df = df.drop(columns=['query_key'])
-        # else: query_key 列のみ追加（集約なし）
-        
+
         # dimensions は元のまま（query を含む）
-        return SearchResult(df, self.parent, self.dimensions)
+        return self._run([_Step("frame", _normalize_queries)])
     
+    @_profiled
     def filter_clicks(self, min: float | None = None, max: float | None = None, sites: list[dict[str, object]] | None = None, site_key: str = 'site') -> Self:
         """
         クリック数でフィルタリング
@@ -456,16 +906,19 @@ class SearchResult(_ResultBase):
         return self._filter_metric('clicks', min, max, sites, site_key, False,
                                    'min_clicks', 'max_clicks')
     
+    @_profiled
     def filter_impressions(self, min: float | None = None, max: float | None = None, sites: list[dict[str, object]] | None = None, site_key: str = 'site', keep_clicked: bool = False) -> Self:
         """インプレッション数でフィルタリング（default: keep_clicked=False）"""
         return self._filter_metric('impressions', min, max, sites, site_key, keep_clicked,
                                    'min_impressions', 'max_impressions')
 
+    @_profiled
     def filter_ctr(self, min: float | None = None, max: float | None = None, sites: list[dict[str, object]] | None = None, site_key: str = 'site', keep_clicked: bool = False) -> Self:
         """CTRでフィルタリング（default: keep_clicked=False）"""
         return self._filter_metric('ctr', min, max, sites, site_key, keep_clicked,
                                    'min_ctr', 'max_ctr')
 
+    @_profiled
     def filter_position(self, min: float | None = None, max: float | None = None, sites: list[dict[str, object]] | None = None, site_key: str = 'site', keep_clicked: bool = False) -> Self:
         """平均順位でフィルタリング（default: keep_clicked=False）"""
         return self._filter_metric('position', min, max, sites, site_key, keep_clicked,
@@ -489,86 +942,40 @@ class SearchResult(_ResultBase):
         Returns:
             SearchResult
         """
-        df = self._df.copy()
-        
-        # sites リストから閾値を取得（行ごとに適用）
-        if sites and site_key in df.columns:
-            # sites を辞書に変換（site_key をキーに）
-            site_map = {s.get(site_key): s for s in sites if s.get(site_key)}
-            
-            # 行ごとに閾値を取得（明示的な min/max がない場合のみ）
-            if min_val is None:
-                df['_min'] = df[site_key].map(
-                    lambda x: site_map.get(x, {}).get(min_key)
-                )
-            else:
-                df['_min'] = min_val
-            
-            if max_val is None:
-                df['_max'] = df[site_key].map(
-                    lambda x: site_map.get(x, {}).get(max_key)
-                )
-            else:
-                df['_max'] = max_val
-            
-            # keep_clicked の処理
-            if keep_clicked and 'clicks' in df.columns:
-                clicked = df[df['clicks'] >= 1].copy()
-                unclicked = df[df['clicks'] == 0].copy()
-                nan_clicks = df[df['clicks'].isna()].copy()
-                
-                # unclicked にのみ閾値を適用
-                mask = pd.Series(True, index=unclicked.index)
-                if '_min' in unclicked.columns and unclicked['_min'].notna().any():
-                    mask &= (unclicked[metric] >= unclicked['_min']) | unclicked['_min'].isna()
-                if '_max' in unclicked.columns and unclicked['_max'].notna().any():
-                    mask &= (unclicked[metric] <= unclicked['_max']) | unclicked['_max'].isna()
-                
-                unclicked = unclicked[mask]
-                
-                # clicked, unclicked, NaN を結合
-                parts = [clicked, unclicked]
-                if not nan_clicks.empty:
-                    parts.append(nan_clicks)
-                df = pd.concat(parts)
-            else:
-                # 全行に閾値を適用
-                mask = pd.Series(True, index=df.index)
-                if '_min' in df.columns and df['_min'].notna().any():
-                    mask &= (df[metric] >= df['_min']) | df['_min'].isna()
-                if '_max' in df.columns and df['_max'].notna().any():
-                    mask &= (df[metric] <= df['_max']) | df['_max'].isna()
-                
-                df = df[mask]
-            
-            # 一時列を削除
-            df = df.drop(columns=['_min', '_max'], errors='ignore')
-        
-        else:
-            # sites がない場合、明示的な min/max のみ適用
-            if keep_clicked and 'clicks' in df.columns:
-                clicked = df[df['clicks'] >= 1]
-                unclicked = df[df['clicks'] == 0]
-                nan_clicks = df[df['clicks'].isna()]
-                
-                if min_val is not None:
-                    unclicked = unclicked[unclicked[metric] >= min_val]
-                if max_val is not None:
-                    unclicked = unclicked[unclicked[metric] <= max_val]
-                
-                # clicked, unclicked, NaN を結合
-                parts = [clicked, unclicked]
-                if not nan_clicks.empty:
-                    parts.append(nan_clicks)
-                df = pd.concat(parts)
-            else:
-                if min_val is not None:
-                    df = df[df[metric] >= min_val]
-                if max_val is not None:
-                    df = df[df[metric] <= max_val]
-        
-        return SearchResult(df, self.parent, self.dimensions)
-    
+        def _filter(df: pd.DataFrame) -> pd.DataFrame:
+            return self._filter_frame(df, metric, min_val, max_val, sites, site_key, keep_clicked, min_key, max_key)
+
+        reads = (metric, site_key, 'clicks')
+        return self._run([_Step("frame", _filter, reads=reads, mutates=False)])
+
+    @staticmethod
+    def _filter_frame(df: pd.DataFrame, metric: str, min_val: float | None, max_val: float | None, sites: list[dict[str, object]] | None,
+                      site_key: str, keep_clicked: bool, min_key: str, max_key: str) -> pd.DataFrame:
+        values = df[metric].to_numpy(dtype=float, na_value=np.nan)
+        by_site = bool(sites) and site_key in df.columns
+
+        # 行ごとの閾値（明示的な min/max が最優先、次に sites の値）。NaN は閾値なし
+        mask = np.ones(len(df), dtype=bool)
+        for explicit, key, within in ((min_val, min_key, np.greater_equal), (max_val, max_key, np.less_equal)):
+            if explicit is not None:
+                if by_site:
+                    mask &= within(values, explicit) | pd.isna(explicit)
+                else:
+                    mask &= within(values, explicit)
+            elif by_site:
+                threshold = _site_thresholds(df[site_key], sites or [], site_key, key)
+                with np.errstate(invalid='ignore'):
+                    mask &= within(values, threshold) | np.isnan(threshold)
+
+        # keep_clicked: clicks >= 1 と clicks 欠損の行は閾値に関係なく残す
+        if keep_clicked and 'clicks' in df.columns:
+            clicks = df['clicks'].to_numpy(dtype=float, na_value=np.nan)
+            mask = (clicks >= 1) | np.isnan(clicks) | ((clicks == 0) & mask)
+
+        # 元の行順を保ったまま 1 回で抽出
+        return df if mask.all() else df[mask]
+
+    @_profiled
     def aggregate(self, by: str | list[str] | None = None) -> Self:
         """
         手動集計
@@ -581,14 +988,11 @@ class SearchResult(_ResultBase):
         """
         if by:
             group_cols = [by] if isinstance(by, str) else list(by)
-            df = self._aggregate_gsc(self._df, group_cols)
+            step = _Step("frame", lambda df: self._aggregate_gsc(df, group_cols), mutates=False)
             # dimensions を更新して、後続の group=True が正しく動作するようにする
-            new_dimensions = group_cols
-        else:
-            df = self._aggregate(self._df)
-            new_dimensions = self.dimensions
-        
-        return SearchResult(df, self.parent, new_dimensions)
+            return self._run([step], group_cols)
+
+        return self._run([replace(self._map(None, None, group=True), mutates=False)])
     
     def apply_if(self, condition: bool | Callable[[SearchResult], bool], method_name: str, *args: object, **kwargs: object) -> Self:
         """
@@ -655,6 +1059,7 @@ class ReportResult(_ResultBase):
                        None の場合は自動で推定（指標以外の列）
         """
         self._df = df
+        self._cube: _Cube | None = None
 
         # dimensions の推定（明示指定がある場合は最優先）
         if dimensions is None:
@@ -703,8 +1108,14 @@ class ReportResult(_ResultBase):
         return self._df[key]
 
     def _with_df(self, df: pd.DataFrame, dimensions: list[str]) -> "ReportResult":
-        return ReportResult(df, dimensions)
-
+        result = ReportResult(df, dimensions)
+        result._engine = self._engine
+        result._workers = self._workers
+        result._profiling = self._profiling
+        result._trace = self._trace
+        return result
+
+    @_profiled
     def classify(self, dimension: str, by: MappingRule, *, lower: bool = True, strip: bool = True) -> Self:
         """
         正規化 + 集約（ディメンション上書き、常に集約）
@@ -712,6 +1123,7 @@ class ReportResult(_ResultBase):
         normalized = self.normalize(dimension, by, lower=lower, strip=strip)
         return normalized.group(by=normalized.dimensions)
     
+    @_profiled
     def group(self, by: str | list[str], metrics: str | list[str] | None = None, method: str = 'sum',
               *, dropna: bool = True, min_count: int | None = None) -> Self:
         """
@@ -740,7 +1152,8 @@ class ReportResult(_ResultBase):
             # 旧 .groupby(..., dropna=False)[...].sum(min_count=1) 互換
             result.group(['month', 'clinic'], dropna=False, min_count=1).to_int()
         """
-        df = self._df.copy()
+        # groupby は元の DataFrame を変更しないのでコピー不要
+        df = self._df
         
         # by を list に統一
         if isinstance(by, str):
@@ -759,7 +1172,7 @@ class ReportResult(_ResultBase):
                 columns = by + valid_metrics
             else:
                 columns = by
-            return ReportResult(pd.DataFrame(columns=columns), by)
+            return self._with_df(pd.DataFrame(columns=columns), by)
         
         # 指標列を特定
         if metrics is None:
@@ -772,25 +1185,105 @@ class ReportResult(_ResultBase):
         
         if not metrics:
             # メトリクスがない場合は by 列のみの空DataFrameを返す
-            return ReportResult(pd.DataFrame(columns=by), by)
+            return self._with_df(pd.DataFrame(columns=by), by)
         
         # 集計実行
         # min_count は sum/prod でのみ有効。全 NaN グループを 0 ではなく NaN にしたい
         # （その後 .to_int() で 0 化する）ケースで、旧コードの .sum(min_count=1) と一致させる。
-        if min_count is not None and method in ("sum", "prod"):
+        from megaton.transform import polars_engine
+
+        if self._cube is not None and self._cube.covers(by, metrics, method):
+            grouped = self._cube.group(by, metrics, method, dropna=dropna, min_count=min_count)
+        elif self._engine == "polars" and polars_engine.can_group(df, metrics, method, min_count):
+            grouped = polars_engine.group(df, by, metrics, method, dropna=dropna, min_count=min_count)
+        elif min_count is not None and method in ("sum", "prod"):
             grouped = (
-                df.groupby(by, as_index=False, dropna=dropna)[metrics]
+                df.groupby(by, as_index=False, dropna=dropna, observed=True)[metrics]
                 .agg(method, min_count=min_count)
             )
         else:
             agg_dict = {col: method for col in metrics}
-            grouped = df.groupby(by, as_index=False, dropna=dropna).agg(agg_dict)
+            grouped = df.groupby(by, as_index=False, dropna=dropna, observed=True).agg(agg_dict)
+
+        profiling.note_aggregation()
 
         # dimensions を更新
         new_dimensions = by
 
-        return ReportResult(grouped, new_dimensions)
+        return self._with_df(grouped, new_dimensions)
+
+    @_profiled
+    def cube(self, dims: list[str] | None = None, metrics: list[str] | None = None) -> Self:
+        """
+        最も細かい粒度で 1 回だけ集計し、以降の ``group()`` をその集計表から返す
 
+        同じ結果に対して ``group(by='month')``, ``group(by=['month', 'channel'])``
+        のように粒度を変えて何度も集計する場合に使います。返り値のデータ
+        （``.df``）は元のままで、``group()`` の ``by`` が ``dims`` の部分集合かつ
+        指標が ``metrics`` に含まれるとき、sum / count / min / max を事前集計表から
+        計算します（全行の再ハッシュなし）。整数の合計・件数・最小・最大は元の
+        ``group()`` と完全に一致し、小数の合計は加算順の違いの範囲で一致します。
+        それ以外（mean などの method、dims 外のキー）は従来どおり全行から集計します。
+        他のメソッドで変換すると事前集計は引き継がれません。
+
+        Args:
+            dims: 事前集計するディメンション（default: ``self.dimensions``）
+            metrics: 事前集計する指標（default: ``dims`` 以外の数値列のうち
+                比率・平均系を除いたもの）
+
+        Returns:
+            ReportResult（事前集計付き）
+
+        Raises:
+            KeyError: 存在しない列を指定した場合
+            ValueError: 数値でない列、または比率・平均系の指標
+                （``engagementRate``, ``averageSessionDuration``, ``ctr`` など、
+                行の合計が意味を持たないもの）を ``metrics`` に指定した場合
+
+        Example:
+            cube = result.cube(dims=['month', 'channel', 'site'], metrics=['sessions', 'cv'])
+            by_month = cube.group('month')
+            by_channel = cube.group(['month', 'channel'])
+        """
+        df = self._df
+        dims = [col for col in self.dimensions if col in df.columns] if dims is None else list(dims)
+        if metrics is None:
+            metrics = [
+                col for col in df.select_dtypes(include=['number']).columns
+                if col not in dims and not _is_non_additive(col)
+            ]
+        else:
+            metrics = list(metrics)
+        missing = [col for col in dims + metrics if col not in df.columns]
+        if missing:
+            raise KeyError(f"columns not found: {missing}")
+        non_numeric = [col for col in metrics if not pd.api.types.is_numeric_dtype(df[col])]
+        if non_numeric:
+            raise ValueError(f"cube() metrics must be numeric: {non_numeric}")
+        non_additive = [col for col in metrics if _is_non_additive(col)]
+        if non_additive:
+            raise ValueError(
+                f"cube() cannot roll up ratio/average metrics {non_additive}; "
+                "aggregate their numerator and denominator instead"
+            )
+
+        profiling.note_aggregation()
+        groups = df.groupby(dims, dropna=False, observed=True, sort=False)[metrics]
+        sums = groups.sum()
+        stats = {
+            'sum': sums.reset_index(drop=True),
+            'count': groups.count().reset_index(drop=True),
+            'min': groups.min().reset_index(drop=True),
+            'max': groups.max().reset_index(drop=True),
+        }
+        keys = sums.index.to_frame(index=False)
+        # 全行欠損の object 列などは index 化で dtype が変わるので元に戻す
+        keys = keys.astype({col: df[col].dtype for col in dims if keys[col].dtype != df[col].dtype})
+        result = copy.copy(self)
+        result._cube = _Cube(tuple(dims), tuple(metrics), keys, stats)
+        return result
+
+    @_profiled
     def select(self, columns: list[str], *, strict: bool = True) -> Self:
         """列を指定順に選択（並べ替え）する。
 
@@ -813,10 +1306,11 @@ class ReportResult(_ResultBase):
             selected = list(columns)
         else:
             selected = [c for c in columns if c in df.columns]
-        new_df = df[selected].copy()
+        new_df = df[selected]
         new_dimensions = [d for d in self.dimensions if d in selected]
-        return ReportResult(new_df, new_dimensions)
+        return self._with_df(new_df, new_dimensions)
     
+    @_profiled
     def sort(self, by: str | list[str], ascending: bool | list[bool] = True) -> Self:
         """
         指定した列でソート
@@ -836,10 +1330,10 @@ class ReportResult(_ResultBase):
             # 複数列でソート
             result.sort(by=['date', 'sessions'], ascending=[True, False])
         """
-        df = self._df.copy()
-        sorted_df = df.sort_values(by=by, ascending=ascending).reset_index(drop=True)
-        return ReportResult(sorted_df, self.dimensions)
+        sorted_df = self._df.sort_values(by=by, ascending=ascending).reset_index(drop=True)
+        return self._with_df(sorted_df, self.dimensions)
     
+    @_profiled
     def fill(self, to: str = '(not set)', dimensions: list[str] | None = None) -> Self:
         """
         ディメンション列の欠損値を指定した値で埋める
@@ -859,7 +1353,7 @@ class ReportResult(_ResultBase):
             # 特定のディメンションのみ埋める
             result.fill(to='Unknown', dimensions=['sessionSource'])
         """
-        df = self._df.copy()
+        df = _shallow_copy(self._df)
         
         # 対象列を決定
         if dimensions is None:
@@ -870,10 +1364,15 @@ class ReportResult(_ResultBase):
         # 欠損値を埋める
         for col in target_cols:
             if col in df.columns:
-                df[col] = df[col].fillna(to)
+                series = df[col]
+                # category 列は埋める値をカテゴリに追加してから埋める
+                if isinstance(series.dtype, pd.CategoricalDtype) and to not in series.cat.categories:
+                    series = series.cat.add_categories([to])
+                df[col] = series.fillna(to)
         
-        return ReportResult(df, self.dimensions)
+        return self._with_df(df, self.dimensions)
     
+    @_profiled
     def to_int(self, metrics: str | list[str] | None = None, *, fill_value: int = 0) -> Self:
         """
         指標列を整数型に変換（欠損値は指定した値で埋める）
@@ -908,7 +1407,9 @@ class ReportResult(_ResultBase):
             # fill_value はキーワード専用
             result.to_int(['sessions'], fill_value=99)
         """
-        df = self._df.copy()
+        from megaton.transform.table import fillna_int
+
+        df = _shallow_copy(self._df)
         
         # metrics が None の場合、すべての数値列を対象（int64/float64/Int64/Float64のみ）
         if metrics is None:
@@ -918,14 +1419,13 @@ class ReportResult(_ResultBase):
             metrics = [metrics]
         
         # 型変換実行: object/文字列混在の列でも壊れないよう pd.to_numeric で強制
-        # （transform.fillna_int と同じ堅牢化。GA4 の advertiserAdCost 等は
-        # object dtype で返ることがあり、素の .astype(int) では失敗する）
-        for col in metrics:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(fill_value).astype(int)
+        # （GA4 の advertiserAdCost 等は object dtype で返ることがあり、
+        # 素の .astype(int) では失敗する）
+        fillna_int(df, metrics, fill_value=fill_value)
 
-        return ReportResult(df, self.dimensions)
+        return self._with_df(df, self.dimensions)
 
+    @_profiled
     def month_key(self, dimension: str = 'date', *, into: str | None = None, fmt: str = '%Y-%m') -> Self:
         """Derive a month-key column from a date-like dimension.
 
@@ -939,15 +1439,21 @@ class ReportResult(_ResultBase):
         """
         if dimension not in self._df.columns:
             raise KeyError(f"column not found: {dimension}")
-        df = self._df.copy()
-        series = pd.to_datetime(df[dimension], errors='coerce')
+        def _format(values: pd.Series) -> pd.Series:
+            return pd.to_datetime(values, errors='coerce').dt.strftime(fmt)
+
+        df = _shallow_copy(self._df)
+        source = df[dimension]
         target = into or dimension
-        df[target] = series.dt.strftime(fmt)
+        # 日付の種類は行数よりずっと少ないので、解析と書式化はユニーク値ごとに 1 回
+        with self._parallel():
+            df[target] = transform_unique(source, [_format]) if _per_unique_safe(source) else _format(source)
         new_dimensions = list(self.dimensions)
         if target not in new_dimensions:
             new_dimensions.append(target)
-        return ReportResult(df, new_dimensions)
+        return self._with_df(df, new_dimensions)
 
+    @_profiled
     def replace(self, dimension: str, by: dict[str, str], *, regex: bool = True) -> Self:
         """
         ディメンション列の値を辞書マッピングで置換
@@ -975,16 +1481,29 @@ class ReportResult(_ResultBase):
                 regex=False
             )
         """
-        df = self._df.copy()
+        df = _shallow_copy(self._df)
         
         if dimension not in df.columns:
             raise ValueError(f"Column '{dimension}' not found in DataFrame")
         
-        # 置換実行
-        df[dimension] = df[dimension].replace(by, regex=regex)
+        # 置換実行（パターンはユニーク値に対してのみ適用）
+        def _replace(values: pd.Series) -> pd.Series:
+            return values.replace(by, regex=regex)
+
+        source = df[dimension]
+        if isinstance(source.dtype, pd.CategoricalDtype):
+            # category 列（compact() 後など）はカテゴリを置換して列を組み直す
+            # （置換後に同じ値になったカテゴリは 1 つにまとまる。末尾は欠損行用）
+            categories = _replace(pd.Series(source.cat.categories, dtype=object)).to_numpy(dtype=object)
+            values = np.append(categories, np.nan).take(source.cat.codes.to_numpy())
+            df[dimension] = pd.Series(pd.Categorical(values), index=source.index, name=dimension)
+            return self._with_df(df, self.dimensions)
+        with self._parallel():
+            df[dimension] = transform_unique(source, [_replace]) if _per_unique_safe(source) else _replace(source)
         
-        return ReportResult(df, self.dimensions)
+        return self._with_df(df, self.dimensions)
 
+    @_profiled
     def clean_url(self, dimension: str, *, unquote: bool = True, drop_query: bool = True, drop_hash: bool = True, lower: bool = True) -> Self:
         """
         URL列を正規化（URLデコード、クエリ/フラグメント削除、小文字化）
@@ -1009,20 +1528,21 @@ class ReportResult(_ResultBase):
         """
         from megaton.transform.text import clean_url
 
-        df = self._df.copy()
+        df = _shallow_copy(self._df)
 
         if dimension not in df.columns:
             raise ValueError(f"Column '{dimension}' not found in DataFrame")
 
-        df[dimension] = clean_url(
-            df[dimension],
-            unquote=unquote,
-            drop_query=drop_query,
-            drop_hash=drop_hash,
-            lower=lower,
-        )
+        with self._parallel():
+            df[dimension] = clean_url(
+                df[dimension],
+                unquote=unquote,
+                drop_query=drop_query,
+                drop_hash=drop_hash,
+                lower=lower,
+            )
 
-        return ReportResult(df, self.dimensions)
+        return self._with_df(df, self.dimensions)
 
 
 def _extract_df(data):
@@ -1045,7 +1565,7 @@ def wrap(df: pd.DataFrame, dimensions: list[str] | None = None) -> ReportResult:
         wrap(df).normalize('source', rules).group('month').to_int().sort('month')
 
     Args:
-        df: Source DataFrame (copied; the original is not mutated).
+        df: Source DataFrame (shallow-copied; the original is not mutated).
         dimensions: Optional dimension column names. Defaults to all
             non-numeric columns (numeric columns are treated as metrics
             by group()/to_int()).
@@ -1057,5 +1577,5 @@ def wrap(df: pd.DataFrame, dimensions: list[str] | None = None) -> ReportResult:
             col for col in df.columns
             if not pd.api.types.is_numeric_dtype(df[col])
         ]
-    return ReportResult(df.copy(), list(dimensions))
+    return ReportResult(_shallow_copy(df), list(dimensions))
 
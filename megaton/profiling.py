@@ -0,0 +1,92 @@
+"""Per-step profiling of SearchResult / ReportResult chains (opt-in).
+
+Inside ``with profiling.enabled():`` (or for results returned while
+``mg.set.profile(True)`` is on) every chain method call such as
+``.normalize_queries()`` / ``.classify()`` / ``.filter_impressions()``
+records one row: wall time, input / output rows, the peak memory allocated
+during the call and whether an aggregation ran. ``result.profile()``
+returns the rows recorded along the chain that produced ``result``.
+
+When profiling is off a chain method costs one extra attribute check and
+one context lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["step", "seconds", "rows_in", "rows_out", "peak_bytes", "aggregated"]
+
+# (memory, log) while a ``with enabled():`` block is active, else None.
+_settings: ContextVar[tuple[bool, bool] | None] = ContextVar("megaton_profile", default=None)
+# The row being recorded; nested chain calls only add to it.
+_current: ContextVar[dict[str, Any] | None] = ContextVar("megaton_profile_step", default=None)
+
+
+@contextmanager
+def enabled(*, memory: bool = True, log: bool = False) -> Iterator[None]:
+    """Record every result chain call made within the block.
+
+    ``memory=False`` skips tracemalloc (``peak_bytes`` is None), which keeps
+    the timings free of its tracing overhead. If tracemalloc is already
+    running, its peak is left untouched and ``peak_bytes`` is the net memory
+    still allocated at the end of each step. ``log=True`` also logs each
+    recorded step at INFO level on the ``megaton.profiling`` logger.
+    """
+    token = _settings.set((memory, log))
+    try:
+        yield
+    finally:
+        _settings.reset(token)
+
+
+def settings(default: tuple[bool, bool] | None) -> tuple[bool, bool] | None:
+    """Active (memory, log) settings: the ``enabled()`` block, else ``default``; None when off or nested."""
+    if _current.get() is not None:
+        return None
+    active = _settings.get()
+    return default if active is None else active
+
+
+def note_aggregation() -> None:
+    """Mark the step being recorded (if any) as having aggregated rows."""
+    step = _current.get()
+    if step is not None:
+        step["aggregated"] = True
+
+
+@contextmanager
+def measure(name: str, rows_in: int, *, memory: bool, log: bool) -> Iterator[dict[str, Any]]:
+    """Time the block and yield its row; the caller fills in ``rows_out``."""
+    step: dict[str, Any] = dict.fromkeys(COLUMNS)
+    step.update(step=name, rows_in=rows_in, aggregated=False)
+    # When tracemalloc was started outside the profiler its peak belongs to
+    # the caller: leave it alone and report the net growth instead.
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0] if memory else 0
+    token = _current.set(step)
+    begin = time.perf_counter()
+    try:
+        yield step
+    finally:
+        step["seconds"] = time.perf_counter() - begin
+        _current.reset(token)
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            step["peak_bytes"] = max((peak if started else current) - baseline, 0)
+            if started:
+                tracemalloc.stop()
+    if log:
+        logger.info(
+            "%s: %.3fs, rows %s -> %s%s",
+            name, step["seconds"], rows_in, step["rows_out"], " (aggregated)" if step["aggregated"] else "",
+        )
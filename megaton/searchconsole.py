@@ -1,18 +1,49 @@
 """Utilities for Google Search Console"""
 
+import functools
+import json
 import logging
 from typing import Optional
 
 from google.oauth2.credentials import Credentials
 from google.oauth2 import service_account
 
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
 
 from . import errors
 
 LOGGER = logging.getLogger(__name__)
 
+API_NAME = 'searchconsole'
+API_VERSION = 'v1'
+
+
+@functools.lru_cache(maxsize=None)
+def discovery_document() -> str:
+    """Return the Search Console discovery document (loaded once per process).
+
+    Uses the copy shipped with google-api-python-client, so no network
+    access is needed. If the installed library lacks it, the document is
+    fetched once and kept for the rest of the process.
+
+    The JSON text is cached rather than the parsed dict because
+    ``build_from_document`` mutates the dict it is given.
+    """
+    doc = discovery_cache.get_static_doc(API_NAME, API_VERSION)
+    if doc:
+        return doc
+    LOGGER.debug('No static discovery document for %s %s; fetching it once.', API_NAME, API_VERSION)
+    service = build(API_NAME, API_VERSION, static_discovery=False, cache_discovery=False,
+                    developerKey='unused')
+    return json.dumps(service._rootDesc)
+
+
+def build_service(credentials, **kwargs):
+    """Build a Search Console service from the cached discovery document."""
+    return build_from_document(discovery_document(), credentials=credentials, **kwargs)
+
 
 class MegatonSC(object):
     """Google Search Console client"""
@@ -36,7 +67,7 @@ class MegatonSC(object):
                 self.credentials = None
                 raise errors.BadCredentialScope(self.required_scopes)
         try:
-            self._client = build('searchconsole', 'v1', credentials=self.credentials)
+            self._client = build_service(self.credentials)
         except HttpError as exc:
             LOGGER.error('Search Console API error: %s', exc)
             raise
@@ -1,23 +1,147 @@
 """Google Search Console service wrapper."""
 
+import hashlib
+import json
 import logging
 import os
+import threading
 import time
-from typing import Optional
-from urllib.parse import unquote
+from typing import Iterator, Optional
 
 import pandas as pd
 from googleapiclient.errors import HttpError
 
 from .. import retry_utils, searchconsole
+from ..transform import gsc, table
 
 logger = logging.getLogger(__name__)
 
 
+class _ClientPool:
+    """Per-thread Search Console service objects for one credential.
+
+    A googleapiclient service rides on an ``httplib2.Http`` transport, which
+    is not safe to share across threads. The pool hands each thread its own
+    service (and therefore its own keep-alive connection); services are
+    built locally from the cached discovery document
+    (``searchconsole.build_service``).
+    """
+
+    def __init__(self, credentials, seed=None):
+        self.credentials = credentials
+        self._local = threading.local()
+        if seed is not None:
+            # The seed belongs to the thread that created the pool.
+            self._local.client = seed
+
+    def get(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = searchconsole.build_service(self.credentials)
+            self._local.client = client
+        return client
+
+
+class _CsvSink:
+    """Append DataFrames to one CSV file, writing the header only once."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._header = True
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.path, mode="w" if self._header else "a", index=False, header=self._header)
+        self._header = False
+
+    def close(self) -> None:
+        pass
+
+
+class _ParquetSink:
+    """Append DataFrames as row groups of one Parquet file (requires pyarrow)."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError(
+                "Parquet export requires pyarrow. Install it with `pip install pyarrow` "
+                "or export to a .csv path."
+            ) from exc
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = self._pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class _FeatherSink:
+    """Append DataFrames as record batches of one Feather (Arrow IPC) file (requires pyarrow)."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+        except ImportError as exc:
+            raise ImportError(
+                "Feather export requires pyarrow. Install it with `pip install pyarrow` "
+                "or export to a .csv path."
+            ) from exc
+        self._pa = pa
+        self.path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = self._pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._pa.ipc.new_file(self.path, self._schema)
+        else:
+            table = table.cast(self._schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def _open_sink(path: str, tmp_path: str):
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in {".parquet", ".pq"}:
+        return _ParquetSink(tmp_path)
+    if suffix in {".feather", ".arrow"}:
+        return _FeatherSink(tmp_path)
+    return _CsvSink(tmp_path)
+
+
 class GSCService:
     def __init__(self, app, client=None):
         self.app = app
         self._client = client
+        self._pool: Optional[_ClientPool] = None
+        self._pool_owner = None
+        # Guards pool creation and the site caches below; first calls may
+        # arrive from several worker threads at once.
+        self._lock = threading.Lock()
+        # (credential key, requested site_url) -> site_url variant that worked
+        self._resolved_sites: dict[tuple[str, str], str] = {}
+        self._disk_sites_loaded = False
+        # credential key -> sites returned by the last list_sites()
+        self._known_sites: dict[str, set[str]] = {}
 
     @staticmethod
     def _resolve_env(value, env_key: str, default, cast):
@@ -42,6 +166,15 @@ class GSCService:
         cfg = getattr(app, "_retry", None) if app is not None else None
         return cfg.get(key) if isinstance(cfg, dict) else None
 
+    def _to_session_backend(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert ``df`` to the session dtype backend (mg.set.dtypes), if any."""
+        app = getattr(self, "app", None)
+        cfg = getattr(app, "_dtypes", None) if app is not None else None
+        backend = cfg.get("dtype_backend") if isinstance(cfg, dict) else None
+        if not backend or backend == "numpy" or df.empty:
+            return df
+        return table.convert_backend(df, backend)
+
     def _resolve_max_retries(self, value: Optional[int]) -> int:
         # Resolution: explicit -> session (mg.set.retry) -> env -> default.
         if value is None:
@@ -66,26 +199,40 @@ class GSCService:
         return (HttpError, TimeoutError, ConnectionError, BrokenPipeError)
 
     def _get_client(self):
+        """Return a Search Console service usable from the calling thread.
+
+        An explicitly injected client is returned as-is (the caller owns its
+        thread safety). Otherwise services come from a per-thread pool bound
+        to ``app._sc_client``; the pool is rebuilt when that client changes
+        (e.g. after ``launch_sc`` or re-auth).
+        """
         if self._client is not None:
             return self._client
         if self.app is None:
             raise RuntimeError("Search Console client is not initialized.")
 
-        sc = getattr(self.app, "_sc_client", None)
-        if sc is not None:
-            client = getattr(sc, "client", None) or getattr(sc, "_client", None)
-            if client is not None:
-                self._client = client
-                return client
-
-        creds = getattr(self.app, "creds", None)
-        if creds is None:
-            raise RuntimeError("Search Console credentials are not available.")
-
-        sc = searchconsole.MegatonSC(creds)
-        self.app._sc_client = sc
-        self._client = sc.client
-        return self._client
+        with self._lock:
+            sc = getattr(self.app, "_sc_client", None)
+            if sc is None:
+                creds = getattr(self.app, "creds", None)
+                if creds is None:
+                    raise RuntimeError("Search Console credentials are not available.")
+                sc = searchconsole.MegatonSC(creds)
+                self.app._sc_client = sc
+
+            if self._pool is None or self._pool_owner is not sc:
+                seed = getattr(sc, "client", None) or getattr(sc, "_client", None)
+                credentials = getattr(sc, "credentials", None) or getattr(self.app, "creds", None)
+                if seed is None and credentials is None:
+                    raise RuntimeError("Search Console credentials are not available.")
+                self._pool = _ClientPool(credentials, seed=seed)
+                self._pool_owner = sc
+                # A new client may be another account: drop what was learned
+                # under a credential that cannot be told apart from it.
+                self._known_sites = {}
+                self._resolved_sites = {key: value for key, value in self._resolved_sites.items() if key[0]}
+            pool = self._pool
+        return pool.get()
 
     @staticmethod
     def _site_url_candidates(site_url: str) -> list[str]:
@@ -113,6 +260,98 @@ class GSCService:
                 candidates.append(value)
         return candidates
 
+    def _credential_key(self) -> str:
+        """Per-account identifier of the credential behind the current client ("" if unknown).
+
+        Service accounts are keyed by their email, OAuth user credentials by
+        a hash of their refresh token (``client_id`` names the OAuth app,
+        which every user of that app shares).
+        """
+        creds = getattr(self._pool, "credentials", None)
+        if creds is None and self.app is not None:
+            creds = getattr(self.app, "creds", None)
+        email = getattr(creds, "service_account_email", None)
+        if isinstance(email, str) and email:
+            return email
+        token = getattr(creds, "refresh_token", None)
+        if isinstance(token, str) and token:
+            return "oauth:" + hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+        return ""
+
+    @staticmethod
+    def _site_cache_path() -> Optional[str]:
+        """Optional on-disk site_url resolution cache (``MEGATON_GSC_SITE_CACHE``)."""
+        path = os.getenv("MEGATON_GSC_SITE_CACHE")
+        return os.path.expanduser(path) if path else None
+
+    def _load_disk_sites(self) -> None:
+        """Merge the on-disk cache into ``_resolved_sites`` once (caller holds ``_lock``)."""
+        if self._disk_sites_loaded:
+            return
+        self._disk_sites_loaded = True
+        path = self._site_cache_path()
+        if not path or not os.path.isfile(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.debug("Ignoring unreadable GSC site cache %s: %s", path, exc)
+            return
+        if not isinstance(data, dict):
+            return
+        for key, value in data.items():
+            cred, sep, site = str(key).partition("|")
+            if sep and cred and isinstance(value, str):
+                self._resolved_sites.setdefault((cred, site), value)
+
+    def _save_disk_sites(self, resolved: dict[tuple[str, str], str]) -> None:
+        """Write a snapshot of ``_resolved_sites`` (caller holds ``_lock``)."""
+        path = self._site_cache_path()
+        if not path:
+            return
+        # Only identified credentials are persisted; "" could be any account.
+        data = {f"{cred}|{site}": value for (cred, site), value in resolved.items() if cred}
+        if not data:
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.debug("Could not write GSC site cache %s: %s", path, exc)
+
+    def _resolve_site_candidates(self, site_url: str) -> list[str]:
+        """Return site_url candidates, best guess first.
+
+        A variant that already worked for this credential is tried first;
+        otherwise a variant present in the last ``list_sites()`` result is
+        preferred. The remaining variants stay as fallbacks, so probing a
+        wrong trailing slash happens at most once per credential and site.
+        """
+        candidates = self._site_url_candidates(site_url)
+        if len(candidates) <= 1:
+            return candidates
+        cred = self._credential_key()
+        with self._lock:
+            self._load_disk_sites()
+            preferred = self._resolved_sites.get((cred, str(site_url).strip()))
+            known = self._known_sites.get(cred, set())
+        if preferred not in candidates:
+            preferred = next((c for c in candidates if c in known), None)
+        if preferred is None or preferred == candidates[0]:
+            return candidates
+        return [preferred] + [c for c in candidates if c != preferred]
+
+    def _remember_site(self, site_url: str, resolved: str) -> None:
+        key = (self._credential_key(), str(site_url).strip())
+        with self._lock:
+            if self._resolved_sites.get(key) == resolved:
+                return
+            self._resolved_sites[key] = resolved
+            self._save_disk_sites(dict(self._resolved_sites))
+
     @staticmethod
     def _clean_page(value: str) -> str:
         """
@@ -128,13 +367,7 @@ class GSCService:
         Returns:
             正規化された URL
         """
-        try:
-            # 1. デコード（既存の unquote を活用）
-            # 2-3. ? と # を削除（既存ロジック）
-            # 4. 小文字化（既存ロジック）
-            return unquote(str(value)).split("?", 1)[0].split("#", 1)[0].strip().lower()
-        except Exception:
-            return str(value)
+        return gsc.clean_page_value(value)
 
     @staticmethod
     def _aggregate(df: pd.DataFrame, dimensions: list) -> pd.DataFrame:
@@ -145,55 +378,25 @@ class GSCService:
         if not dims:
             return df
 
-        df = df.copy()
         if "impressions" not in df.columns or "clicks" not in df.columns:
             return df
 
-        if "position" in df.columns:
-            df["weighted_position"] = df["position"] * df["impressions"]
-
-        agg_dict = {
-            "clicks": "sum",
-            "impressions": "sum",
-        }
-        if "weighted_position" in df.columns:
-            agg_dict["weighted_position"] = "sum"
-
-        grouped = df.groupby(dims, as_index=False).agg(agg_dict)
-        if "weighted_position" in grouped.columns:
-            grouped["position"] = (grouped["weighted_position"] / grouped["impressions"]).round(6)
-            grouped.drop(columns=["weighted_position"], inplace=True)
-
+        grouped = gsc.aggregate(df, dims)
         metric_cols = [col for col in ["clicks", "impressions", "position"] if col in grouped.columns]
         return grouped[dims + metric_cols]
 
-    def query(
-        self,
-        site_url: str,
+    @staticmethod
+    def _build_request(
         start_date: str,
         end_date: str,
         dimensions: list,
-        metrics: Optional[list] = None,
-        dimension_filter: Optional[list] = None,
-        country: Optional[str] = None,
-        row_limit: int = 25000,
-        start_row: int = 0,
-        max_rows: int = 100000,
-        max_retries: Optional[int] = None,
-        backoff_factor: Optional[float] = None,
-        clean: bool = False,
-        verbose: bool = False,
-    ) -> pd.DataFrame:
-        client = self._get_client()
-        max_retries = self._resolve_max_retries(max_retries)
-        backoff_factor = self._resolve_backoff_factor(backoff_factor)
-        site_candidates = self._site_url_candidates(site_url)
-        if not site_candidates:
-            return pd.DataFrame()
-
-        if metrics is None:
-            metrics = ["clicks", "impressions", "ctr", "position"]
+        dimension_filter: Optional[list],
+        country: Optional[str],
+    ) -> tuple[dict, list, bool]:
+        """Validate query arguments and build the request body (without paging).
 
+        Returns ``(body, api_dimensions, has_month)``.
+        """
         allowed_dims = {"date", "hour", "country", "device", "page", "query", "month"}
         filter_dims = allowed_dims - {"month"}
         allowed_ops = {
@@ -252,38 +455,54 @@ class GSCService:
                     }
                 )
 
-        all_rows = []
+        body = {
+            "startDate": start_date,
+            "endDate": end_date,
+            "dimensions": api_dimensions,
+        }
+        filters = list(dimension_filters)
+        if country:
+            filters.append(
+                {
+                    "dimension": "country",
+                    "operator": "equals",
+                    "expression": country,
+                }
+            )
+        if filters:
+            body["dimensionFilterGroups"] = [
+                {
+                    "groupType": "and",
+                    "filters": filters,
+                }
+            ]
+        return body, api_dimensions, has_month
+
+    def _iter_row_pages(
+        self,
+        client,
+        site_url: str,
+        site_candidates: list,
+        body: dict,
+        row_limit: int,
+        start_row: int,
+        max_rows: int,
+        max_retries: int,
+        backoff_factor: float,
+        verbose: bool,
+    ):
+        """Yield the raw ``rows`` list of each API page as it arrives.
+
+        site_url variants are tried in order while the first page fails with
+        400/403/404. Any other error is logged (when verbose) and re-raised.
+        """
         for idx, site_candidate in enumerate(site_candidates):
-            all_rows = []
             current_start = start_row
             total_rows = 0
             fallback_next = False
 
             while True:
-                request_body = {
-                    "startDate": start_date,
-                    "endDate": end_date,
-                    "dimensions": api_dimensions,
-                    "rowLimit": row_limit,
-                    "startRow": current_start,
-                }
-
-                filters = list(dimension_filters)
-                if country:
-                    filters.append(
-                        {
-                            "dimension": "country",
-                            "operator": "equals",
-                            "expression": country,
-                        }
-                    )
-                if filters:
-                    request_body["dimensionFilterGroups"] = [
-                        {
-                            "groupType": "and",
-                            "filters": filters,
-                        }
-                    ]
+                request_body = dict(body, rowLimit=row_limit, startRow=current_start)
 
                 def _on_retry(attempt_no, max_attempts, wait, exc):
                     if verbose:
@@ -336,7 +555,7 @@ class GSCService:
                             current_start,
                             exc,
                         )
-                    return pd.DataFrame()
+                    raise
                 except Exception as exc:
                     if verbose:
                         logger.error(
@@ -344,18 +563,19 @@ class GSCService:
                             current_start,
                             exc,
                         )
-                    return pd.DataFrame()
+                    raise
 
                 rows = response.get("rows", [])
                 if not rows:
                     break
 
-                all_rows.extend(rows)
                 total_rows += len(rows)
 
                 if verbose:
                     logger.info("Fetched %s rows (startRow=%s)", len(rows), current_start)
 
+                yield rows
+
                 if len(rows) < row_limit:
                     break
                 if total_rows >= max_rows:
@@ -366,43 +586,45 @@ class GSCService:
 
             if fallback_next:
                 continue
-            break
-
-        if not all_rows:
-            return pd.DataFrame()
+            if len(site_candidates) > 1:
+                self._remember_site(site_url, site_candidate)
+            return
 
-        data = []
-        for idx, row in enumerate(all_rows):
+    @staticmethod
+    def _decode_rows(rows: list, api_dimensions: list, offset: int = 0, verbose: bool = False) -> pd.DataFrame:
+        """Decode one page of API rows into columns (dimensions, clicks, impressions, position)."""
+        columns: dict[str, list] = {dim: [] for dim in api_dimensions}
+        clicks, impressions, position = [], [], []
+        n_dims = len(api_dimensions)
+        for idx, row in enumerate(rows, start=offset):
             keys = row.get("keys", [])
-            if len(keys) < len(api_dimensions):
+            if len(keys) < n_dims:
                 if verbose:
                     logger.warning("Skipping row %s due to missing keys: %s", idx, keys)
                 continue
-            row_data = {dim: keys[i] for i, dim in enumerate(api_dimensions)}
-            row_data.update(
-                {
-                    "clicks": row.get("clicks", 0),
-                    "impressions": row.get("impressions", 0),
-                    "position": row.get("position", 0.0),
-                }
-            )
-            data.append(row_data)
-
-        df = pd.DataFrame(data)
-        if df.empty:
-            return df
+            for i, dim in enumerate(api_dimensions):
+                columns[dim].append(keys[i])
+            clicks.append(row.get("clicks", 0))
+            impressions.append(row.get("impressions", 0))
+            position.append(row.get("position", 0.0))
+        if not clicks:
+            return pd.DataFrame()
+        columns.update({"clicks": clicks, "impressions": impressions, "position": position})
+        return pd.DataFrame(columns)
 
+    @staticmethod
+    def _shape_page(df: pd.DataFrame, clean: bool, has_month: bool) -> pd.DataFrame:
+        # clean / month share one pass: page URLs are normalized once (per
+        # unique value) before the single weighted aggregation.
         if clean and "page" in df.columns:
-            df = df.copy()
-            df["page"] = df["page"].apply(self._clean_page)
+            df["page"] = gsc.clean_page(df["page"])
 
         if has_month and "date" in df.columns:
-            df = df.copy()
             df["month"] = pd.to_datetime(df["date"], errors="coerce").dt.strftime("%Y%m")
+        return df
 
-        if clean or has_month:
-            df = self._aggregate(df, dimensions)
-
+    @staticmethod
+    def _select_metrics(df: pd.DataFrame, dimensions: list, metrics: list) -> pd.DataFrame:
         if "ctr" in metrics:
             if "ctr" not in df.columns:
                 denom = df.get("impressions", pd.Series(index=df.index, dtype="float"))
@@ -416,6 +638,199 @@ class GSCService:
         ordered = [col for col in dimensions if col in df.columns] + metrics
         return df[ordered]
 
+    def _iter_frames(
+        self,
+        site_url: str,
+        request: tuple[dict, list, bool],
+        row_limit: int,
+        start_row: int,
+        max_rows: int,
+        max_retries: Optional[int],
+        backoff_factor: Optional[float],
+        clean: bool,
+        verbose: bool,
+    ) -> Iterator[pd.DataFrame]:
+        """Return decoded pages lazily (clean / month applied per row, not aggregated).
+
+        The client and the site_url candidates are resolved here, before the
+        first page is requested, so a missing client raises at the call site.
+        """
+        body, api_dimensions, has_month = request
+        client = self._get_client()
+        max_retries = self._resolve_max_retries(max_retries)
+        backoff_factor = self._resolve_backoff_factor(backoff_factor)
+        site_candidates = self._resolve_site_candidates(site_url)
+        if not site_candidates:
+            return iter(())
+
+        pages = self._iter_row_pages(
+            client,
+            site_url,
+            site_candidates,
+            body,
+            row_limit,
+            start_row,
+            max_rows,
+            max_retries,
+            backoff_factor,
+            verbose,
+        )
+        return self._decode_pages(pages, api_dimensions, has_month, clean, verbose)
+
+    def _decode_pages(
+        self, pages: Iterator[list], api_dimensions: list, has_month: bool, clean: bool, verbose: bool
+    ) -> Iterator[pd.DataFrame]:
+        offset = 0
+        for rows in pages:
+            df = self._decode_rows(rows, api_dimensions, offset, verbose)
+            offset += len(rows)
+            if not df.empty:
+                yield self._shape_page(df, clean, has_month)
+
+    def query(
+        self,
+        site_url: str,
+        start_date: str,
+        end_date: str,
+        dimensions: list,
+        metrics: Optional[list] = None,
+        dimension_filter: Optional[list] = None,
+        country: Optional[str] = None,
+        row_limit: int = 25000,
+        start_row: int = 0,
+        max_rows: int = 100000,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        clean: bool = False,
+        verbose: bool = False,
+    ) -> pd.DataFrame:
+        if metrics is None:
+            metrics = ["clicks", "impressions", "ctr", "position"]
+
+        request = self._build_request(start_date, end_date, dimensions, dimension_filter, country)
+        has_month = request[2]
+        frames = self._iter_frames(
+            site_url, request, row_limit, start_row, max_rows, max_retries, backoff_factor, clean, verbose
+        )
+        try:
+            pages = list(frames)
+        except self._retryable_exceptions():
+            # API / transport errors are logged by _iter_row_pages; query keeps
+            # its empty-frame contract for them.
+            return pd.DataFrame()
+
+        if not pages:
+            return pd.DataFrame()
+        df = pages[0] if len(pages) == 1 else pd.concat(pages, ignore_index=True)
+
+        if clean or has_month:
+            df = self._aggregate(df, dimensions)
+
+        return self._to_session_backend(self._select_metrics(df, dimensions, metrics))
+
+    def iter_pages(
+        self,
+        site_url: str,
+        start_date: str,
+        end_date: str,
+        dimensions: list,
+        metrics: Optional[list] = None,
+        dimension_filter: Optional[list] = None,
+        country: Optional[str] = None,
+        row_limit: int = 25000,
+        start_row: int = 0,
+        max_rows: int = 100000,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        clean: bool = False,
+        verbose: bool = False,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield each Search Console page as a DataFrame as soon as it arrives.
+
+        Pages have the same columns as :meth:`query` but are not aggregated
+        (``clean`` / ``month`` are applied per row, so the same key can appear
+        in several pages). Unlike ``query``, API errors are raised instead of
+        turning the whole pull into an empty frame.
+        """
+        if metrics is None:
+            metrics = ["clicks", "impressions", "ctr", "position"]
+
+        request = self._build_request(start_date, end_date, dimensions, dimension_filter, country)
+        frames = self._iter_frames(
+            site_url, request, row_limit, start_row, max_rows, max_retries, backoff_factor, clean, verbose
+        )
+        return (self._to_session_backend(self._select_metrics(df, dimensions, metrics)) for df in frames)
+
+    def export(
+        self,
+        path,
+        site_url: str,
+        start_date: str,
+        end_date: str,
+        dimensions: list,
+        metrics: Optional[list] = None,
+        dimension_filter: Optional[list] = None,
+        country: Optional[str] = None,
+        row_limit: int = 25000,
+        start_row: int = 0,
+        max_rows: int = 100000,
+        max_retries: Optional[int] = None,
+        backoff_factor: Optional[float] = None,
+        clean: bool = False,
+        verbose: bool = False,
+    ) -> int:
+        """Stream a query to a CSV / Parquet / Feather file and return the rows written.
+
+        Without ``clean`` / ``month`` each page is appended to the file as it
+        arrives, so memory stays at one page. With them, pages are folded into
+        running per-group sums (``gsc.StreamingAggregate``) and the aggregated
+        table is written at the end, so memory is bounded by the number of
+        distinct keys. The file is written to ``<path>.partial`` and moved into
+        place only after the last page, so a failed pull never leaves a
+        truncated file behind.
+        """
+        if metrics is None:
+            metrics = ["clicks", "impressions", "ctr", "position"]
+
+        path = os.fspath(path)
+        request = self._build_request(start_date, end_date, dimensions, dimension_filter, country)
+        frames = self._iter_frames(
+            site_url, request, row_limit, start_row, max_rows, max_retries, backoff_factor, clean, verbose
+        )
+        aggregate = clean or request[2]
+        tmp_path = f"{path}.partial"
+        sink = _open_sink(path, tmp_path)
+        written = 0
+        try:
+            if aggregate:
+                agg = gsc.StreamingAggregate(list(dimensions))
+                for df in frames:
+                    agg.add(df)
+                df = agg.result()
+                if not df.empty:
+                    df = self._to_session_backend(self._select_metrics(df, dimensions, metrics))
+                    sink.write(df)
+                    written = len(df)
+            else:
+                for df in frames:
+                    df = self._to_session_backend(self._select_metrics(df, dimensions, metrics))
+                    sink.write(df)
+                    written += len(df)
+                    if verbose:
+                        logger.info("Wrote %s rows to %s (total %s)", len(df), path, written)
+            if written == 0:
+                sink.write(pd.DataFrame(columns=list(dimensions) + list(metrics)))
+            sink.close()
+        except BaseException:
+            sink.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        if verbose:
+            logger.info("Exported %s rows to %s", written, path)
+        return written
+
     def fetch_sites(
         self,
         sites: list,
@@ -502,8 +917,12 @@ class GSCService:
         entries = response.get("siteEntry") if isinstance(response, dict) else None
         if not entries:
             return []
-        return [
+        sites = [
             entry.get("siteUrl")
             for entry in entries
             if isinstance(entry, dict) and entry.get("siteUrl")
         ]
+        cred = self._credential_key()
+        with self._lock:
+            self._known_sites = {cred: set(sites)}
+        return sites
@@ -6,6 +6,7 @@ from typing import Optional
 import pandas as pd
 
 from .. import errors, gsheet, mount_google_drive
+from ..transform import table
 
 logger = logging.getLogger(__name__)
 
@@ -477,23 +478,12 @@ class SheetsService:
                 print(f"'{sheet_name}' シートへの書き込みに失敗しました: {exc}")
                 return None
 
-        df_existing = df_existing.copy()
-        for key in keys:
-            if key in df_existing.columns:
-                df_existing[key] = df_existing[key].astype(str).str.strip()
-            if key in df_new.columns:
-                df_new[key] = df_new[key].astype(str).str.strip()
-
         try:
-            keys_to_remove = set(tuple(row) for row in df_new[keys].drop_duplicates().values)
-            mask = df_existing[keys].apply(tuple, axis=1).isin(keys_to_remove)
+            df_combined, removed = table.upsert_frames(df_existing, df_new, keys)
         except KeyError as exc:
             print(f"重複判定に必要な列が見つかりません: {exc}")
             return None
 
-        df_cleaned = df_existing[~mask]
-        df_combined = pd.concat([df_cleaned, df_new], ignore_index=True)
-
         sort_cols = sort_by or list(keys)
         if sort_cols:
             missing_sort = [col for col in sort_cols if col not in df_combined.columns]
@@ -526,7 +516,7 @@ class SheetsService:
                 max_retries=max_retries,
                 backoff_factor=backoff_factor,
             )
-            print(f"'{sheet_name}' シートを更新しました（新規 {len(df_new)} 行、削除 {mask.sum()} 行）。")
+            print(f"'{sheet_name}' シートを更新しました（新規 {len(df_new)} 行、削除 {removed} 行）。")
             return df_combined
         except Exception as exc:
             logger.exception("Failed to overwrite sheet '%s' (upsert)", sheet_name)
@@ -105,6 +105,19 @@ def _ensure_deps(*, in_colab: bool, headless: bool = False) -> None:
         importlib.invalidate_caches()
 
 
+def _session_result(app, result):
+    """Apply the session dtype / profile settings (mg.set.dtypes / mg.set.profile) to a run() result."""
+    cfg = getattr(app, "_dtypes", None) or {}
+    if cfg.get("compact"):
+        result = result.compact()
+    if cfg.get("dtype_backend", "numpy") != "numpy":
+        result = result.convert_dtypes(cfg["dtype_backend"])
+    profile = getattr(app, "_profile", None) or {}
+    if profile.get("enabled"):
+        result._profiling = (profile.get("memory", True), profile.get("log", False))
+    return result
+
+
 class Megaton:
     """メガトンはGAを使うアナリストの味方
     """
@@ -124,6 +137,8 @@ class Megaton:
         self._sc_client = None  # Google Search Console client
         self.bq = None  # BigQuery
         self._retry = {}  # session retry defaults (mg.set.retry) for GA4 / Sheets / GSC
+        self._dtypes = {}  # session result dtype settings (mg.set.dtypes)
+        self._profile = {}  # session chain profiling settings (mg.set.profile)
         self.state = MegatonState()
         self.state.headless = headless
         self.bq_service = None  # lazy init (avoid importing BigQuery modules on start import)
@@ -983,23 +998,14 @@ class Megaton:
                         print(f"CSVファイル{new_filename}をupsertで保存しました（{len(df_new)} 行）。")
                     return df_new
 
-                df_existing = df_existing.copy()
-                for key in keys:
-                    if key in df_existing.columns:
-                        df_existing[key] = df_existing[key].astype(str).str.strip()
-                    if key in df_new.columns:
-                        df_new[key] = df_new[key].astype(str).str.strip()
+                from megaton.transform.table import upsert_frames
 
                 try:
-                    keys_to_remove = set(tuple(row) for row in df_new[keys].drop_duplicates().values)
-                    mask = df_existing[keys].apply(tuple, axis=1).isin(keys_to_remove)
+                    df_combined, removed = upsert_frames(df_existing, df_new, keys)
                 except KeyError as exc:
                     print(f"重複判定に必要な列が見つかりません: {exc}")
                     return None
 
-                df_cleaned = df_existing[~mask]
-                df_combined = pd.concat([df_cleaned, df_new], ignore_index=True)
-
                 sort_cols = sort_by or list(keys)
                 if sort_cols:
                     missing_sort = [col for col in sort_cols if col not in df_combined.columns]
@@ -1018,7 +1024,7 @@ class Megaton:
                 if not quiet:
                     print(
                         f"CSVファイル{new_filename}をupsertで更新しました（新規 {len(df_new)} 行、"
-                        f"削除 {mask.sum()} 行）。"
+                        f"削除 {removed} 行）。"
                     )
                 return df_combined
 
@@ -1187,6 +1193,7 @@ class Megaton:
                 filter_d: str | list | tuple | None = None,
                 dimension_filter: str | list | tuple | None = None,
                 clean: bool = False,
+                sink: str | os.PathLike | None = None,
                 **kwargs,
             ):
                 if not self.parent.site:
@@ -1204,6 +1211,22 @@ class Megaton:
                 start_date, end_date = self.parent._resolve_dates()
                 filters = self.parent._parse_dimension_filter(dim_filter)
 
+                if sink is not None:
+                    # Stream pages straight to disk; the pull is never held in memory.
+                    self.parent.parent._gsc_service.export(
+                        sink,
+                        site_url=self.parent.site,
+                        start_date=start_date,
+                        end_date=end_date,
+                        dimensions=dimensions,
+                        metrics=metrics,
+                        row_limit=limit,
+                        dimension_filter=filters,
+                        clean=clean,
+                        **kwargs,
+                    )
+                    return os.fspath(sink)
+
                 result = self.parent.parent._gsc_service.query(
                     site_url=self.parent.site,
                     start_date=start_date,
@@ -1212,19 +1235,12 @@ class Megaton:
                     metrics=metrics,
                     row_limit=limit,
                     dimension_filter=filters,
+                    clean=clean,
                     **kwargs,
                 )
-                
-                # clean=True の場合、_clean_page() を適用
-                if clean and 'page' in result.columns:
-                    from megaton.services.gsc_service import GSCService
-                    result['page'] = result['page'].apply(GSCService._clean_page)
-                    # GSC の重み付き集計を使用
-                    search_result = SearchResult(result, self.parent, dimensions)
-                    result = search_result._aggregate_gsc(result, dimensions)
-                
+
                 self.parent.data = result
-                return SearchResult(result, self.parent, dimensions)
+                return _session_result(self.parent.parent, SearchResult(result, self.parent, dimensions))
 
             def all(
                 self,
@@ -1348,7 +1364,7 @@ class Megaton:
                 if item_key not in new_dimensions:
                     new_dimensions.append(item_key)
                 
-                return SearchResult(combined_df, self.parent, new_dimensions)
+                return _session_result(self.parent.parent, SearchResult(combined_df, self.parent, new_dimensions))
 
         def filter_by_thresholds(self, df: pd.DataFrame, site: dict, clicks_zero_only: bool = False) -> pd.DataFrame:
             """Apply site-specific thresholds to a Search Console DataFrame.
@@ -1924,6 +1940,59 @@ class Megaton:
                     gs.backoff_factor = cfg["backoff_factor"]
             return dict(cfg)
 
+        def dtypes(self, compact=None, dtype_backend=None):
+            """Set how ``mg.report.run`` / ``mg.search.run`` results store data.
+
+            ``compact=True`` returns every result already ``.compact()``-ed:
+            string dimensions as ``category`` and int64 metrics as int32 where
+            the totals fit. Values are unchanged; memory use and groupby time
+            drop on large, repetitive reports.
+
+            ``dtype_backend="pyarrow"`` returns results on Arrow-backed dtypes
+            (``string[pyarrow]`` dimensions, Arrow numeric metrics; see
+            ``.convert_dtypes()``), and GSC pages are converted as they are
+            decoded, so Parquet / Feather exports hand Arrow buffers to pyarrow
+            without copying. ``"numpy_nullable"`` uses pandas' nullable dtypes
+            and ``"numpy"`` restores the default. Missing requirements
+            (pyarrow, pandas>=2) raise here rather than at the first run.
+
+            Only the arguments you pass are changed. Returns the current
+            session dtype config.
+            """
+            cfg = self.parent._dtypes
+            if compact is not None:
+                cfg["compact"] = bool(compact)
+            if dtype_backend is not None:
+                from megaton.transform.table import check_dtype_backend
+
+                check_dtype_backend(dtype_backend)
+                cfg["dtype_backend"] = dtype_backend
+            return dict(cfg)
+
+        def profile(self, enabled=None, memory=None, log=None):
+            """Record per-step profiles of ``mg.report.run`` / ``mg.search.run`` chains.
+
+            With ``enabled=True``, every chain method called on a result
+            returned from then on (``.classify()``, ``.filter_impressions()``,
+            ...) records its wall time, input / output rows, peak memory
+            allocated and whether it aggregated; ``result.profile()`` returns
+            them as a DataFrame. ``memory=False`` skips the allocation tracking
+            (tracemalloc slows the steps it measures); ``log=True`` also logs
+            each step at INFO level on the ``megaton.profiling`` logger.
+            ``megaton.profiling.enabled()`` does the same for a ``with`` block.
+
+            Only the arguments you pass are changed. Returns the current
+            session profile config.
+            """
+            cfg = self.parent._profile
+            if enabled is not None:
+                cfg["enabled"] = bool(enabled)
+            if memory is not None:
+                cfg["memory"] = bool(memory)
+            if log is not None:
+                cfg["log"] = bool(log)
+            return dict(cfg)
+
     class Show:
         def __init__(self, parent):
             self.parent = parent
@@ -2265,14 +2334,14 @@ class Megaton:
                     self.parent.data = merged
                     if show:
                         self.parent.show()
-                    return ReportResult(self.parent.data, dim_cols)
+                    return _session_result(self.parent.parent, ReportResult(self.parent.data, dim_cols))
 
                 _, dim_cols, _, _ = self._split_defs(d)
                 df = self._run_single(d, m, filter_d=filter_d, filter_m=filter_m, sort=sort, **kwargs)
                 if show:
                     self.parent.show()
                 if isinstance(df, pd.DataFrame):
-                    return ReportResult(df, dim_cols)
+                    return _session_result(self.parent.parent, ReportResult(df, dim_cols))
                 return None
 
             def ranges(
@@ -2760,7 +2829,7 @@ class Megaton:
                     if col not in dimensions:
                         dimensions.append(col)
                 
-                return ReportResult(combined_df, dimensions)
+                return _session_result(self.parent.parent, ReportResult(combined_df, dimensions))
 
         def show(self):
             """Displays dataframe"""
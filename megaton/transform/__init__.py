@@ -1,21 +1,28 @@
 from .classify import classify_by_regex, infer_label_by_domain
 from .ga4 import classify_channel, convert_filter_to_event_scope
 from .table import (
+    compact_frame,
+    convert_backend,
     dedup_by_key,
     fillna_int,
     ensure_columns,
     group_sum,
     normalize_key_cols,
     normalize_thresholds_df,
+    upsert_frames,
     weighted_avg,
 )
 from .text import clean_url, force_text_if_numeric, map_by_regex, normalize_whitespace
 from .traffic import (
+    SourceNormalizer,
     apply_source_normalization,
     ensure_trailing_slash,
     is_non_public_dev_source,
+    non_public_dev_sources,
     normalize_domain,
+    normalize_domains,
     source_host,
+    source_hosts,
 )
 
 __all__ = [
@@ -24,19 +31,26 @@ __all__ = [
     "normalize_whitespace",
     "force_text_if_numeric",
     "ensure_columns",
+    "compact_frame",
+    "convert_backend",
     "fillna_int",
     "normalize_key_cols",
     "normalize_thresholds_df",
     "dedup_by_key",
     "group_sum",
     "weighted_avg",
+    "upsert_frames",
     "classify_channel",
     "convert_filter_to_event_scope",
     "classify_by_regex",
     "infer_label_by_domain",
     "normalize_domain",
+    "normalize_domains",
     "source_host",
+    "source_hosts",
     "is_non_public_dev_source",
+    "non_public_dev_sources",
     "ensure_trailing_slash",
     "apply_source_normalization",
+    "SourceNormalizer",
 ]
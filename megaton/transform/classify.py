@@ -1,23 +1,20 @@
 from __future__ import annotations
 
-import re
 from urllib.parse import urlparse
 
+from .text import RegexMapper
+
 
 def classify_by_regex(df, src_col, mapping, out_col, default="other"):
     if src_col not in df.columns:
         raise ValueError(f"Missing source column: {src_col}")
 
+    mapper = RegexMapper(mapping)
+
     def _classify(value):
         if not isinstance(value, str):
             return default
-        for pattern, label in mapping.items():
-            try:
-                if re.search(pattern, value):
-                    return label
-            except re.error:
-                continue
-        return default
+        return mapper.lookup(value, default)
 
     result = df.copy()
     result[out_col] = result[src_col].apply(_classify)
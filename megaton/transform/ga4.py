@@ -3,8 +3,11 @@ from __future__ import annotations
 import re
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+from . import parallel
+
 
 def convert_filter_to_event_scope(filter_d: Optional[str]) -> Optional[str]:
     """session系フィルタディメンションをevent系に変換
@@ -82,6 +85,9 @@ def classify_source_channel(
     
     megatonの既存ロジックをベースに、sourceとchannelの両方を返す版。
     AI判定は正規表現を使った網羅的なパターンマッチングを使用。
+    判定はユニークな (channel, medium, source) の組ごとに 1 回だけ行うため、
+    行数が多くても組の種類数に応じた時間で終わる。組が多い場合は
+    ``parallel.workers(n)`` の中で呼ぶと複数プロセスで判定する。
     
     Args:
         df: データフレーム
@@ -227,65 +233,118 @@ def classify_source_channel(
     normalized_sns_names = set(channel_patterns["Organic Social"]["normalize"].keys())
     
     # ======================
-    # 判定関数
+    # ユニークな (channel, medium, source) の組ごとに判定
     # ======================
-    
-    def _normalize_source(src: str) -> str:
-        """source文字列を正規化"""
-        for pattern, replacement in source_normalize_compiled:
-            if pattern.search(src):
-                return replacement
-        return src
-    
-    def _classify_row(row):
-        """1行ごとに(source, channel)のタプルを返す"""
-        channel = str(row.get(channel_col, ""))
-        medium = str(row.get(medium_col, "")).lower()
-        source_raw = str(row.get(source_col, ""))
-        source = source_raw.lower().replace("www.", "")
-        
-        # 先に正規化
-        normalized = _normalize_source(source_raw)
-        
-        # AI判定
-        if channel_detect_patterns.get("AI") and (
-            channel_detect_patterns["AI"].search(source) or 
-            channel_detect_patterns["AI"].search(medium)
-        ):
-            return normalized, "AI"
-        
-        # Map判定（既存ロジック）
-        if medium == "map" or "maps." in source or ".maps." in source:
-            return normalized, "Map"
-        
-        # Referralの再分類
-        if channel == "Referral":
-            # Organic Search判定
-            if channel_detect_patterns.get("Organic Search") and \
-               channel_detect_patterns["Organic Search"].search(source):
-                return normalized, "Organic Search"
-            
-            # Organic Social判定
-            # 1. 正規化済みSNS名かチェック
-            if normalized in normalized_sns_names:
-                return normalized, "Organic Social"
-            # 2. 追加のSNSパターン
-            if channel_detect_patterns.get("Organic Social") and \
-               channel_detect_patterns["Organic Social"].search(source):
-                return normalized, "Organic Social"
-            
-            # カスタムチャネル判定（Groupなど）
-            for channel_name, pattern in channel_detect_patterns.items():
-                if channel_name not in ["AI", "Organic Search", "Organic Social"]:
-                    if pattern.search(source):
-                        return normalized, channel_name
-        
-        # fallback
-        return normalized, channel
-    
-    result = df.apply(_classify_row, axis=1, result_type="expand")
-    result.columns = [source_col, channel_col]
-    return result
+    # 行ごとの str() と同じ文字列で判定し、各パターンはユニークな組に 1 回だけ適用する
+    index = df.index
+    if medium_col in df.columns:
+        medium_codes, medium_labels = _str_codes(df[medium_col])
+    else:
+        medium_codes, medium_labels = np.zeros(len(df), dtype=np.intp), [""]
+    triple_codes, (channels, mediums, sources_raw) = _combine_codes([
+        _str_codes(df[channel_col]),
+        (medium_codes, medium_labels),
+        _str_codes(df[source_col]),
+    ])
+
+    def _search(pattern, values):
+        return np.array([pattern.search(value) is not None for value in values], dtype=bool)
+
+    def _classify(start, stop):
+        """(正規化した source, channel) をユニークな組 [start, stop) について返す"""
+        channel_part = channels[start:stop]
+        sources_part = sources_raw[start:stop]
+        medium_part = [medium.lower() for medium in mediums[start:stop]]
+        sources = [source.lower().replace("www.", "") for source in sources_part]
+
+        # source 正規化: 最初にマッチしたパターンの表示名（なければ元の値）
+        normalized = np.array(sources_part, dtype=object)
+        if source_normalize_compiled:
+            normalized = np.select(
+                [_search(pattern, sources_part) for pattern, _ in source_normalize_compiled],
+                [replacement for _, replacement in source_normalize_compiled],
+                default=normalized,
+            )
+
+        # 判定（優先順: AI → Map → Referral の再分類 → 元の channel）
+        conditions, choices = [], []
+        ai = channel_detect_patterns.get("AI")
+        if ai:
+            conditions.append(_search(ai, sources) | _search(ai, medium_part))
+            choices.append("AI")
+        conditions.append(np.array([m == "map" or "maps." in s for m, s in zip(medium_part, sources)], dtype=bool))
+        choices.append("Map")
+
+        referral = np.array([channel == "Referral" for channel in channel_part], dtype=bool)
+        if channel_detect_patterns.get("Organic Search"):
+            conditions.append(referral & _search(channel_detect_patterns["Organic Search"], sources))
+            choices.append("Organic Search")
+        social = np.array([value in normalized_sns_names for value in normalized], dtype=bool)
+        if channel_detect_patterns.get("Organic Social"):
+            social |= _search(channel_detect_patterns["Organic Social"], sources)
+        conditions.append(referral & social)
+        choices.append("Organic Social")
+        # カスタムチャネル判定（Groupなど）
+        for channel_name, pattern in channel_detect_patterns.items():
+            if channel_name not in ["AI", "Organic Search", "Organic Social"]:
+                conditions.append(referral & _search(pattern, sources))
+                choices.append(channel_name)
+
+        channel_values = np.select(conditions, choices, default=np.array(channel_part, dtype=object))
+        return normalized, channel_values
+
+    # 組が多い場合は parallel.workers() の指定に従って複数プロセスで判定する
+    chunks = parallel.map_chunks(_classify, len(channels))
+    if chunks is None:
+        normalized, channel_values = _classify(0, len(channels))
+    else:
+        normalized = np.concatenate([chunk[0] for chunk in chunks])
+        channel_values = np.concatenate([chunk[1] for chunk in chunks])
+    return pd.DataFrame(
+        {
+            source_col: normalized[triple_codes],
+            channel_col: channel_values[triple_codes],
+        },
+        index=index,
+    )
+
+
+def _str_codes(series: pd.Series) -> tuple[np.ndarray, list[str]]:
+    """Codes of ``series`` and the distinct ``str(value)`` they stand for.
+
+    Missing values keep their own ``str()`` ("nan", "None", ...), as in a
+    row-wise ``str(row[col])``.
+    """
+    codes, uniques = pd.factorize(series)
+    labels = [str(value) for value in uniques]
+    missing = codes < 0
+    if missing.any():
+        na_codes, na_labels = pd.factorize(
+            np.array([str(value) for value in series.to_numpy(dtype=object)[missing]], dtype=object)
+        )
+        codes = codes.copy()
+        codes[missing] = na_codes + len(labels)
+        labels.extend(na_labels)
+    return codes, labels
+
+
+def _combine_codes(parts: list[tuple[np.ndarray, list[str]]]) -> tuple[np.ndarray, list[list[str]]]:
+    """Factorize the row-wise combination of several ``(codes, labels)`` columns.
+
+    Returns the combined code of every row and, per column, the label of each
+    distinct combination.
+    """
+    key = np.zeros(len(parts[0][0]), dtype=np.int64)
+    for codes, labels in parts:
+        key = key * max(len(labels), 1) + codes
+    combined, uniques = pd.factorize(key)
+    uniques = np.asarray(uniques, dtype=np.int64)
+    columns: list[list[str]] = []
+    for codes, labels in reversed(parts):
+        size = max(len(labels), 1)
+        uniques, part = np.divmod(uniques, size)
+        columns.append([labels[code] for code in part])
+    return combined, columns[::-1]
 
 
 def classify_channel(
@@ -0,0 +1,163 @@
+"""Search Console table primitives (page URL cleaning, weighted aggregation).
+
+Shared by ``GSCService.query(clean=True)`` and ``SearchResult`` so the
+service and the result chain normalize and aggregate through one code path.
+"""
+
+from __future__ import annotations
+
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from .text import apply_unique
+
+
+def clean_page_value(value: object) -> str:
+    """Normalize one page URL: decode %xx, drop ?query and #fragment, lowercase."""
+    try:
+        return unquote(str(value)).split("?", 1)[0].split("#", 1)[0].strip().lower()
+    except Exception:
+        return str(value)
+
+
+def clean_page(series: pd.Series) -> pd.Series:
+    """Apply :func:`clean_page_value` to a Series (once per unique value).
+
+    Always returns an object-dtype Series aligned with ``series``.
+    """
+    return apply_unique(series, clean_page_value).astype(object)
+
+
+def _sum_metrics(df: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
+    """Group ``df`` by ``dims`` and sum clicks / impressions / weighted position.
+
+    ``weighted_position`` (position * impressions) is additive, so partial
+    sums from separate chunks can be combined by summing them again.
+    """
+    metric_cols = [col for col in ["clicks", "impressions"] if col in df.columns]
+    # Only the key and metric columns are materialized (no full-frame copy).
+    work = df[list(dims) + metric_cols]
+    if "position" in df.columns and "impressions" in df.columns:
+        work = work.assign(weighted_position=df["position"] * df["impressions"])
+        metric_cols = metric_cols + ["weighted_position"]
+    return work.groupby(list(dims), as_index=False, observed=True)[metric_cols].sum()
+
+
+def _finish_sums(grouped: pd.DataFrame, with_ctr: bool) -> pd.DataFrame:
+    if "weighted_position" in grouped.columns:
+        grouped["position"] = (grouped["weighted_position"] / grouped["impressions"]).round(6)
+        grouped = grouped.drop(columns=["weighted_position"])
+
+    if with_ctr and "clicks" in grouped.columns and "impressions" in grouped.columns:
+        grouped["ctr"] = (grouped["clicks"] / grouped["impressions"].replace(0, float("nan"))).fillna(0)
+
+    return grouped
+
+
+def aggregate(df: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
+    """Aggregate GSC metrics by ``dims``.
+
+    clicks / impressions are summed, position becomes the impression-weighted
+    average (rounded to 6 digits), and ctr is recomputed when the input had a
+    ``ctr`` column. Frames without metric columns are returned unchanged.
+    """
+    if df.empty:
+        return df
+
+    if "clicks" not in df.columns and "impressions" not in df.columns:
+        return df
+
+    return _finish_sums(_sum_metrics(df, dims), "ctr" in df.columns)
+
+
+def aggregate_with_top(
+    df: pd.DataFrame,
+    dims: list[str],
+    column: str,
+    prefer_by: str,
+    ascending: bool = False,
+) -> pd.DataFrame:
+    """:func:`aggregate` plus, per group, ``column`` taken from the group's top row.
+
+    The top row has the largest ``prefer_by`` (smallest with ``ascending``);
+    ties go to the earliest row and rows with a missing ``prefer_by`` win only
+    when the whole group is missing. That is the row a stable sort by
+    ``dims + [prefer_by]`` followed by ``drop_duplicates(keep='first')``
+    keeps. The sums and the top row come from one groupby, and ``column`` is
+    appended after the metric columns.
+
+    ``prefer_by`` must be numeric without infinities (they would tie with
+    the fill used for missing values); ``df`` must be non-empty and have
+    clicks or impressions.
+    """
+    metric_cols = [col for col in ["clicks", "impressions"] if col in df.columns]
+    score = pd.to_numeric(df[prefer_by]).to_numpy(dtype=float, na_value=np.nan)
+    score = np.where(np.isnan(score), np.inf if ascending else -np.inf, score)
+
+    # Positional index so idxmax/idxmin return row positions.
+    work = df[list(dims) + metric_cols].set_axis(pd.RangeIndex(len(df)))
+    if "position" in df.columns and "impressions" in df.columns:
+        work = work.assign(weighted_position=(df["position"] * df["impressions"]).to_numpy())
+        metric_cols = metric_cols + ["weighted_position"]
+    work = work.assign(_top_score=score)
+
+    groups = work.groupby(list(dims), observed=True)
+    sums = groups[metric_cols].sum()
+    top = groups["_top_score"].idxmin() if ascending else groups["_top_score"].idxmax()
+
+    grouped = _finish_sums(sums.reset_index(), "ctr" in df.columns)
+    grouped[column] = df[column].iloc[top.to_numpy()].reset_index(drop=True)
+    return grouped
+
+
+class StreamingAggregate:
+    """Incremental :func:`aggregate` over chunks that arrive one at a time.
+
+    Each chunk is reduced to per-group partial sums and buffered; the buffer
+    is folded into the running table once it holds at least ``fold_rows``
+    rows and at least as many rows as the table (so each row is regrouped a
+    bounded number of times), and once more in :meth:`result`. Memory is
+    bounded by the number of distinct groups plus the buffer rather than by
+    the number of input rows. :meth:`result` matches ``aggregate`` on the
+    concatenated chunks (up to float summation order before rounding).
+    """
+
+    FOLD_ROWS = 500_000
+
+    def __init__(self, dims: list[str], fold_rows: int | None = None):
+        self.dims = list(dims)
+        self.fold_rows = self.FOLD_ROWS if fold_rows is None else fold_rows
+        self._sums: pd.DataFrame | None = None
+        self._parts: list[pd.DataFrame] = []
+        self._buffered = 0
+        self._with_ctr = False
+
+    def add(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        self._with_ctr = self._with_ctr or "ctr" in df.columns
+        part = _sum_metrics(df, self.dims)
+        self._parts.append(part)
+        self._buffered += len(part)
+        if self._buffered >= max(self.fold_rows, 0 if self._sums is None else len(self._sums)):
+            self._fold()
+
+    def _fold(self) -> None:
+        parts = self._parts if self._sums is None else [self._sums] + self._parts
+        self._parts, self._buffered = [], 0
+        if not parts:
+            return
+        if len(parts) == 1:
+            self._sums = parts[0]
+            return
+        combined = pd.concat(parts, ignore_index=True)
+        value_cols = [col for col in combined.columns if col not in self.dims]
+        self._sums = combined.groupby(self.dims, as_index=False, observed=True)[value_cols].sum()
+
+    def result(self) -> pd.DataFrame:
+        self._fold()
+        if self._sums is None:
+            return pd.DataFrame()
+        return _finish_sums(self._sums.copy(), self._with_ctr)
@@ -0,0 +1,113 @@
+"""Process-pool execution of per-value transforms (opt-in).
+
+Row-independent transforms run once per distinct value
+(:func:`megaton.transform.text.transform_unique`, ``classify_source_channel``).
+Inside ``with workers(n):`` (or on a result switched with
+``with_workers(n)``), a call with at least ``min_values`` distinct values
+splits them into ``n`` contiguous chunks and runs each chunk in a forked
+worker process. Workers read their input from memory inherited at fork
+time (copy-on-write), so neither the frame nor the values are pickled on
+the way in; only each chunk's transformed values come back, and chunks are
+reassembled in order. Smaller inputs run in-process.
+
+Needs the ``fork`` start method (Linux, including Colab). Where it is not
+available, everything runs in-process.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+# Below this many distinct values the pool start-up costs more than it saves.
+MIN_VALUES = 50_000
+
+_settings: ContextVar[tuple[int, int]] = ContextVar("megaton_parallel", default=(1, MIN_VALUES))
+
+
+def check_workers(n: int, min_values: int = MIN_VALUES) -> None:
+    """Validate ``workers`` arguments; fail before any work is done."""
+    if isinstance(n, bool) or not isinstance(n, int) or n < 1:
+        raise ValueError(f"workers must be a positive int, got {n!r}")
+    if isinstance(min_values, bool) or not isinstance(min_values, int) or min_values < 1:
+        raise ValueError(f"min_values must be a positive int, got {min_values!r}")
+
+
+@contextmanager
+def workers(n: int, min_values: int = MIN_VALUES) -> Iterator[None]:
+    """Run per-value transforms in ``n`` processes within the block.
+
+    ``n=1`` runs everything in-process. ``min_values`` is the smallest
+    number of distinct values worth a pool.
+    """
+    check_workers(n, min_values)
+    token = _settings.set((n, min_values))
+    try:
+        yield
+    finally:
+        _settings.reset(token)
+
+
+def pool_size(n_items: int) -> int:
+    """Number of processes to use for ``n_items`` values (1: run in-process)."""
+    n, min_values = _settings.get()
+    if n <= 1 or n_items < min_values or "fork" not in multiprocessing.get_all_start_methods():
+        return 1
+    return min(n, n_items)
+
+
+def _work(func: Callable[[int, int], Any], start: int, stop: int, conn) -> None:
+    # Nested transforms inside a worker run in-process.
+    _settings.set((1, MIN_VALUES))
+    try:
+        message = ("ok", func(start, stop))
+    except BaseException as exc:  # re-raised in the parent
+        message = ("error", exc)
+    try:
+        conn.send(message)
+    except Exception as exc:  # unpicklable result or exception
+        conn.send(("error", RuntimeError(f"parallel worker failed: {exc!r}")))
+    finally:
+        conn.close()
+
+
+def map_chunks(func: Callable[[int, int], Any], n_items: int) -> list[Any] | None:
+    """Run ``func(start, stop)`` over contiguous chunks of ``range(n_items)`` in worker processes.
+
+    ``func`` reads its input from the caller's memory (closures are fine; it
+    is inherited by the forked workers, never pickled) and returns a
+    picklable result per chunk. Returns the chunk results in order, or None
+    when the work should run in-process (pooling disabled, too few items, or
+    no ``fork``). An exception raised by ``func`` is raised here.
+    """
+    size = pool_size(n_items)
+    if size <= 1:
+        return None
+    step, extra = divmod(n_items, size)
+    context = multiprocessing.get_context("fork")
+    processes, pipes = [], []
+    start = 0
+    try:
+        for i in range(size):
+            stop = start + step + (1 if i < extra else 0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_work, args=(func, start, stop, sender), daemon=True)
+            process.start()
+            sender.close()
+            processes.append(process)
+            pipes.append(receiver)
+            start = stop
+        messages = [receiver.recv() for receiver in pipes]
+    finally:
+        for receiver in pipes:
+            receiver.close()
+        for process in processes:
+            process.join()
+    results = []
+    for status, value in messages:
+        if status == "error":
+            raise value
+        results.append(value)
+    return results
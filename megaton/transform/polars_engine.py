@@ -0,0 +1,167 @@
+"""Polars execution engine for the aggregations of result chains (optional).
+
+``SearchResult`` / ``ReportResult`` switched to ``with_engine("polars")`` run
+their group-bys here: the frame is handed to Polars once, grouped in a
+multi-threaded lazy query, and converted back to pandas. Only the heavy part
+(the per-group reductions) runs in Polars; the output is sorted and finished
+(weighted position, ctr) with the same pandas code as the default engine, so
+the results match it value for value (up to float summation order).
+
+Requires ``polars`` and ``pyarrow`` (used by Polars for the pandas
+conversion). The functions mirror :mod:`megaton.transform.gsc` and
+``ReportResult.group``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .gsc import _finish_sums
+
+ENGINES = ("pandas", "polars")
+
+# ReportResult.group methods with a Polars implementation (others use pandas).
+GROUP_METHODS = ("sum", "mean", "count", "min", "max")
+
+
+def _polars():
+    try:
+        import polars as pl
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            "engine='polars' requires polars and pyarrow. Install them with `pip install polars pyarrow`."
+        ) from exc
+    return pl
+
+
+def check_engine(engine: str) -> None:
+    """Validate ``engine`` and its requirements; fail before any work is done."""
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    if engine == "polars":
+        _polars()
+
+
+def _collect_groups(source: pd.DataFrame, frame, keys: list[str], aggs: list, dropna: bool) -> pd.DataFrame:
+    """Group ``frame`` (Polars, built from ``source``) and return the sorted pandas result.
+
+    Groups come back in pandas ``groupby(sort=True)`` order, missing keys
+    last. Polars sorts strings and numbers the same way pandas does; category
+    keys are sorted in pandas instead, by their original categories.
+    """
+    pl = _polars()
+    query = frame.lazy()
+    if dropna:
+        query = query.filter(pl.all_horizontal([pl.col(key).is_not_null() for key in keys]))
+    query = query.group_by(keys).agg(aggs)
+    categorical = [key for key in keys if isinstance(source[key].dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return query.sort(keys, nulls_last=True).collect().to_pandas()
+
+    out = query.collect().to_pandas()
+    for key in categorical:
+        dtype = source[key].dtype
+        # astype() is a no-op between unordered dtypes that differ only in
+        # category order, so set the original categories explicitly.
+        values = out[key] if isinstance(out[key].dtype, pd.CategoricalDtype) else out[key].astype("category")
+        out[key] = values.cat.set_categories(dtype.categories, ordered=dtype.ordered)
+    return out.sort_values(keys, kind="stable", ignore_index=True)
+
+
+def aggregate(df: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
+    """:func:`megaton.transform.gsc.aggregate` with the sums computed by Polars."""
+    if df.empty:
+        return df
+
+    if "clicks" not in df.columns and "impressions" not in df.columns:
+        return df
+
+    pl = _polars()
+    dims = list(dims)
+    metric_cols = [col for col in ["clicks", "impressions"] if col in df.columns]
+    weighted = "position" in df.columns and "impressions" in df.columns
+    frame = pl.from_pandas(df[dims + metric_cols + (["position"] if weighted else [])])
+
+    aggs = [pl.col(col).sum() for col in metric_cols]
+    if weighted:
+        aggs.append((pl.col("position") * pl.col("impressions")).sum().alias("weighted_position"))
+    sums = _collect_groups(df, frame, dims, aggs, dropna=True)
+    return _finish_sums(sums, "ctr" in df.columns)
+
+
+def aggregate_with_top(
+    df: pd.DataFrame,
+    dims: list[str],
+    column: str,
+    prefer_by: str,
+    ascending: bool = False,
+) -> pd.DataFrame:
+    """:func:`megaton.transform.gsc.aggregate_with_top` computed by Polars.
+
+    Same preconditions. The top row is the first arg-max (arg-min) of the
+    score within its group, i.e. the earliest row on ties.
+    """
+    pl = _polars()
+    dims = list(dims)
+    metric_cols = [col for col in ["clicks", "impressions"] if col in df.columns]
+    score = pd.to_numeric(df[prefer_by]).to_numpy(dtype=float, na_value=np.nan)
+    score = np.where(np.isnan(score), np.inf if ascending else -np.inf, score)
+
+    work = df[dims + metric_cols].assign(_top_value=df[column].to_numpy(), _top_score=score)
+    aggs = [pl.col(col).sum() for col in metric_cols]
+    if "position" in df.columns and "impressions" in df.columns:
+        work = work.assign(weighted_position=(df["position"] * df["impressions"]).to_numpy())
+        aggs.append(pl.col("weighted_position").sum())
+    best = pl.col("_top_score").arg_min() if ascending else pl.col("_top_score").arg_max()
+    aggs.append(pl.col("_top_value").get(best))
+
+    sums = _collect_groups(df, pl.from_pandas(work), dims, aggs, dropna=True)
+    top = sums.pop("_top_value")
+    grouped = _finish_sums(sums, "ctr" in df.columns)
+    grouped[column] = top
+    return grouped
+
+
+def can_group(df: pd.DataFrame, metrics: list[str], method: str, min_count: int | None) -> bool:
+    """True when :func:`group` reproduces ``ReportResult.group`` for these arguments."""
+    if method not in GROUP_METHODS or (min_count is not None and method != "sum"):
+        return False
+    return all(
+        pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+        for col in metrics
+    )
+
+
+def group(
+    df: pd.DataFrame,
+    by: list[str],
+    metrics: list[str],
+    method: str = "sum",
+    *,
+    dropna: bool = True,
+    min_count: int | None = None,
+) -> pd.DataFrame:
+    """``ReportResult.group`` (``groupby(by)[metrics].agg(method)``) computed by Polars.
+
+    Only for arguments accepted by :func:`can_group` (numeric metrics; sum /
+    mean / count / min / max). Missing values are skipped as in pandas:
+    ``sum`` of an all-missing group is 0 (missing with ``min_count``),
+    ``mean`` / ``min`` / ``max`` are missing.
+    """
+    pl = _polars()
+    by = list(by)
+    frame = pl.from_pandas(df[by + [col for col in metrics if col not in by]])
+
+    aggs = []
+    for col in metrics:
+        expr = pl.col(col)
+        if method == "count":
+            agg = expr.is_not_null().sum().cast(pl.Int64)
+        elif method == "sum" and min_count is not None:
+            agg = pl.when(expr.is_not_null().sum() >= min_count).then(expr.sum()).otherwise(None)
+        else:
+            agg = getattr(expr, method)()
+        aggs.append(agg.alias(col))
+    return _collect_groups(df, frame, by, aggs, dropna=dropna)
@@ -3,6 +3,8 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from .text import _is_text_column, transform_unique
+
 
 def ensure_columns(df, columns, fill=None, drop_extra=True):
     result = df.copy()
@@ -15,6 +17,30 @@ def ensure_columns(df, columns, fill=None, drop_extra=True):
     return result
 
 
+def _normalize_key_strings(series, strip, lower, remove_trailing_dot0):
+    def normalize(sample):
+        sample = sample.astype(str)
+        if remove_trailing_dot0:
+            sample = sample.str.replace(r"\.0$", "", regex=True)
+        if strip:
+            sample = sample.str.strip()
+        if lower:
+            sample = sample.str.lower()
+        return sample
+
+    # Text and integer keys repeat a lot (one row per date / page / query);
+    # normalize each distinct value once. Floats are excluded because hashing
+    # treats 0.0 and -0.0 as one key, and categoricals because astype(str)
+    # turns them into plain strings.
+    dtype = series.dtype
+    per_unique = not isinstance(dtype, pd.CategoricalDtype) and (
+        (isinstance(dtype, np.dtype) and dtype.kind in "iu") or _is_text_column(series)
+    )
+    if len(series) > 1 and per_unique:
+        return transform_unique(series, [normalize])
+    return normalize(series)
+
+
 def normalize_key_cols(
     df,
     cols,
@@ -22,79 +48,175 @@ def normalize_key_cols(
     strip=True,
     lower=False,
     remove_trailing_dot0=True,
+    copy=True,
 ):
+    """Unify the type and notation of key columns (``str``, stripped, no trailing ``.0``).
+
+    The string operations run once per distinct value. With ``copy=False``
+    the columns are replaced in ``df`` itself, which is also returned.
+    """
     missing = [col for col in cols if col not in df.columns]
     if missing:
         raise ValueError(f"Missing columns: {missing}")
 
-    result = df.copy()
+    converted = {}
     for col in cols:
-        series = result[col]
         if to_str:
-            series = series.astype(str)
-            if remove_trailing_dot0:
-                series = series.str.replace(r"\.0$", "", regex=True)
-            if strip:
-                series = series.str.strip()
-            if lower:
-                series = series.str.lower()
-        result[col] = series
-    return result
+            converted[col] = _normalize_key_strings(df[col], strip, lower, remove_trailing_dot0)
+    if not copy:
+        for col, series in converted.items():
+            df[col] = series
+        return df
+    return df.assign(**converted)
+
 
+def _prefer_scores(series, ascending):
+    """``series`` as float scores where a missing value never wins, or None.
 
-def dedup_by_key(df, key_cols, prefer_by=None, prefer_ascending=False, keep="first"):
+    None when the column is not numeric or holds infinities (they would tie
+    with the fill used for missing values).
+    """
+    if not pd.api.types.is_numeric_dtype(series):
+        return None
+    score = series.to_numpy(dtype=float, na_value=np.nan)
+    if np.isinf(score).any():
+        return None
+    return np.where(np.isnan(score), np.inf if ascending else -np.inf, score)
+
+
+def _sortable_key(series):
+    """True when groupby orders ``series`` as ``sort_values`` does (not mixed objects)."""
+    return series.dtype != object or _is_text_column(series)
+
+
+def dedup_by_key(df, key_cols, prefer_by=None, prefer_ascending=False, keep="first", copy=True):
+    """Keep one row per ``key_cols``.
+
+    With ``prefer_by`` the kept row is the one a stable sort by
+    ``key_cols + prefer_by`` followed by ``drop_duplicates(keep=keep)`` keeps,
+    and rows come back in key order. For one numeric ``prefer_by`` column and
+    ``keep="first"`` that row is found with one groupby ``idxmax`` /
+    ``idxmin`` instead of sorting the frame; otherwise only the key and
+    ``prefer_by`` columns are sorted. The input is never copied. With
+    ``copy=False``, ``df`` itself is returned when no row is dropped or
+    reordered.
+    """
     missing = [col for col in key_cols if col not in df.columns]
     if missing:
         raise ValueError(f"Missing key columns: {missing}")
 
-    result = df.copy()
-    if prefer_by:
-        prefer_cols = [prefer_by] if isinstance(prefer_by, str) else list(prefer_by)
-        missing_prefer = [col for col in prefer_cols if col not in result.columns]
-        if missing_prefer:
-            raise ValueError(f"Missing prefer_by columns: {missing_prefer}")
-        sort_cols = list(key_cols) + prefer_cols
-        # prefer_ascending=True: 最小値を選択（position等）, False: 最大値を選択（default）
-        ascending = [True] * len(key_cols) + [prefer_ascending] * len(prefer_cols)
-        result = result.sort_values(by=sort_cols, ascending=ascending)
+    if not prefer_by:
+        positions = np.flatnonzero(~df.duplicated(subset=key_cols, keep=keep).to_numpy())
+        return _take_rows(df, positions, copy)
+
+    prefer_cols = [prefer_by] if isinstance(prefer_by, str) else list(prefer_by)
+    missing_prefer = [col for col in prefer_cols if col not in df.columns]
+    if missing_prefer:
+        raise ValueError(f"Missing prefer_by columns: {missing_prefer}")
+
+    key_cols = list(key_cols)
+    score = None
+    if keep == "first" and len(prefer_cols) == 1 and len(df) and all(_sortable_key(df[col]) for col in key_cols):
+        score = _prefer_scores(df[prefer_cols[0]], prefer_ascending)
+    if score is not None:
+        # Positional index so idxmax/idxmin return row positions. Missing keys
+        # form their own group, sorted last, as drop_duplicates / sort_values do.
+        work = df[key_cols].set_axis(pd.RangeIndex(len(df))).assign(_top_score=score)
+        groups = work.groupby(key_cols, sort=True, dropna=False, observed=True)["_top_score"]
+        top = groups.idxmin() if prefer_ascending else groups.idxmax()
+        return _take_rows(df, top.to_numpy(), copy)
+
+    # prefer_ascending=True: 最小値を選択（position等）, False: 最大値を選択（default）
+    ascending = [True] * len(key_cols) + [prefer_ascending] * len(prefer_cols)
+    work = df[list(dict.fromkeys(key_cols + prefer_cols))].set_axis(pd.RangeIndex(len(df)))
+    work = work.sort_values(by=key_cols + prefer_cols, ascending=ascending)
+    positions = work.drop_duplicates(subset=key_cols, keep=keep).index.to_numpy()
+    return _take_rows(df, positions, copy)
+
+
+def _take_rows(df, positions, copy):
+    """``df.iloc[positions]``, or ``df`` itself for ``copy=False`` when that is every row in order."""
+    if not copy and len(positions) == len(df) and (positions == np.arange(len(df))).all():
+        return df
+    return df.iloc[positions]
 
-    return result.drop_duplicates(subset=key_cols, keep=keep)
 
+def upsert_frames(existing, new, keys):
+    """Replace the rows of ``existing`` whose keys appear in ``new``.
 
-def fillna_int(df, cols):
+    Key columns of both frames are compared as stripped strings
+    (``astype(str).str.strip()``, also applied to the returned rows). The
+    rows to drop are found with one vectorized MultiIndex lookup instead of
+    per-row tuples. Returns ``(combined, removed)``: the kept rows of
+    ``existing`` followed by ``new`` (fresh index), and how many rows were
+    dropped. Raises ``KeyError`` when a key column is missing from either
+    frame.
+    """
+    keys = list(keys)
+    existing = existing.assign(**{
+        key: _normalize_key_strings(existing[key], True, False, False) for key in keys if key in existing.columns
+    })
+    new = new.assign(**{
+        key: _normalize_key_strings(new[key], True, False, False) for key in keys if key in new.columns
+    })
+    new_keys = new[keys]
+    existing_keys = existing[keys]
+    mask = pd.MultiIndex.from_frame(existing_keys).isin(pd.MultiIndex.from_frame(new_keys.drop_duplicates()))
+    combined = pd.concat([existing[~mask], new], ignore_index=True)
+    return combined, int(mask.sum())
+
+
+def fillna_int(df, cols, fill_value=0):
     """Fill NaN and convert to int for the given columns, in-place.
 
-    Uses ``pd.to_numeric`` + ``fillna(0).astype(int)`` to avoid FutureWarning
-    on implicit downcasting. Missing columns are skipped.
+    Uses ``pd.to_numeric`` + ``fillna(fill_value).astype(int)`` to avoid
+    FutureWarning on implicit downcasting; numpy numeric columns skip the
+    ``to_numeric`` pass. Missing columns are skipped.
     """
     for col in cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if not (isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf"):
+            series = pd.to_numeric(series, errors="coerce")
+        df[col] = series.fillna(fill_value).astype(int)
     return df
 
 
-def group_sum(df, group_cols, sum_cols):
-    missing = [col for col in list(group_cols) + list(sum_cols) if col not in df.columns]
+def group_sum(df, group_cols, sum_cols, weighted=None):
+    """Sum ``sum_cols`` per ``group_cols``.
+
+    ``weighted`` maps output columns to ``(value_col, weight_col)`` pairs and
+    adds their weighted averages, computed in the same groupby
+    (``sum(value * weight) / sum(weight)``, missing when the weights sum to 0).
+    """
+    weighted = dict(weighted or {})
+    group_cols = list(group_cols)
+    sum_cols = list(sum_cols)
+    pairs = [list(pair) for pair in weighted.values()]
+    missing = [col for col in group_cols + sum_cols + sum(pairs, []) if col not in df.columns]
     if missing:
         raise ValueError(f"Missing columns: {missing}")
-    return df.groupby(group_cols, as_index=False)[sum_cols].sum()
+    if not weighted:
+        return df.groupby(group_cols, as_index=False, observed=True)[sum_cols].sum()
 
+    # Only the key and summed columns are materialized (no full-frame copy).
+    work = df[group_cols + sum_cols]
+    extra = {}
+    for i, (value_col, weight_col) in enumerate(pairs):
+        extra[f"_weighted_{i}"] = df[value_col] * df[weight_col]
+        extra[f"_weight_{i}"] = df[weight_col]
+    work = work.assign(**extra)
+    agg = work.groupby(group_cols, as_index=False, observed=True)[sum_cols + list(extra)].sum()
+    for i, out_col in enumerate(weighted):
+        denom = agg[f"_weight_{i}"].replace(0, np.nan)
+        agg[out_col] = agg[f"_weighted_{i}"] / denom
+    return agg[group_cols + sum_cols + list(weighted)]
 
-def weighted_avg(df, group_cols, value_col, weight_col, out_col=None):
-    missing = [col for col in list(group_cols) + [value_col, weight_col] if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns: {missing}")
 
+def weighted_avg(df, group_cols, value_col, weight_col, out_col=None):
     result_col = out_col or value_col
-    tmp = df.copy()
-    tmp["_weighted"] = tmp[value_col] * tmp[weight_col]
-    agg = tmp.groupby(group_cols, as_index=False).agg(
-        weight_sum=(weight_col, "sum"),
-        weighted_sum=("_weighted", "sum"),
-    )
-    denom = agg["weight_sum"].replace(0, np.nan)
-    agg[result_col] = agg["weighted_sum"] / denom
-    return agg[list(group_cols) + [result_col]]
+    return group_sum(df, group_cols, [], weighted={result_col: (value_col, weight_col)})
 
 
 def normalize_thresholds_df(
@@ -124,3 +246,94 @@ def normalize_thresholds_df(
     preferred = [clinic_col, min_col, max_col]
     remaining = [col for col in result.columns if col not in preferred]
     return result.loc[:, preferred + remaining]
+
+
+def compact_frame(df, dimensions, max_unique_ratio=0.5):
+    """Return ``df`` with a smaller in-memory representation.
+
+    - String dimension columns become ``category`` when at most
+      ``max_unique_ratio`` of the rows are distinct values.
+    - int64 columns outside ``dimensions`` become int32 when the sum of
+      their absolute values fits, so no group sum can overflow.
+
+    Other columns (floats, dates, already compact) are left as is.
+    """
+    converted = {}
+    for col in dimensions:
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.infer_dtype(series, skipna=True) != "string":
+            continue
+        # One factorize serves both the cardinality check and the codes.
+        codes, uniques = pd.factorize(series)
+        if len(uniques) > max_unique_ratio * len(series):
+            continue
+        # Sorted categories, as astype("category") would produce.
+        order = uniques.argsort()
+        rank = np.empty(len(order), dtype=codes.dtype)
+        rank[order] = np.arange(len(order), dtype=codes.dtype)
+        codes = np.where(codes >= 0, rank.take(np.maximum(codes, 0)), -1)
+        categorical = pd.Categorical.from_codes(codes, categories=uniques.take(order))
+        converted[col] = pd.Series(categorical, index=series.index, name=col)
+
+    int32_max = np.iinfo(np.int32).max
+    for col in df.columns:
+        if col in dimensions:
+            continue
+        series = df[col]
+        if series.dtype.kind != "i" or series.dtype.itemsize <= 4:
+            continue
+        if np.abs(series.to_numpy(), dtype=np.float64).sum() <= int32_max:
+            converted[col] = series.astype(np.int32)
+
+    return df.assign(**converted) if converted else df
+
+
+DTYPE_BACKENDS = ("numpy", "numpy_nullable", "pyarrow")
+
+
+def check_dtype_backend(dtype_backend):
+    """Validate ``dtype_backend`` and its requirements; fail before any work is done."""
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"dtype_backend must be one of {DTYPE_BACKENDS}, got {dtype_backend!r}")
+    if dtype_backend == "numpy":
+        return
+    if int(pd.__version__.split(".")[0]) < 2:
+        raise ImportError(f"dtype_backend={dtype_backend!r} requires pandas>=2.0 (found {pd.__version__}).")
+    if dtype_backend == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "dtype_backend='pyarrow' requires pyarrow. Install it with `pip install pyarrow`."
+            ) from exc
+
+
+def convert_backend(df, dtype_backend="pyarrow"):
+    """Return ``df`` with its columns on ``dtype_backend``.
+
+    ``"pyarrow"`` gives ``string[pyarrow]`` text and Arrow numeric types
+    (``Series.convert_dtypes(dtype_backend="pyarrow")``), which pandas
+    hands to pyarrow without copying (Parquet / Feather writes).
+    ``"numpy_nullable"`` gives ``string`` / ``Int64`` / ``Float64``; ``"numpy"``
+    returns ``df`` unchanged. Values are not changed; float columns stay
+    floats (no inference of integers from the data) and category columns are
+    kept as they are.
+    """
+    check_dtype_backend(dtype_backend)
+    if dtype_backend == "numpy":
+        return df
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        # Floats stay floats even when every value is integral, so the schema
+        # does not depend on the data (pages of one export must match).
+        converted[col] = series.convert_dtypes(
+            convert_integer=series.dtype.kind != "f", dtype_backend=dtype_backend
+        )
+    return df.assign(**converted)
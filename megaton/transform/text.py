@@ -1,53 +1,441 @@
 from __future__ import annotations
 
+import functools
 import re
+from typing import Any, Callable
 from urllib.parse import unquote as url_unquote
-from urllib.parse import urlsplit, urlunsplit, urlparse, parse_qs
+from urllib.parse import parse_qs, urlencode, urlparse, urlsplit, urlunparse, urlunsplit
 
+import numpy as np
 import pandas as pd
 
+from . import parallel
+
+
+def _is_text_column(series: pd.Series) -> bool:
+    """String values only (object / str dtype, or a categorical of strings)."""
+    values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series
+    return pd.api.types.infer_dtype(values, skipna=True) in {"string", "empty"}
+
+
+def _has_nul(values: np.ndarray) -> bool:
+    """True when a string in ``values`` contains NUL.
+
+    pandas hashes strings only up to the first NUL, so ``"a\\x00b"`` and
+    ``"a\\x00c"`` (or ``""`` and ``"\\x00"``) would share a factorize code.
+    """
+    try:
+        return "\x00" in "".join(values)
+    except TypeError:  # not all strings
+        return any(isinstance(value, str) and "\x00" in value for value in values)
+
+
+def _run_funcs(sample: pd.Series, funcs: list[Callable[[pd.Series], pd.Series]]) -> pd.Series:
+    """Apply ``funcs`` in turn, in worker processes when :mod:`.parallel` says so."""
+    def run(part: pd.Series) -> pd.Series:
+        for func in funcs:
+            part = func(part)
+        return part
+
+    chunks = parallel.map_chunks(lambda start, stop: run(sample.iloc[start:stop]), len(sample))
+    # Chunks that inferred different dtypes (e.g. one of all-missing values)
+    # would not concatenate to what one call produces; redo those in-process.
+    if chunks is None or len({chunk.dtype for chunk in chunks}) > 1:
+        return run(sample)
+    return pd.concat(chunks)
+
+
+def transform_unique(series: pd.Series, funcs: list[Callable[[pd.Series], pd.Series]]) -> pd.Series:
+    """Run elementwise ``Series -> Series`` transforms once per distinct value.
+
+    The transforms see a subset of ``series``: the first occurrence of each
+    value plus every missing row (None / NaN share a factorize code but may
+    transform differently). Results are broadcast back by code, with the
+    dtype the transforms produced on that subset; a categorical input whose
+    results are still strings stays categorical. Strings containing NUL
+    cannot be factorized reliably, so such columns are transformed row by row.
+    """
+    codes, uniques = pd.factorize(series)
+    missing = codes == -1
+    if (
+        series.dtype.kind == "O"
+        and not isinstance(series.dtype, pd.CategoricalDtype)
+        and _has_nul(series.to_numpy(dtype=object)[~missing])
+    ):
+        return _run_funcs(series, funcs)
+    first = ~pd.Series(codes).duplicated().to_numpy() & ~missing
+    sample = series.iloc[np.concatenate([np.flatnonzero(first), np.flatnonzero(missing)])]
+    sample = _run_funcs(sample, funcs)
+    out = sample.to_numpy(dtype=object)
+    n_unique = len(uniques)
+    # Row -> position in ``out``: the value's code, or its own slot for missing rows.
+    order = codes.astype(np.intp, copy=True)
+    order[missing] = np.arange(n_unique, len(out))
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categorical = pd.Categorical(out)
+        if pd.api.types.infer_dtype(categorical.categories, skipna=True) in {"string", "empty"} and not _has_nul(out):
+            values = pd.Categorical.from_codes(categorical.codes.take(order), dtype=categorical.dtype)
+            return pd.Series(values, index=series.index, name=series.name)
+    values = out.take(order) if len(order) else np.empty(0, dtype=object)
+    try:
+        return pd.Series(values, index=series.index, name=series.name, dtype=sample.dtype)
+    except (TypeError, ValueError):
+        return pd.Series(values, index=series.index, name=series.name)
+
+
+def apply_unique(series: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """``series.apply(func)`` evaluated once per distinct value.
+
+    Meant for pure per-value string transforms over columns with many
+    repeats (GSC query/page, GA4 pagePath/sessionSource). Only string
+    columns (including categoricals of strings) take the factorized path:
+    object hashing treats ``1``, ``1.0`` and ``True`` as one key, so other
+    columns fall back to ``apply``.
+    """
+    if len(series) < 2 or not _is_text_column(series):
+        return series.apply(func)
+    return transform_unique(series, [lambda sample: sample.apply(func)])
+
+
+def _list_kernel(func: Callable[[Any], Any], strings_only: bool = True) -> Callable[[pd.Series], pd.Series]:
+    """``Series -> Series`` kernel running ``func`` in one list pass.
+
+    With ``strings_only``, non-string values (None, NaN, numbers) pass
+    through unchanged, as in helpers that only rewrite text.
+    """
+    def kernel(sample: pd.Series) -> pd.Series:
+        values = sample.to_numpy(dtype=object)
+        if strings_only:
+            out = [func(value) if isinstance(value, str) else value for value in values]
+        else:
+            out = [func(value) for value in values]
+        return pd.Series(out, index=sample.index, name=sample.name)
+
+    return kernel
+
+
+def _apply_strings(series: pd.Series, func: Callable[[str], Any]) -> pd.Series:
+    """``func`` on the string values of ``series`` (once per distinct value); other values pass through."""
+    if len(series) < 2 or not _is_text_column(series):
+        return series.apply(lambda value: func(value) if isinstance(value, str) else value)
+    return transform_unique(series, [_list_kernel(func)])
+
+# Constructs whose meaning depends on the pattern standing alone: numbered /
+# named backreferences, conditionals and global inline flags. Patterns using
+# them are matched one by one instead of through the combined expression.
+_STANDALONE_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)")
+
+
+class _CompiledPatterns:
+    def __init__(self, patterns: tuple[str, ...], flags: int):
+        self.compiled: list[tuple[int, re.Pattern]] = []
+        self.invalid: list[str] = []
+        for index, pattern in enumerate(patterns):
+            try:
+                self.compiled.append((index, re.compile(pattern, flags)))
+            except re.error:
+                self.invalid.append(pattern)
+        self.combined: re.Pattern | None = None
+        self.group_to_index: dict[int, int] = {}
+        self.first_index = -1
+        if self.compiled and not any(_STANDALONE_RE.search(p.pattern) for _, p in self.compiled):
+            self._combine(flags)
+
+    def _combine(self, flags: int) -> None:
+        # (?:p0)()|(?:p1)()|...: at any position the alternation picks the
+        # lowest-index pattern matching there, so the minimum over all match
+        # positions is the first pattern (in mapping order) found anywhere.
+        # The empty group closing each branch identifies the pattern.
+        parts = []
+        group = 0
+        for index, pattern in self.compiled:
+            group += pattern.groups + 1
+            self.group_to_index[group] = index
+            parts.append(f"(?:{pattern.pattern})()")
+        try:
+            combined = re.compile("|".join(parts), flags)
+        except (re.error, OverflowError, RecursionError):
+            self.group_to_index = {}
+            return
+        if combined.groups != group:
+            self.group_to_index = {}
+            return
+        self.combined = combined
+        self.first_index = self.compiled[0][0]
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_patterns(patterns: tuple[str, ...], flags: int) -> _CompiledPatterns:
+    return _CompiledPatterns(patterns, flags)
+
+
+class RegexMapper:
+    """Ordered ``{pattern: value}`` mapping compiled for first-match lookups.
+
+    Semantics match looping ``re.search(pattern, text, flags)`` over the
+    mapping in order and returning the first hit, but the patterns are
+    compiled (and invalid ones dropped) once per distinct pattern list and
+    evaluated in a single combined expression where possible.
+    """
+
+    def __init__(self, mapping: dict, flags: int = 0):
+        self.patterns = tuple(mapping.keys())
+        self.values = list(mapping.values())
+        self._compiled = _compile_patterns(self.patterns, flags)
+
+    @property
+    def invalid(self) -> list[str]:
+        """Patterns that failed to compile (skipped during matching)."""
+        return list(self._compiled.invalid)
+
+    def search(self, text: str) -> int:
+        """Index of the first pattern found in ``text``, or -1."""
+        compiled = self._compiled
+        combined = compiled.combined
+        if combined is not None:
+            best = -1
+            pos = 0
+            end = len(text)
+            # search(text, pos) keeps ^ / \A / lookbehind anchored to the full string.
+            while pos <= end:
+                match = combined.search(text, pos)
+                if match is None:
+                    break
+                index = compiled.group_to_index[match.lastindex]
+                if best < 0 or index < best:
+                    best = index
+                    if best == compiled.first_index:
+                        break
+                pos = match.start() + 1
+            return best
+        for index, pattern in compiled.compiled:
+            if pattern.search(text):
+                return index
+        return -1
+
+    def lookup(self, text: str, default=None):
+        """Mapped value of the first matching pattern, else ``default``."""
+        index = self.search(text)
+        return default if index < 0 else self.values[index]
+
 
 def map_by_regex(series, mapping, default=None, flags=0, lower=True, strip=True):
     if series is None or not mapping:
         return series
 
-    def _map_value(value):
-        if not isinstance(value, str):
-            return value
+    mapper = RegexMapper(mapping, flags)
+    no_match = object()
+
+    def _map_value(value: str):
         text = value
         if strip:
             text = text.strip()
         if lower:
             text = text.lower()
-        for pattern, mapped in mapping.items():
-            try:
-                if re.search(pattern, text, flags=flags):
-                    return mapped
-            except re.error:
-                continue
+        mapped = mapper.lookup(text, no_match)
+        if mapped is not no_match:
+            return mapped
         return value if default is None else default
 
-    return series.apply(_map_value)
+    return _apply_strings(series, _map_value)
 
 
-def clean_url(series, unquote=True, drop_query=True, drop_hash=True, lower=True):
-    if series is None:
-        return series
+def _filter_query(query: str, keep) -> str:
+    if not keep:
+        return ""
+    params = parse_qs(query)
+    return urlencode({k: v for k, v in params.items() if k in keep}, doseq=True)
 
-    def _clean(value):
-        if not isinstance(value, str):
+
+def _url_value(
+    value,
+    *,
+    decode=False,
+    strip=False,
+    unquote=False,
+    drop_query=False,
+    keep=None,
+    drop_hash=False,
+    lower=False,
+    coerce=False,
+    params=False,
+):
+    """Scalar reference for :func:`normalize_url` (and its fallback path).
+
+    ``coerce`` selects the NA handling: True passes NA through and
+    stringifies everything else, False passes every non-string through.
+    ``params`` parses with ``urlparse`` (``;params`` aware) instead of
+    ``urlsplit``.
+    """
+    if coerce:
+        if pd.isna(value):
             return value
-        text = value.strip()
+        text = str(value)
+    elif not isinstance(value, str):
+        return value
+    else:
+        text = value
+    if decode:
+        return url_unquote(text)
+    if strip:
+        text = text.strip()
         if not text:
             return text
-        parsed = urlsplit(text)
-        path = url_unquote(parsed.path) if unquote else parsed.path
-        query = "" if drop_query else parsed.query
-        fragment = "" if drop_hash else parsed.fragment
-        cleaned = urlunsplit((parsed.scheme, parsed.netloc, path, query, fragment))
-        return cleaned.lower() if lower else cleaned
+    parsed = urlparse(text) if params else urlsplit(text)
+    changes = {}
+    if unquote:
+        changes["path"] = url_unquote(parsed.path)
+    if drop_query:
+        changes["query"] = _filter_query(parsed.query, keep)
+    if drop_hash:
+        changes["fragment"] = ""
+    parsed = parsed._replace(**changes)
+    cleaned = urlunparse(parsed) if params else urlunsplit(parsed)
+    return cleaned.lower() if lower else cleaned
 
-    return series.apply(_clean)
+
+# URLs for which urlsplit/urlparse + urlunsplit/urlunparse reduce to splitting
+# on the first "#" and "?": either "scheme://netloc..." with an already
+# lowercase scheme and a plain ASCII netloc, or a path starting with a single
+# "/". Leading whitespace/control characters (stripped by urlsplit), tab/CR/LF
+# (removed), ";" (urlparse params) and bracketed / non-ASCII hosts (validated)
+# are left to the scalar path.
+_SIMPLE_URL_RE = re.compile(
+    r"(?:[a-z][a-z0-9+.\-]*://[A-Za-z0-9.\-_~:@!$&'()*+,=%]+(?=[/?#]|$)|/(?!/))[^\t\r\n;]*"
+)
+
+
+@functools.lru_cache(maxsize=65536)
+def _unquote_segment(segment: str) -> str:
+    return url_unquote(segment)
+
+
+def _unquote_fast(text: str) -> str:
+    """``unquote(text)``, memoized per "/"-separated segment.
+
+    Percent-decoding never spans an ASCII "/" (UTF-8 replacement stops at
+    it), so decoding segment by segment is exact while the heavily repeated
+    segments of a URL column are decoded only once.
+    """
+    if "%" not in text:
+        return text
+    return "/".join([_unquote_segment(part) if "%" in part else part for part in text.split("/")])
+
+
+def _normalize_simple_urls(texts: list[str], options: dict) -> list[str]:
+    """:func:`_url_value` for strings matching ``_SIMPLE_URL_RE``.
+
+    Works column-wise with plain ``str`` methods: no URL parsing, only the
+    split on the first "#" / "?", so every step is a single cheap pass.
+    """
+    if options["decode"]:
+        return [_unquote_fast(text) for text in texts]
+    heads, _, fragments = zip(*[text.partition("#") for text in texts])
+    bases, _, queries = zip(*[head.partition("?") for head in heads])
+    bases = list(bases)
+    if options["unquote"]:
+        for i, base in enumerate(bases):
+            if "%" not in base:
+                continue
+            # The path starts at the first "/" after "scheme://" (or at the leading "/").
+            start = 0 if base[0] == "/" else base.find("/", base.find("://") + 3)
+            if start >= 0:
+                bases[i] = base[:start] + _unquote_fast(base[start:])
+    if options["drop_query"]:
+        keep = options["keep"]
+        if keep:
+            kept = {query: _filter_query(query, keep) for query in set(queries)}
+            queries = [kept[query] for query in queries]
+        else:
+            queries = [""] * len(bases)
+    if options["drop_hash"]:
+        fragments = [""] * len(bases)
+    out = [
+        base + ("?" + query if query else "") + ("#" + fragment if fragment else "")
+        for base, query, fragment in zip(bases, queries, fragments)
+    ]
+    return [text.lower() for text in out] if options["lower"] else out
+
+
+def normalize_url(
+    series,
+    *,
+    decode=False,
+    strip=False,
+    unquote=False,
+    drop_query=False,
+    keep=None,
+    drop_hash=False,
+    lower=False,
+    coerce=False,
+    params=False,
+):
+    """Normalize a URL column (shared backend of the URL-cleaning methods).
+
+    Output is identical to applying :func:`_url_value` per row. On string
+    columns the distinct values are processed with vectorized string ops:
+    split on the first ``#`` / ``?``, percent-decoding only where ``%`` is
+    present, keep-list query filtering once per distinct query string and
+    lowercasing. Values whose parse is not a plain split (see
+    ``_SIMPLE_URL_RE``) and non-string columns go through the scalar path.
+
+    Args:
+        decode: ``unquote`` the whole value and skip the other steps.
+        strip: strip surrounding whitespace first (empty stays empty).
+        unquote: percent-decode the path.
+        drop_query: drop the query, keeping parameters listed in ``keep``.
+        drop_hash: drop the fragment.
+        lower: lowercase the result.
+    """
+    if series is None:
+        return series
+    options = dict(
+        decode=decode,
+        strip=strip,
+        unquote=unquote,
+        drop_query=drop_query,
+        keep=keep,
+        drop_hash=drop_hash,
+        lower=lower,
+        coerce=coerce,
+        params=params,
+    )
+    scalar = functools.partial(_url_value, **options)
+    if len(series) < 2 or not _is_text_column(series):
+        return series.apply(scalar)
+
+    def _kernel(sample: pd.Series) -> pd.Series:
+        values = sample.to_numpy(dtype=object)
+        out = values.copy()
+        fast = []
+        texts = []
+        for i, value in enumerate(values):
+            if isinstance(value, str):
+                text = value.strip() if strip else value
+                if decode or _SIMPLE_URL_RE.fullmatch(text):
+                    fast.append(i)
+                    texts.append(text)
+                    continue
+            out[i] = scalar(value)
+        if texts:
+            out[fast] = _normalize_simple_urls(texts, options)
+        return pd.Series(list(out), index=sample.index, name=sample.name)
+
+    return transform_unique(series, [_kernel])
+
+
+def clean_url(series, unquote=True, drop_query=True, drop_hash=True, lower=True):
+    if series is None:
+        return series
+
+    return normalize_url(
+        series,
+        strip=True,
+        unquote=unquote,
+        drop_query=drop_query,
+        drop_hash=drop_hash,
+        lower=lower,
+    )
 
 
 def normalize_whitespace(series, mode="remove_all"):
@@ -56,14 +444,10 @@ def normalize_whitespace(series, mode="remove_all"):
     if mode not in {"remove_all", "collapse"}:
         raise ValueError(f"Unsupported mode: {mode}")
 
-    def _normalize(value):
-        if not isinstance(value, str):
-            return value
-        if mode == "remove_all":
-            return re.sub(r"\s+", "", value)
-        return re.sub(r"\s+", " ", value).strip()
-
-    return series.apply(_normalize)
+    # str.split() splits on exactly the characters re's \s matches (str.isspace),
+    # so joining the pieces equals re.sub(r"\s+", ...) (and .strip() for collapse).
+    sep = "" if mode == "remove_all" else " "
+    return _apply_strings(series, lambda value: sep.join(value.split()))
 
 
 def force_text_if_numeric(series, prefix="'"):
@@ -74,16 +458,95 @@ def force_text_if_numeric(series, prefix="'"):
         if pd.isna(value):
             return value
         text = str(value)
-        if re.fullmatch(r"\d+", text):
+        # isdecimal() is re's \d (Unicode decimal digits); "" is not numeric.
+        if text.isdecimal():
             return f"{prefix}{text}"
         return value
 
+    # NumPy integer columns factorize exactly (no 1 / 1.0 / True key sharing).
+    is_int = isinstance(series.dtype, np.dtype) and series.dtype.kind in "iu"
+    if len(series) >= 2 and (_is_text_column(series) or is_int):
+        return transform_unique(series, [_list_kernel(_force, strings_only=False)])
     return series.apply(_force)
 
 
+class SiteIndex:
+    """``sites`` prepared once for :func:`infer_site_from_url` lookups.
+
+    Holds the ``id_key`` map and the site domains bucketed by length, so a
+    host resolves by probing its suffix of each domain length, longest first
+    (the same first match as the length-sorted ``endswith`` scan).
+    :meth:`infer_sites` resolves a whole Series once per distinct URL.
+    """
+
+    def __init__(self, sites, site_key='site', id_key=None):
+        # 特殊ID → (sites 内の位置, サイト識別子)。同じIDは先勝ち
+        self._ids: dict[str, tuple[int, object]] = {}
+        if id_key:
+            for position, site in enumerate(sites):
+                special_id = site.get(id_key)
+                if special_id and site.get(site_key):
+                    self._ids.setdefault(str(special_id), (position, site.get(site_key)))
+
+        # ドメイン → サイト識別子（重複ドメインは先勝ち）
+        domains: dict[str, object] = {}
+        for site in sites:
+            site_id = site.get(site_key)
+            if not site_id:
+                continue
+            raw_domain = site.get("domain")
+            raw_url = site.get("url")
+            candidates = []
+            if raw_domain:
+                candidates.append(raw_domain.lower())
+            if raw_url:
+                raw_url = str(raw_url).strip()
+                url_with_scheme = raw_url if raw_url.startswith(("http://", "https://")) else f"http://{raw_url}"
+                parsed = urlparse(url_with_scheme)
+                if parsed.netloc:
+                    candidates.append(parsed.netloc.lower())
+            for domain in candidates:
+                domains.setdefault(domain, site_id)
+        self._domains = domains
+        # 長いドメインを優先（サブドメインを先にマッチさせる）
+        self._lengths = sorted({len(domain) for domain in domains}, reverse=True)
+
+    def infer(self, url_val):
+        """URL 1 件のサイト識別子 or "不明"（:func:`infer_site_from_url` と同じ）"""
+        # 値が空またはstringでなければ「不明」を返す
+        if not isinstance(url_val, str) or not url_val:
+            return "不明"
+
+        parsed = urlparse(url_val if "://" in url_val else f"http://{url_val}")
+
+        # 特殊IDチェック（id=XXX パターン）。複数マッチ時は sites で先のもの
+        if self._ids:
+            matches = [self._ids[value] for value in parse_qs(parsed.query).get('id', []) if value in self._ids]
+            if matches:
+                return min(matches, key=lambda match: match[0])[1]
+
+        # ドメインからサイトを推測（末尾一致、長いドメイン優先）
+        domain = parsed.netloc.lower()
+        for length in self._lengths:
+            if length <= len(domain):
+                site_id = self._domains.get(domain[len(domain) - length:])
+                if site_id is not None:
+                    return site_id
+
+        # マッチしない場合は「不明」
+        return "不明"
+
+    def infer_sites(self, series: pd.Series) -> pd.Series:
+        """Series の各 URL のサイト識別子（ユニークな URL ごとに 1 回だけ判定）"""
+        return apply_unique(series, self.infer)
+
+
 def infer_site_from_url(url_val, sites, site_key='site', id_key=None):
     """URLから所属サイトを推測（マルチサイト企業対応）
     
+    Series 全体を判定する場合は ``SiteIndex(sites, ...).infer_sites(series)`` を
+    使うと、sites の前処理が 1 回で済み、同じ URL は 1 回だけ判定されます。
+    
     Args:
         url_val: URL文字列（LP URL、page_location など）
         sites: サイト設定リスト（各要素は dict）
@@ -99,54 +562,4 @@ def infer_site_from_url(url_val, sites, site_key='site', id_key=None):
         >>> infer_site_from_url('?id=123', sites, site_key='clinic', id_key='dentamap_id')
         'dentamap'
     """
-    # 値が空またはstringでなければ「不明」を返す
-    if not isinstance(url_val, str) or not url_val:
-        return "不明"
-    
-    # 特殊IDチェック（id=XXX パターン）
-    if id_key:
-        parsed = urlparse(url_val if "://" in url_val else f"http://{url_val}")
-        query_params = parse_qs(parsed.query)
-        id_values = query_params.get('id', [])
-        
-        for site in sites:
-            special_id = site.get(id_key)
-            if special_id and site.get(site_key) and str(special_id) in id_values:
-                return site.get(site_key)
-    
-    # ドメインからサイトを推測
-    # sites から domain_pairs を動的生成（長さ順にソート）
-    domain_pairs = []
-    seen_domains = set()
-    for site in sites:
-        site_id = site.get(site_key)
-        if not site_id:
-            continue
-        raw_domain = site.get("domain")
-        raw_url = site.get("url")
-        candidates = []
-        if raw_domain:
-            candidates.append(raw_domain.lower())
-        if raw_url:
-            raw_url = str(raw_url).strip()
-            url_with_scheme = raw_url if raw_url.startswith(("http://", "https://")) else f"http://{raw_url}"
-            parsed = urlparse(url_with_scheme)
-            if parsed.netloc:
-                candidates.append(parsed.netloc.lower())
-        # 重複ドメインは先勝ち（最初に見つかったサイトを使用）
-        for domain in candidates:
-            if domain not in seen_domains:
-                domain_pairs.append((domain, site_id))
-                seen_domains.add(domain)
-    
-    # 長いドメインを優先（サブドメインを先にマッチさせる）
-    domain_pairs = sorted(domain_pairs, key=lambda x: len(x[0]), reverse=True)
-    
-    parsed = urlparse(url_val if "://" in url_val else f"http://{url_val}")
-    domain = parsed.netloc.lower()
-    for key, name in domain_pairs:
-        if domain == key or domain.endswith(key):
-            return name
-    
-    # マッチしない場合は「不明」
-    return "不明"
+    return SiteIndex(sites, site_key=site_key, id_key=id_key).infer(url_val)
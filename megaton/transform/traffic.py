@@ -9,19 +9,31 @@ from __future__ import annotations
 
 import ipaddress
 import re
-from typing import Mapping
+import warnings
+from typing import Mapping, cast
 
 import pandas as pd
 
+from .text import RegexMapper, apply_unique
+
+_HTTP_SCHEME_RE = re.compile(r"^https?://")
+_ANY_SCHEME_RE = re.compile(r"^[a-z][a-z0-9+.-]*://")
+_WWW_RE = re.compile(r"^www\.")
+
 
 def normalize_domain(value: str) -> str:
     """Normalize domain text for grouping/compare (strip scheme, www, path)."""
     v = str(value).strip().lower()
-    v = re.sub(r"^https?://", "", v)
+    v = _HTTP_SCHEME_RE.sub("", v)
     v = v.split("/")[0]
     return v.replace("www.", "")
 
 
+def normalize_domains(series: pd.Series) -> pd.Series:
+    """:func:`normalize_domain` over a Series, once per distinct value."""
+    return apply_unique(series, normalize_domain)
+
+
 def source_host(value: object) -> str:
     """Return the host-like part of a GA source value.
 
@@ -31,7 +43,7 @@ def source_host(value: object) -> str:
     text = str(value or "").strip().lower()
     if not text or text in {"(not set)", "not set", "none", "nan"}:
         return ""
-    text = re.sub(r"^[a-z][a-z0-9+.-]*://", "", text)
+    text = _ANY_SCHEME_RE.sub("", text)
     text = text.split("/", 1)[0].split("?", 1)[0].strip()
     if "@" in text:
         text = text.rsplit("@", 1)[1]
@@ -43,7 +55,12 @@ def source_host(value: object) -> str:
         host, port = text.rsplit(":", 1)
         if port.isdigit():
             text = host
-    return re.sub(r"^www\.", "", text.strip("."))
+    return _WWW_RE.sub("", text.strip("."))
+
+
+def source_hosts(series: pd.Series) -> pd.Series:
+    """:func:`source_host` over a Series, once per distinct value."""
+    return apply_unique(series, source_host)
 
 
 def is_non_public_dev_source(value: object) -> bool:
@@ -60,6 +77,11 @@ def is_non_public_dev_source(value: object) -> bool:
     return not ip.is_global
 
 
+def non_public_dev_sources(series: pd.Series) -> pd.Series:
+    """Boolean mask of :func:`is_non_public_dev_source`, once per distinct value."""
+    return apply_unique(series, is_non_public_dev_source).astype(bool)
+
+
 def ensure_trailing_slash(path: str, *, preserve_suffixes: tuple[str, ...] = (".html", "/")) -> str:
     """Append ``/`` unless path already ends with known suffixes."""
     text = str(path or "")
@@ -68,30 +90,57 @@ def ensure_trailing_slash(path: str, *, preserve_suffixes: tuple[str, ...] = (".
     return text + "/"
 
 
+class SourceNormalizer:
+    """A ``source_map`` compiled once for :func:`apply_source_normalization`.
+
+    Patterns are compiled up front; invalid ones are reported once here and
+    skipped. Matching is ``re.search`` over the map in order on the
+    lowercased, stripped source; the first hit gives the normalized value.
+    ``_stacklevel`` is for wrappers that build one on the user's behalf, so
+    the warning still points at the user's call.
+    """
+
+    def __init__(self, source_map: Mapping[str, str], *, _stacklevel: int = 2):
+        mapping: dict[str, str] = {}
+        for pattern, normalized in source_map.items():
+            mapping.setdefault(str(pattern), str(normalized))
+        self._mapper = RegexMapper(mapping)
+        self._values = list(mapping.values())
+        for pattern in self._mapper.invalid:
+            try:
+                re.compile(pattern)
+            except re.error as exc:
+                warnings.warn(f"invalid regex pattern in source_map: {pattern} ({exc})", stacklevel=_stacklevel)
+
+    def normalize(self, value: object) -> str:
+        src = str(value or "").lower().strip()
+        index = self._mapper.search(src)
+        return src if index < 0 else self._values[index]
+
+    def normalize_series(self, series: pd.Series) -> pd.Series:
+        """:meth:`normalize` over a Series, once per distinct value."""
+        return apply_unique(series, self.normalize)
+
+
 def apply_source_normalization(
     df: pd.DataFrame,
-    source_map: Mapping[str, str],
+    source_map: Mapping[str, str] | SourceNormalizer,
     *,
     source_col: str = "source",
 ) -> pd.DataFrame:
     """Normalize a GA source column with a regex map.
 
     Input source values are lowercased before matching. Unmatched values
-    keep the lowercased text. Invalid patterns are warned and skipped.
+    keep the lowercased text. Invalid patterns are warned (once) and skipped.
+    Pass a :class:`SourceNormalizer` to reuse the compiled map across frames.
     """
     if source_col not in df.columns:
         return df
 
-    def normalize(value: object) -> str:
-        src = str(value or "").lower().strip()
-        for pattern, normalized in source_map.items():
-            try:
-                if re.search(str(pattern), src):
-                    return str(normalized)
-            except re.error as exc:
-                print(f"[warn] invalid regex pattern in source_map: {pattern} ({exc})")
-        return src
-
+    if isinstance(source_map, SourceNormalizer):
+        normalizer = source_map
+    else:
+        normalizer = SourceNormalizer(source_map, _stacklevel=3)
     out = df.copy()
-    out[source_col] = out[source_col].apply(normalize)
+    out[source_col] = normalizer.normalize_series(cast(pd.Series, out[source_col]))
     return out
@@ -0,0 +1,540 @@
+"""Time / peak-RSS benchmarks for result chains and transforms.
+
+Every case runs in a fresh interpreter, so the reported peak RSS
+(``ru_maxrss``) belongs to that case alone. ``peak`` is the process peak and
+``delta`` the growth over the RSS right after the input data was built.
+Cases that return a DataFrame also report its ``memory_usage(deep=True)``.
+``rows/s`` is the input row count divided by the timed seconds.
+
+    python scripts/benchmark.py                      # all cases, 1M rows
+    python scripts/benchmark.py search_chain --rows 200000
+    python scripts/benchmark.py --list
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+# case name -> setup(rows) returning the zero-argument callable to time
+CASES: dict[str, Callable[[int], Callable[[], object]]] = {}
+
+
+def case(name: str):
+    def register(setup: Callable[[int], Callable[[], object]]):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def _rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _gsc_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n_pages = max(rows // 20, 1)
+    n_queries = max(rows // 5, 1)
+    pages = np.array(
+        [f"https://Example.com/%E3%83%86/p{i}?utm_source=x&id={i % 7}#s{i % 3}" for i in range(n_pages)],
+        dtype=object,
+    )
+    queries = np.array([f"クエリ {i % 997} word{i}" for i in range(n_queries)], dtype=object)
+    impressions = rng.integers(1, 500, rows)
+    return pd.DataFrame({
+        "site": rng.choice(np.array(["a", "b", "c", "d"], dtype=object), rows),
+        "query": queries[rng.integers(0, n_queries, rows)],
+        "page": pages[rng.integers(0, n_pages, rows)],
+        "clicks": rng.integers(0, 5, rows),
+        "impressions": impressions,
+        "ctr": rng.random(rows),
+        "position": rng.random(rows) * 50 + 1,
+    })
+
+
+def _ga4_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2024-01-01", periods=366).strftime("%Y%m%d").to_numpy(dtype=object)
+    sources = np.array(["google", "Yahoo!", "(direct)", "t.co", "facebook.com", None], dtype=object)
+    pages = np.array([f"/Path/{i}?ref=x#frag" for i in range(max(rows // 50, 1))], dtype=object)
+    return pd.DataFrame({
+        "date": days[rng.integers(0, len(days), rows)],
+        "sessionSource": sources[rng.integers(0, len(sources), rows)],
+        "landingPage": pages[rng.integers(0, len(pages), rows)],
+        "sessions": rng.integers(0, 100, rows).astype(float),
+        "users": rng.integers(0, 80, rows).astype(float),
+        "cv": rng.integers(0, 3, rows).astype(float),
+    })
+
+
+SOURCE_MAP = {"google": "Google", "yahoo": "Yahoo", r"facebook|t\.co": "Social"}
+PAGE_MAP = {r"/p1\d*$": "p1x", r"/p2\d*$": "p2x", r"/%E3": "encoded"}
+
+
+def _search_chain(result):
+    return (
+        result
+        .decode(group=False)
+        .remove_params(group=False)
+        .remove_fragment(group=False)
+        .lower(["page", "query"], group=False)
+        .clean_url(group=False)
+        .normalize("query", by=lambda value: value)
+        .categorize("page", by=PAGE_MAP, into="page_type")
+        .filter_impressions(min=5, keep_clicked=True)
+        .filter_position(max=40)
+        .aggregate()
+    )
+
+
+@case("search_chain")
+def _search_chain_case(rows: int):
+    from megaton.start import SearchResult
+
+    df = _gsc_frame(rows)
+    dims = ["site", "query", "page"]
+    return lambda: _search_chain(SearchResult(df, None, dims)).df
+
+
+@case("search_chain_lazy")
+def _search_chain_lazy_case(rows: int):
+    from megaton.start import SearchResult
+
+    df = _gsc_frame(rows)
+    dims = ["site", "query", "page"]
+    return lambda: _search_chain(SearchResult(df, None, dims).lazy()).collect().df
+
+
+@case("normalize_queries")
+def _normalize_queries_case(rows: int):
+    from megaton.start import SearchResult
+
+    df = _gsc_frame(rows)
+    # Whitespace variants so query_key groups merge several spellings.
+    df["query"] = df["query"].str.replace("word", " word", regex=False)
+    df.loc[::3, "query"] = df.loc[::3, "query"].str.replace(" ", "", regex=False)
+    result = SearchResult(df, None, ["site", "query", "page"])
+    return lambda: result.normalize_queries(prefer_by="impressions").df
+
+
+def _register_stream_cases(page_rows=25_000):
+    """GSC export(clean=True) aggregation: API pages folded one by one vs. one groupby."""
+    def setup(rows: int, streamed: bool):
+        from megaton.transform import gsc
+
+        df = _gsc_frame(rows).drop(columns=["ctr"], errors="ignore")
+        dims = ["site", "query", "page"]
+        if not streamed:
+            return lambda: gsc.aggregate(df, dims)
+        pages = [df.iloc[start:start + page_rows] for start in range(0, len(df), page_rows)]
+
+        def run():
+            agg = gsc.StreamingAggregate(dims)
+            for page in pages:
+                agg.add(page)
+            return agg.result()
+
+        return run
+
+    case("gsc_aggregate_once")(partial(setup, streamed=False))
+    case("gsc_stream_pages")(partial(setup, streamed=True))
+
+
+_register_stream_cases()
+
+
+@case("filter_sites")
+def _filter_sites_case(rows: int):
+    from megaton.start import SearchResult
+
+    df = _gsc_frame(rows)
+    sites = [
+        {"site": "a", "min_impressions": 50},
+        {"site": "b", "min_impressions": 10, "max_impressions": 400},
+        {"site": "c", "max_impressions": 300},
+    ]
+    result = SearchResult(df, None, ["site", "query", "page"])
+    return lambda: result.filter_impressions(sites=sites, keep_clicked=True).df
+
+
+@case("report_chain")
+def _report_chain_case(rows: int):
+    from megaton import wrap
+
+    df = _ga4_frame(rows)
+
+    def run():
+        return (
+            wrap(df, ["date", "sessionSource", "landingPage"])
+            .fill()
+            .normalize("sessionSource", SOURCE_MAP)
+            .categorize("landingPage", {"/path/1": "top"}, into="section")
+            .replace("landingPage", {r"\?.*$": ""})
+            .clean_url("landingPage")
+            .month_key("date", into="month")
+            .to_int(["sessions", "users"])
+            .group(["month", "sessionSource", "section"])
+            .sort("sessions", ascending=False)
+            .select(["month", "sessionSource", "section", "sessions", "users", "cv"])
+            .df
+        )
+
+    return run
+
+
+GA4_DIMS = ["date", "sessionSource", "landingPage"]
+
+
+@case("ga4_frame")
+def _ga4_frame_case(rows: int):
+    return lambda: _ga4_frame(rows).assign(sessions=lambda df: df["sessions"].astype(int))
+
+
+@case("ga4_frame_compact")
+def _ga4_frame_compact_case(rows: int):
+    from megaton.transform.table import compact_frame
+
+    return lambda: compact_frame(_ga4_frame(rows).assign(sessions=lambda df: df["sessions"].astype(int)), GA4_DIMS)
+
+
+def _register_group_cases():
+    """ReportResult.group on object vs. compact (category / int32) columns."""
+    def setup(rows: int, compact: bool):
+        from megaton import wrap
+
+        result = wrap(_ga4_frame(rows).assign(sessions=lambda df: df["sessions"].astype(int)), GA4_DIMS)
+        if compact:
+            result = result.compact()
+        return lambda: result.group(GA4_DIMS).df
+
+    case("report_group")(lambda rows: setup(rows, False))
+    case("report_group_compact")(lambda rows: setup(rows, True))
+
+
+_register_group_cases()
+
+
+def _register_rollup_cases():
+    """Several coarser ReportResult.group calls on one result, with and without cube()."""
+    def setup(rows: int, cube: bool):
+        from megaton import wrap
+
+        df = _ga4_frame(rows).assign(month=lambda df: df["date"].str[:6])
+        result = wrap(df, ["month", "date", "sessionSource", "landingPage"])
+        rollups = [["month"], ["month", "sessionSource"], ["date"], ["date", "sessionSource"], ["sessionSource"]]
+
+        def run():
+            base = result.cube(["date", "month", "sessionSource"]) if cube else result
+            return pd.concat([base.group(by).df for by in rollups], ignore_index=True)
+
+        return run
+
+    case("report_rollups")(lambda rows: setup(rows, False))
+    case("report_rollups_cube")(lambda rows: setup(rows, True))
+
+
+_register_rollup_cases()
+
+
+def _register_engine_cases():
+    """Aggregations on the pandas vs. Polars engine (needs polars + pyarrow)."""
+    def search_aggregate(rows: int, engine: str):
+        from megaton.start import SearchResult
+
+        result = SearchResult(_gsc_frame(rows), None, ["site", "query", "page"]).with_engine(engine)
+        return lambda: result.aggregate(["site", "page"]).df
+
+    def normalize_queries(rows: int, engine: str):
+        from megaton.start import SearchResult
+
+        df = _gsc_frame(rows)
+        df["query"] = df["query"].str.replace("word", " word", regex=False)
+        result = SearchResult(df, None, ["site", "query", "page"]).with_engine(engine)
+        return lambda: result.normalize_queries(prefer_by="impressions").df
+
+    def report_group(rows: int, engine: str):
+        from megaton import wrap
+
+        result = wrap(_ga4_frame(rows), GA4_DIMS).with_engine(engine)
+        return lambda: result.group(GA4_DIMS).df
+
+    for name, setup in [
+        ("search_aggregate", search_aggregate),
+        ("normalize_queries", normalize_queries),
+        ("report_group", report_group),
+    ]:
+        case(f"{name}_pandas")(partial(setup, engine="pandas"))
+        case(f"{name}_polars")(partial(setup, engine="polars"))
+
+
+_register_engine_cases()
+
+
+def _traffic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sources = np.array(
+        ["google", "www.yahoo.co.jp", "chatgpt.com", "t.co", "m.facebook.com", "maps.google.com",
+         "docomo.ne.jp", "dentamap.jp", "(direct)", None]
+        + [f"site{i}.example.com" for i in range(500)],
+        dtype=object,
+    )
+    mediums = np.array(["organic", "referral", "(none)", "cpc", "map"], dtype=object)
+    channels = np.array(["Organic Search", "Referral", "Direct", "Paid Search"], dtype=object)
+    return pd.DataFrame({
+        "channel": channels[rng.integers(0, len(channels), rows)],
+        "medium": mediums[rng.integers(0, len(mediums), rows)],
+        "source": sources[rng.integers(0, len(sources), rows)],
+        "sessions": rng.integers(0, 100, rows),
+    })
+
+
+@case("classify_source_channel")
+def _classify_source_channel_case(rows: int):
+    from megaton.transform.ga4 import classify_source_channel
+
+    df = _traffic_frame(rows)
+    return lambda: classify_source_channel(df, custom_channels={"Group": [r"dentamap\.jp"]})
+
+
+@case("source_normalization")
+def _source_normalization_case(rows: int):
+    from megaton.transform.traffic import SourceNormalizer, apply_source_normalization, non_public_dev_sources
+
+    df = _traffic_frame(rows)
+    normalizer = SourceNormalizer({r"google": "google", r"yahoo": "yahoo", r"facebook|^t\.co$": "social"})
+
+    def run():
+        out = apply_source_normalization(df, normalizer)
+        return out[~non_public_dev_sources(out["source"]).to_numpy()]
+
+    return run
+
+
+def _sites(n: int = 60) -> list[dict]:
+    return [
+        {"site": f"s{i}", "url": f"https://www.clinic{i}.example.com/", "domain": f"clinic{i}.example.jp"}
+        for i in range(n)
+    ]
+
+
+@case("infer_sites")
+def _infer_sites_case(rows: int):
+    from megaton.transform.text import SiteIndex
+
+    sites = _sites()
+    rng = np.random.default_rng(0)
+    hosts = [f"www.clinic{i}.example.com" for i in range(70)] + [f"clinic{i}.example.jp" for i in range(60)]
+    urls = np.array([f"https://{hosts[i % len(hosts)]}/lp/{i}?id={i % 9}" for i in range(max(rows // 5, 1))], dtype=object)
+    series = pd.Series(urls[rng.integers(0, len(urls), rows)])
+    return lambda: SiteIndex(sites).infer_sites(series)
+
+
+def _url_series(rows: int, unique_pct: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    n_unique = max(rows * unique_pct // 100, 1)
+    urls = np.array([f"https://Example.com/%E3%83%86/p{i}?utm_source=x#s" for i in range(n_unique)], dtype=object)
+    return pd.Series(urls[rng.integers(0, n_unique, rows)])
+
+
+def _query_series(rows: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    n_unique = max(rows // 10, 1)
+    queries = np.array([f"矯正　歯科 {i}  word\t{i % 13}" for i in range(n_unique)] + ["12345", None], dtype=object)
+    return pd.Series(queries[rng.integers(0, len(queries), rows)])
+
+
+def _register_text_cases():
+    """transform.text helpers on a 1M-row query-like column (10% unique)."""
+    def setup(rows: int, name: str):
+        from megaton.transform import text
+
+        series = _query_series(rows)
+        funcs = {
+            "normalize_whitespace": lambda: text.normalize_whitespace(series, mode="collapse"),
+            "force_text_if_numeric": lambda: text.force_text_if_numeric(series),
+            "map_by_regex": lambda: text.map_by_regex(series, {r"^矯正": "ortho", r"word\s+1$": "w1"}),
+        }
+        return funcs[name]
+
+    for name in ["normalize_whitespace", "force_text_if_numeric", "map_by_regex"]:
+        case(f"text_{name}")(partial(setup, name=name))
+
+
+_register_text_cases()
+
+
+def _register_table_cases():
+    """transform.table key primitives on a GSC-like frame."""
+    def setup(rows: int, name: str):
+        from megaton.transform import table
+
+        df = _gsc_frame(rows)
+        keys = ["site", "page", "query"]
+        funcs = {
+            "dedup_by_key": lambda: table.dedup_by_key(df, ["site", "page"], prefer_by="impressions"),
+            "dedup_by_key_unique_nocopy": lambda: table.dedup_by_key(df, keys, copy=False),
+            "normalize_key_cols": lambda: table.normalize_key_cols(df, ["site", "page"], lower=True),
+            "group_sum_weighted": lambda: table.group_sum(
+                df, keys, ["clicks", "impressions"], weighted={"position": ("position", "impressions")}
+            ),
+        }
+        return funcs[name]
+
+    for name in ["dedup_by_key", "dedup_by_key_unique_nocopy", "normalize_key_cols", "group_sum_weighted"]:
+        case(f"table_{name}")(partial(setup, name=name))
+
+
+_register_table_cases()
+
+
+def _register_report_kernel_cases():
+    """ReportResult per-column steps of a monthly rollup."""
+    def setup(rows: int, name: str):
+        from megaton.start import ReportResult
+
+        result = ReportResult(_ga4_frame(rows))
+        funcs = {
+            "month_key": lambda: result.month_key("date", into="month"),
+            "replace": lambda: result.replace("landingPage", {r"\?.*$": "", r"#.*": "", r"^/Path": "/path"}),
+            "to_int": lambda: result.to_int(["sessions", "users", "cv"]),
+        }
+        return lambda: funcs[name]().df
+
+    for name in ["month_key", "replace", "to_int"]:
+        case(f"report_{name}")(partial(setup, name=name))
+
+
+_register_report_kernel_cases()
+
+
+@case("upsert_frames")
+def _upsert_frames_case(rows: int):
+    """Upsert rows/10 new rows into an existing table of ``rows`` rows."""
+    from megaton.transform import table
+
+    existing = _ga4_frame(rows)
+    new = _ga4_frame(max(rows // 10, 1), seed=1)
+    keys = ["date", "sessionSource", "landingPage"]
+    return lambda: table.upsert_frames(existing, new, keys)[0]
+
+
+def _register_unique_ratio_cases(unique_pcts=(1, 10, 50, 100)):
+    """clean_url per row vs. once per unique value, by unique-value ratio."""
+    for pct in unique_pcts:
+        def rowwise(rows: int, pct=pct):
+            from megaton.transform import text
+
+            series = _url_series(rows, pct)
+            scalar = partial(text._url_value, strip=True, unquote=True, drop_query=True, drop_hash=True, lower=True)
+            return lambda: series.apply(scalar)
+
+        def unique(rows: int, pct=pct):
+            from megaton.transform import text
+
+            series = _url_series(rows, pct)
+            return lambda: text.clean_url(series)
+
+        case(f"clean_url_rowwise_u{pct}")(rowwise)
+        case(f"clean_url_unique_u{pct}")(unique)
+
+
+_register_unique_ratio_cases()
+
+
+def _register_worker_cases():
+    """Per-value transforms in-process vs. a process pool of one worker per CPU."""
+    def setup(rows: int, name: str, pooled: bool):
+        import os
+
+        from megaton.transform import ga4, parallel, text
+
+        funcs = {
+            "clean_url": (lambda series: lambda: text.clean_url(series), lambda: _url_series(rows, 100)),
+            "classify_source_channel": (lambda df: lambda: ga4.classify_source_channel(df), lambda: _traffic_frame(rows)),
+        }
+        make, data = funcs[name]
+        func = make(data())
+        if not pooled:
+            return func
+
+        def run():
+            with parallel.workers(os.cpu_count() or 1, min_values=1):
+                return func()
+
+        return run
+
+    for name in ["clean_url", "classify_source_channel"]:
+        case(f"{name}_inprocess")(partial(setup, name=name, pooled=False))
+        case(f"{name}_workers")(partial(setup, name=name, pooled=True))
+
+
+_register_worker_cases()
+
+
+def _run_one(name: str, rows: int) -> dict:
+    func = CASES[name](rows)
+    base = _rss_mb()
+    start = time.perf_counter()
+    out = func()
+    seconds = time.perf_counter() - start
+    peak = _rss_mb()
+    frame_mb = out.memory_usage(deep=True).sum() / (1024 * 1024) if isinstance(out, pd.DataFrame) else None
+    return {"case": name, "rows": rows, "seconds": seconds, "peak_mb": peak, "delta_mb": peak - base, "frame_mb": frame_mb}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cases", nargs="*", help="case names (default: all)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--list", action="store_true", help="list case names and exit")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+    if args.run_one:
+        print(json.dumps(_run_one(args.run_one, args.rows)))
+        return 0
+
+    names = args.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {unknown}. Use --list.")
+
+    print(f"{'case':<28}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}{'delta MB':>10}{'frame MB':>10}")
+    for name in names:
+        completed = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--run-one", name, "--rows", str(args.rows)],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            print(f"{name:<28} failed:\n{completed.stderr}", file=sys.stderr)
+            continue
+        res = json.loads(completed.stdout.strip().splitlines()[-1])
+        frame = "" if res["frame_mb"] is None else f"{res['frame_mb']:.0f}"
+        rate = res["rows"] / res["seconds"] if res["seconds"] else float("inf")
+        print(
+            f"{name:<28}{res['rows']:>10}{res['seconds']:>10.2f}{rate:>12,.0f}"
+            f"{res['peak_mb']:>10.0f}{res['delta_mb']:>10.0f}{frame:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from megaton.start import Megaton, ReportResult, SearchResult
+from megaton.transform.table import compact_frame
+
+
+def _ga4_df():
+    return pd.DataFrame({
+        'date': ['20240101', '20240101', '20240102', '20240102', '20240102', '20240101'],
+        'sessionSource': ['google', 'yahoo', 'google', None, 'google', 'yahoo'],
+        'landingPage': ['/A?x=1', '/b', '/a', '/b', '/A?x=1', '/b'],
+        'sessions': [10, 5, 3, 2, 7, 1],
+        'bounceRate': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+    })
+
+
+def test_compact_frame_converts_dimensions_and_downcasts_ints():
+    df = _ga4_df()
+    df['id'] = [f'u{i}' for i in range(len(df))]  # ほぼ一意な列は category にしない
+    out = compact_frame(df, ['date', 'sessionSource', 'landingPage', 'id'])
+
+    assert isinstance(out['sessionSource'].dtype, pd.CategoricalDtype)
+    assert isinstance(out['landingPage'].dtype, pd.CategoricalDtype)
+    assert not isinstance(out['id'].dtype, pd.CategoricalDtype)
+    assert out['sessions'].dtype == np.int32
+    assert out['bounceRate'].dtype == np.float64
+    # 値は変わらない、元の DataFrame も変わらない
+    pd.testing.assert_frame_equal(out.astype(df.dtypes.to_dict()), df)
+    assert df['sessions'].dtype == np.int64
+
+
+def test_compact_frame_keeps_int64_when_total_could_overflow():
+    df = pd.DataFrame({'k': ['a', 'a'], 'v': [2**30, 2**30]})
+    out = compact_frame(df, ['k'])
+    # 合計が int32 を超えるので downcast しない（集約でオーバーフローさせない）
+    assert out['v'].dtype == np.int64
+    assert ReportResult(out, ['k']).group('k').df['v'].tolist() == [2**31]
+
+
+def test_compact_report_chain_matches_default():
+    """compact() しても集約・正規化の結果（値）は同じ"""
+    def chain(result):
+        return (
+            result
+            .fill()
+            .normalize('sessionSource', {'google': 'G'})
+            .clean_url('landingPage')
+            .group(['date', 'sessionSource', 'landingPage'])
+            .sort(['date', 'sessionSource', 'landingPage'])
+        )
+
+    default = chain(ReportResult(_ga4_df())).df
+    compact = chain(ReportResult(_ga4_df()).compact())
+
+    assert isinstance(compact.df['sessionSource'].dtype, pd.CategoricalDtype)
+    assert isinstance(compact.df['landingPage'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(compact.df, default, check_dtype=False, check_categorical=False)
+
+
+def test_compact_report_chain_with_replace_matches_default():
+    """category 列の replace はカテゴリを置換する（同じ値になったカテゴリはまとまる）"""
+    def chain(result):
+        return (
+            result
+            .replace('sessionSource', {r'^(google|yahoo)$': 'search'})
+            .replace('landingPage', {'/b': '/B'}, regex=False)
+            .group(['date', 'sessionSource', 'landingPage'])
+            .sort(['date', 'sessionSource', 'landingPage'])
+        )
+
+    default = chain(ReportResult(_ga4_df())).df
+    compact = chain(ReportResult(_ga4_df()).compact())
+
+    assert isinstance(compact.df['sessionSource'].dtype, pd.CategoricalDtype)
+    assert compact.df['sessionSource'].cat.categories.tolist() == ['search']
+    replaced = ReportResult(_ga4_df()).compact().replace('sessionSource', {'yahoo': 'google'}, regex=False).df
+    assert replaced['sessionSource'].cat.categories.tolist() == ['google']
+    assert replaced['sessionSource'].isna().tolist() == [False, False, False, True, False, False]
+    pd.testing.assert_frame_equal(compact.df, default, check_dtype=False, check_categorical=False)
+
+
+def test_compact_search_aggregates_only_observed_groups():
+    df = pd.DataFrame({
+        'query': ['a', 'b', 'a', 'c'],
+        'page': ['/x', '/y', '/x', '/y'],
+        'clicks': [1, 2, 3, 4],
+        'impressions': [10, 20, 30, 40],
+        'position': [1.0, 2.0, 3.0, 4.0],
+    })
+    default = SearchResult(df, None, ['query', 'page']).aggregate().df
+    compact = SearchResult(df, None, ['query', 'page']).compact().aggregate().df
+
+    # category の直積（a × /y など）は出てこない
+    assert len(compact) == len(default) == 3
+    pd.testing.assert_frame_equal(compact, default, check_dtype=False, check_categorical=False)
+
+
+def test_set_dtypes_compact_applies_to_run_results(monkeypatch):
+    app = Megaton(None, headless=True)
+    app.ga = {
+        "4": SimpleNamespace(report=SimpleNamespace(start_date="2024-01-01", end_date="2024-01-31"))
+    }
+    app.search.use("https://example.com")
+    monkeypatch.setattr(
+        app._gsc_service,
+        "query",
+        lambda **kwargs: pd.DataFrame({"page": ["/a", "/a", "/b", "/b"], "clicks": [1, 2, 3, 4]}),
+    )
+
+    assert not isinstance(app.search.run(dimensions=["page"]).df["page"].dtype, pd.CategoricalDtype)
+
+    assert app.set.dtypes(compact=True) == {"compact": True}
+    result = app.search.run(dimensions=["page"])
+    assert isinstance(result.df["page"].dtype, pd.CategoricalDtype)
+    assert result.df["clicks"].dtype == np.int32
@@ -0,0 +1,106 @@
+import sys
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from megaton.start import Megaton, ReportResult, SearchResult
+from megaton.transform.table import convert_backend
+
+
+def _ga4_df():
+    return pd.DataFrame({
+        'date': ['20240101', '20240101', '20240102', '20240102', '20240102', '20240101'],
+        'sessionSource': ['google', 'yahoo', 'google', None, 'google', 'yahoo'],
+        'landingPage': ['/A?x=1', '/b', '/a', '/b', '/A?x=1', '/b'],
+        'sessions': [10, 5, 3, 2, 7, 1],
+        'bounceRate': [0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+    })
+
+
+def _gsc_df():
+    return pd.DataFrame({
+        'query': ['a', 'b', 'a', 'c'],
+        'page': ['/x?q=1', '/y', '/x', '/y#top'],
+        'clicks': [1, 2, 3, 0],
+        'impressions': [10, 20, 30, 40],
+        'position': [1.0, 2.0, 3.0, 4.0],
+    })
+
+
+@pytest.fixture(params=['numpy_nullable', 'pyarrow'])
+def backend(request):
+    if request.param == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    return request.param
+
+
+def test_convert_backend_changes_dtypes_not_values(backend):
+    df = _ga4_df()
+    out = convert_backend(df, backend)
+
+    prefix = 'int64[pyarrow]' if backend == 'pyarrow' else 'Int64'
+    assert str(out['sessions'].dtype) == prefix
+    pd.testing.assert_frame_equal(out, df, check_dtype=False)
+    assert convert_backend(df, 'numpy') is df
+
+
+def test_report_chain_matches_numpy_backend(backend):
+    def chain(result):
+        return (
+            result
+            .fill()
+            .normalize('sessionSource', {'google': 'G'})
+            .clean_url('landingPage')
+            .group(['date', 'sessionSource', 'landingPage'])
+            .sort(['date', 'sessionSource', 'landingPage'])
+        )
+
+    default = chain(ReportResult(_ga4_df())).df
+    converted = chain(ReportResult(_ga4_df()).convert_dtypes(backend)).df
+    pd.testing.assert_frame_equal(converted, default, check_dtype=False)
+
+
+def test_search_chain_matches_numpy_backend(backend):
+    def chain(result):
+        return result.decode().remove_params().remove_fragment().aggregate().filter_position(max=3.5, keep_clicked=True)
+
+    default = chain(SearchResult(_gsc_df(), None, ['query', 'page'])).df
+    converted = chain(SearchResult(_gsc_df(), None, ['query', 'page']).convert_dtypes(backend)).df
+    pd.testing.assert_frame_equal(converted, default, check_dtype=False)
+
+
+def test_invalid_backend_rejected_and_missing_pyarrow_fails_early(monkeypatch):
+    app = Megaton(None, headless=True)
+    with pytest.raises(ValueError, match="dtype_backend"):
+        app.set.dtypes(dtype_backend='arrow')
+    assert app.set.dtypes() == {}
+
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        app.set.dtypes(dtype_backend='pyarrow')
+    # lazy チェーンでも記録時点で失敗する
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        SearchResult(_gsc_df(), None, ['query', 'page']).lazy().convert_dtypes('pyarrow')
+    assert app.set.dtypes() == {}
+
+
+def test_set_dtypes_backend_applies_to_run_results(monkeypatch):
+    app = Megaton(None, headless=True)
+    app.ga = {
+        "4": SimpleNamespace(report=SimpleNamespace(start_date="2024-01-01", end_date="2024-01-31"))
+    }
+    app.search.use("https://example.com")
+    monkeypatch.setattr(
+        app._gsc_service,
+        "query",
+        lambda **kwargs: pd.DataFrame({"page": ["/a", "/a", "/b", "/b"], "clicks": [1, 2, 3, 4]}),
+    )
+
+    assert app.set.dtypes(compact=True, dtype_backend='numpy_nullable') == {
+        "compact": True,
+        "dtype_backend": "numpy_nullable",
+    }
+    result = app.search.run(dimensions=["page"])
+    assert isinstance(result.df["page"].dtype, pd.CategoricalDtype)
+    assert result.df["clicks"].dtype == "Int32"
@@ -1,6 +1,10 @@
+from types import SimpleNamespace
+
+import pandas as pd
 import pytest
 from googleapiclient.errors import HttpError
 
+from megaton.services import gsc_service
 from megaton.services.gsc_service import GSCService
 
 
@@ -283,3 +287,457 @@ def test_list_sites_retries_on_http_error(monkeypatch):
 
     assert sites == ["https://example.com/"]
     assert client.site_calls == 2
+
+
+class _FakeSC:
+    def __init__(self, client, credentials="creds"):
+        self.client = client
+        self.credentials = credentials
+
+
+def test_get_client_returns_seed_on_creating_thread():
+    seed = _FakeClient({})
+    app = type("App", (), {"_sc_client": _FakeSC(seed), "creds": "creds"})()
+    service = GSCService(app)
+
+    assert service._get_client() is seed
+    assert service._get_client() is seed
+
+
+def test_get_client_builds_separate_client_per_thread(monkeypatch):
+    import threading
+
+    seed = _FakeClient({})
+    built = []
+
+    def fake_build_service(credentials):
+        client = _FakeClient({})
+        built.append((credentials, client))
+        return client
+
+    monkeypatch.setattr(gsc_service.searchconsole, "build_service", fake_build_service)
+    app = type("App", (), {"_sc_client": _FakeSC(seed), "creds": "creds"})()
+    service = GSCService(app)
+    assert service._get_client() is seed
+
+    results = {}
+
+    def worker(name):
+        results[name] = (service._get_client(), service._get_client())
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(built) == 2
+    assert all(creds == "creds" for creds, _ in built)
+    for first, second in results.values():
+        assert first is second
+        assert first is not seed
+    assert results["a"][0] is not results["b"][0]
+
+
+def test_get_client_rebuilds_pool_when_sc_client_changes():
+    first = _FakeClient({})
+    second = _FakeClient({})
+    app = type("App", (), {"_sc_client": _FakeSC(first), "creds": "creds"})()
+    service = GSCService(app)
+
+    assert service._get_client() is first
+    app._sc_client = _FakeSC(second)
+    assert service._get_client() is second
+
+
+def test_concurrent_first_calls_share_one_pool(monkeypatch):
+    import threading
+    import time
+
+    seed = _FakeClient({})
+    pools = []
+
+    class SlowPool(gsc_service._ClientPool):
+        def __init__(self, credentials, seed=None):
+            pools.append(self)
+            time.sleep(0.05)  # 生成中に他スレッドが割り込めるようにする
+            super().__init__(credentials, seed=seed)
+
+    monkeypatch.setattr(gsc_service, "_ClientPool", SlowPool)
+    monkeypatch.setattr(gsc_service.searchconsole, "build_service", lambda credentials: _FakeClient({}))
+    service = GSCService(type("App", (), {"_sc_client": _FakeSC(seed), "creds": "creds"})())
+
+    barrier = threading.Barrier(4)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(service._get_client())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # プールは 1 つだけ作られ、seed は作成したスレッドだけが受け取る
+    assert len(pools) == 1
+    assert len(results) == 4 and len({id(client) for client in results}) == 4
+    assert sum(client is seed for client in results) == 1
+
+
+def test_concurrent_site_resolutions_are_all_persisted(monkeypatch, tmp_path):
+    import json
+    import threading
+    import time
+
+    cache = tmp_path / "gsc_sites.json"
+    monkeypatch.setenv("MEGATON_GSC_SITE_CACHE", str(cache))
+    original_dump = json.dump
+
+    def slow_dump(*args, **kwargs):
+        time.sleep(0.01)  # 書き込み中に他スレッドが割り込めるようにする
+        return original_dump(*args, **kwargs)
+
+    monkeypatch.setattr(gsc_service.json, "dump", slow_dump)
+    app = SimpleNamespace(creds=SimpleNamespace(service_account_email="sa@example.iam"))
+    service = GSCService(app=app, client=_FakeClient({}))
+
+    barrier = threading.Barrier(8)
+
+    def worker(i):
+        barrier.wait()
+        service._remember_site(f"https://example{i}.com", f"https://example{i}.com/")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    data = json.loads(cache.read_text(encoding="utf-8"))
+    assert data == {f"sa@example.iam|https://example{i}.com": f"https://example{i}.com/" for i in range(8)}
+
+
+def test_discovery_document_is_loaded_once(monkeypatch):
+    from megaton import searchconsole
+
+    searchconsole.discovery_document.cache_clear()
+    calls = []
+    original = searchconsole.discovery_cache.get_static_doc
+
+    def counting_get_static_doc(name, version):
+        calls.append((name, version))
+        return original(name, version)
+
+    monkeypatch.setattr(searchconsole.discovery_cache, "get_static_doc", counting_get_static_doc)
+    try:
+        first = searchconsole.discovery_document()
+        second = searchconsole.discovery_document()
+    finally:
+        searchconsole.discovery_document.cache_clear()
+
+    assert first is second
+    assert calls == [("searchconsole", "v1")]
+
+
+def test_build_service_is_offline_and_independent(monkeypatch):
+    from google.auth.credentials import AnonymousCredentials
+
+    from megaton import searchconsole
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("discovery must not be fetched")
+
+    monkeypatch.setattr(searchconsole, "build", no_network)
+
+    first = searchconsole.build_service(AnonymousCredentials())
+    second = searchconsole.build_service(AnonymousCredentials())
+
+    assert first is not second
+    assert first._http is not second._http
+    assert hasattr(first.searchanalytics(), "query")
+
+
+def _slash_only_client():
+    responses = {
+        0: [
+            {
+                "keys": ["q1", "https://example.com/a"],
+                "clicks": 1,
+                "impressions": 10,
+                "position": 2.0,
+            }
+        ]
+    }
+    errors_by_key = {("https://example.com", 0): [_http_error(status=404)] * 5}
+    return _FakeClient(responses, errors_by_key=errors_by_key)
+
+
+def _query_example(service):
+    return service.query(
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query", "page"],
+    )
+
+
+def test_query_remembers_resolved_site_url_variant(monkeypatch):
+    monkeypatch.delenv("MEGATON_GSC_SITE_CACHE", raising=False)
+    client = _slash_only_client()
+    service = GSCService(app=None, client=client)
+
+    assert not _query_example(service).empty
+    assert [c[0] for c in client.analytics.calls] == ["https://example.com", "https://example.com/"]
+
+    client.analytics.calls.clear()
+    assert not _query_example(service).empty
+    assert [c[0] for c in client.analytics.calls] == ["https://example.com/"]
+
+
+def test_query_prefers_variant_from_list_sites(monkeypatch):
+    monkeypatch.delenv("MEGATON_GSC_SITE_CACHE", raising=False)
+    client = _slash_only_client()
+    client.site_response = {"siteEntry": [{"siteUrl": "https://example.com/"}]}
+    service = GSCService(app=None, client=client)
+    service.list_sites()
+
+    assert not _query_example(service).empty
+    assert [c[0] for c in client.analytics.calls] == ["https://example.com/"]
+
+
+def test_query_site_url_resolution_persists_to_disk(monkeypatch, tmp_path):
+    cache = tmp_path / "gsc_sites.json"
+    monkeypatch.setenv("MEGATON_GSC_SITE_CACHE", str(cache))
+
+    app = SimpleNamespace(creds=SimpleNamespace(service_account_email="sa@example.iam"))
+
+    # 認証情報を特定できない場合は保存しない
+    assert not _query_example(GSCService(app=None, client=_slash_only_client())).empty
+    assert not cache.exists()
+
+    assert not _query_example(GSCService(app=app, client=_slash_only_client())).empty
+    assert cache.is_file()
+
+    client = _slash_only_client()
+    assert not _query_example(GSCService(app=app, client=client)).empty
+    assert [c[0] for c in client.analytics.calls] == ["https://example.com/"]
+
+
+def test_site_url_resolution_is_scoped_per_oauth_user(monkeypatch, tmp_path):
+    monkeypatch.setenv("MEGATON_GSC_SITE_CACHE", str(tmp_path / "gsc_sites.json"))
+
+    def oauth_app(token):
+        return SimpleNamespace(creds=SimpleNamespace(client_id="shared-app", refresh_token=token))
+
+    alice = GSCService(app=oauth_app("token-a"), client=_slash_only_client())
+    bob = GSCService(app=oauth_app("token-b"), client=None)
+    assert alice._credential_key() != bob._credential_key()
+    assert "token-a" not in alice._credential_key()
+
+    assert not _query_example(alice).empty
+    client = _slash_only_client()
+    assert not _query_example(GSCService(app=oauth_app("token-b"), client=client)).empty
+    # 同じ OAuth アプリの別ユーザーには記憶を使わない
+    assert [c[0] for c in client.analytics.calls] == ["https://example.com", "https://example.com/"]
+
+
+def test_known_sites_reset_when_client_changes(monkeypatch):
+    monkeypatch.delenv("MEGATON_GSC_SITE_CACHE", raising=False)
+    first = _slash_only_client()
+    first.site_response = {"siteEntry": [{"siteUrl": "https://example.com/"}]}
+    app = SimpleNamespace(_sc_client=SimpleNamespace(client=first, credentials=None), creds=None)
+    service = GSCService(app)
+    service.list_sites()
+    assert service._resolve_site_candidates("https://example.com")[0] == "https://example.com/"
+
+    app._sc_client = SimpleNamespace(client=_slash_only_client(), credentials=None)
+    service._get_client()
+    assert service._resolve_site_candidates("https://example.com")[0] == "https://example.com"
+
+
+def _paged_responses():
+    return {
+        0: [
+            {"keys": ["q1", "https://example.com/A?x=1"], "clicks": 1, "impressions": 10, "position": 2.0},
+            {"keys": ["q2", "https://example.com/b"], "clicks": 0, "impressions": 5, "position": 7.0},
+        ],
+        2: [
+            {"keys": ["q1", "https://example.com/a#top"], "clicks": 2, "impressions": 20, "position": 4.0},
+        ],
+    }
+
+
+def test_iter_pages_yields_each_page_without_aggregating():
+    client = _FakeClient(_paged_responses())
+    service = GSCService(app=None, client=client)
+
+    pages = service.iter_pages(
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query", "page"],
+        row_limit=2,
+        clean=True,
+    )
+
+    # Nothing is fetched until the generator is consumed.
+    assert client.analytics.calls == []
+    frames = list(pages)
+    assert [len(df) for df in frames] == [2, 1]
+    assert list(frames[0].columns) == ["query", "page", "clicks", "impressions", "ctr", "position"]
+    assert frames[1]["page"].tolist() == ["https://example.com/a"]
+
+
+def test_iter_pages_raises_api_errors():
+    client = _FakeClient(_paged_responses(), errors={2: [_http_error(500)] * 10})
+    service = GSCService(app=None, client=client)
+
+    pages = service.iter_pages(
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query", "page"],
+        row_limit=2,
+        max_retries=0,
+    )
+
+    assert len(next(pages)) == 2
+    with pytest.raises(HttpError):
+        next(pages)
+
+
+def test_query_raises_without_client_and_on_non_api_errors(monkeypatch):
+    kwargs = dict(site_url="https://example.com/", start_date="2024-01-01", end_date="2024-01-31", dimensions=["page"])
+    with pytest.raises(RuntimeError, match="not initialized"):
+        GSCService(app=None).query(**kwargs)
+
+    # API / transport errors keep the empty-frame contract; other errors surface
+    client = _FakeClient({0: [{"keys": ["/a"], "clicks": 1, "impressions": 2, "position": 1.0}]})
+    client.analytics.errors = {0: [ConnectionError("reset")]}
+    assert GSCService(app=None, client=client).query(max_retries=1, **kwargs).empty
+
+    def broken(*args, **kwargs):
+        raise ValueError("decode bug")
+
+    monkeypatch.setattr(GSCService, "_decode_rows", staticmethod(broken))
+    with pytest.raises(ValueError, match="decode bug"):
+        GSCService(app=None, client=client).query(**kwargs)
+
+
+def test_export_csv_streams_pages(tmp_path):
+    client = _FakeClient(_paged_responses())
+    service = GSCService(app=None, client=client)
+    path = tmp_path / "gsc.csv"
+
+    written = service.export(
+        path,
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query", "page"],
+        metrics=["clicks", "impressions"],
+        row_limit=2,
+    )
+
+    out = pd.read_csv(path)
+    assert written == 3
+    assert list(out.columns) == ["query", "page", "clicks", "impressions"]
+    assert out["clicks"].tolist() == [1, 0, 2]
+    assert not (tmp_path / "gsc.csv.partial").exists()
+
+
+def test_export_aggregate_matches_query(tmp_path):
+    service = GSCService(app=None, client=_FakeClient(_paged_responses()))
+    kwargs = dict(
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query", "page"],
+        row_limit=2,
+        clean=True,
+    )
+    expected = service.query(**kwargs)
+
+    path = tmp_path / "gsc.csv"
+    written = GSCService(app=None, client=_FakeClient(_paged_responses())).export(path, **kwargs)
+
+    out = pd.read_csv(path)
+    assert written == len(expected) == 2
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+
+def test_export_failure_leaves_no_file(tmp_path):
+    client = _FakeClient(_paged_responses(), errors={2: [_http_error(500)] * 10})
+    service = GSCService(app=None, client=client)
+    path = tmp_path / "gsc.csv"
+
+    with pytest.raises(HttpError):
+        service.export(
+            path,
+            site_url="https://example.com",
+            start_date="2024-01-01",
+            end_date="2024-01-31",
+            dimensions=["query", "page"],
+            row_limit=2,
+            max_retries=0,
+        )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_export_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    service = GSCService(app=None, client=_FakeClient(_paged_responses()))
+    path = tmp_path / "gsc.parquet"
+
+    service.export(
+        path,
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query"],
+        metrics=["clicks"],
+        row_limit=2,
+    )
+
+    assert pd.read_parquet(path)["clicks"].tolist() == [1, 0, 2]
+
+
+def test_export_feather_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    service = GSCService(app=None, client=_FakeClient(_paged_responses()))
+    path = tmp_path / "gsc.feather"
+
+    service.export(
+        path,
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query"],
+        metrics=["clicks"],
+        row_limit=2,
+    )
+
+    assert pd.read_feather(path)["clicks"].tolist() == [1, 0, 2]
+
+
+def test_session_dtype_backend_applies_to_query_and_pages():
+    app = SimpleNamespace(_dtypes={"dtype_backend": "numpy_nullable"})
+    kwargs = dict(
+        site_url="https://example.com",
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        dimensions=["query", "page"],
+        row_limit=2,
+    )
+    expected = GSCService(app=None, client=_FakeClient(_paged_responses())).query(**kwargs)
+
+    df = GSCService(app=app, client=_FakeClient(_paged_responses())).query(**kwargs)
+    assert df["clicks"].dtype == "Int64"
+    assert df["query"].dtype == "string"
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+    pages = list(GSCService(app=app, client=_FakeClient(_paged_responses())).iter_pages(**kwargs))
+    assert all(page["position"].dtype == "Float64" for page in pages)
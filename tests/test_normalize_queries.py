@@ -258,3 +258,37 @@ def test_normalize_queries_prefer_by_must_be_string():
     # prefer_by にリストを渡すとエラー
     with pytest.raises(TypeError, match="prefer_by must be a string, got list"):
         result.normalize_queries(prefer_by=['impressions', 'clicks'], group=True)
+
+
+@pytest.mark.parametrize('prefer_by', ['impressions', 'clicks', 'position'])
+def test_normalize_queries_matches_sort_dedup_merge(prefer_by):
+    """1 回の groupby 集約は従来の sort → dedup → aggregate → merge と同じ結果（同点・欠損含む）"""
+    import numpy as np
+    from megaton.transform import gsc
+    from megaton.transform.table import dedup_by_key
+    from megaton.transform.text import normalize_whitespace
+
+    rng = np.random.default_rng(0)
+    n = 400
+    variants = np.array(['矯正歯科', '矯正 歯科', '矯正  歯科', 'foo bar', 'foobar', 'x'], dtype=object)
+    df = pd.DataFrame({
+        'page': rng.choice(np.array(['/a', '/b', '/c'], dtype=object), n),
+        'query': variants[rng.integers(0, len(variants), n)],
+        'clicks': rng.integers(0, 3, n).astype(float),
+        'impressions': rng.integers(1, 4, n).astype(float),
+        'ctr': rng.random(n),
+        'position': rng.integers(1, 4, n).astype(float),
+    })
+    df.loc[::5, prefer_by] = np.nan
+    df.loc[df['query'] == 'x', prefer_by] = np.nan  # 全行が欠損のグループ
+    df.loc[7, 'query'] = None
+
+    key_cols = ['page', 'query_key']
+    work = df.assign(query_key=normalize_whitespace(df['query']))
+    top = dedup_by_key(work, key_cols, prefer_by=prefer_by, prefer_ascending=(prefer_by == 'position'))
+    expected = gsc.aggregate(work, key_cols).merge(top[key_cols + ['query']], on=key_cols, how='left')
+    expected = expected.drop(columns=['query_key'])
+
+    result = SearchResult(df, None, ['page', 'query']).normalize_queries(prefer_by=prefer_by)
+
+    pd.testing.assert_frame_equal(result.df, expected)
@@ -0,0 +1,106 @@
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from megaton.start import ReportResult, SearchResult
+from megaton.transform import ga4, parallel, text
+
+needs_fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="process pool needs the fork start method"
+)
+
+
+def _pages(rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    values = np.array(
+        [f"https://Example.com/%E3%83%86/p{i}?id={i % 3}#f" for i in range(80)] + [None, "", " /x "],
+        dtype=object,
+    )
+    return pd.Series(values[rng.integers(0, len(values), rows)])
+
+
+def test_workers_context_and_threshold():
+    assert parallel.pool_size(10**6) == 1
+    with parallel.workers(4, min_values=100):
+        assert parallel.pool_size(99) == 1
+        expected = 4 if "fork" in multiprocessing.get_all_start_methods() else 1
+        assert parallel.pool_size(100) == expected
+        with parallel.workers(1):
+            assert parallel.pool_size(10**6) == 1
+    assert parallel.pool_size(10**6) == 1
+
+    for bad in (0, -1, 1.5, True):
+        with pytest.raises(ValueError, match="workers"):
+            with parallel.workers(bad):
+                pass
+    with pytest.raises(ValueError, match="min_values"):
+        ReportResult(pd.DataFrame({"a": [1]})).with_workers(2, min_values=0)
+
+
+@needs_fork
+def test_map_chunks_returns_chunks_in_order():
+    data = list(range(10))
+    with parallel.workers(3, min_values=1):
+        chunks = parallel.map_chunks(lambda start, stop: data[start:stop], len(data))
+    assert chunks == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert parallel.map_chunks(lambda start, stop: data[start:stop], len(data)) is None
+
+    def fail(start, stop):
+        if start:
+            raise ValueError(f"bad chunk {start}")
+        return data[start:stop]
+
+    with parallel.workers(2, min_values=1):
+        with pytest.raises(ValueError, match="bad chunk 5"):
+            parallel.map_chunks(fail, len(data))
+
+
+@needs_fork
+def test_text_helpers_match_in_process_results():
+    series = _pages()
+    serial = [text.clean_url(series), text.normalize_whitespace(series), text.map_by_regex(series, {"p1": "one"})]
+    with parallel.workers(3, min_values=1):
+        pooled = [text.clean_url(series), text.normalize_whitespace(series), text.map_by_regex(series, {"p1": "one"})]
+    for expected, actual in zip(serial, pooled):
+        pd.testing.assert_series_equal(actual, expected)
+
+
+@needs_fork
+def test_result_chains_with_workers_match():
+    df = pd.DataFrame({"page": _pages(), "query": _pages(seed=1), "clicks": 1, "impressions": 2, "position": 3.0})
+
+    def chain(result):
+        return result.clean_url("page").classify("page", by={"p1": "one"}).decode()
+
+    default = chain(SearchResult(df, None, ["page", "query"]))
+    pooled = chain(SearchResult(df, None, ["page", "query"]).with_workers(2, min_values=1))
+    assert pooled._workers == (2, 1)
+    pd.testing.assert_frame_equal(pooled.df, default.df)
+
+    lazy = SearchResult(df, None, ["page", "query"]).with_workers(2, min_values=1).lazy().clean_url("page")
+    pd.testing.assert_frame_equal(lazy.collect().df, SearchResult(df, None, ["page", "query"]).clean_url("page").df)
+
+    report = ReportResult(df.rename(columns={"page": "landingPage"}), ["landingPage", "query"])
+    expected = report.clean_url("landingPage").categorize("landingPage", by={"p2": "two"}, into="kind")
+    actual = report.with_workers(2, min_values=1).clean_url("landingPage").categorize(
+        "landingPage", by={"p2": "two"}, into="kind"
+    )
+    pd.testing.assert_frame_equal(actual.df, expected.df)
+    assert report.with_workers(1)._workers is None
+
+
+@needs_fork
+def test_classify_source_channel_with_workers_matches():
+    rng = np.random.default_rng(0)
+    sources = np.array(["google", "chatgpt.com", "t.co", "www.facebook.com", "maps.google.com", None, "dentamap.jp"], dtype=object)
+    df = pd.DataFrame({
+        "channel": rng.choice(np.array(["Referral", "Direct", "Organic Search"], dtype=object), 200),
+        "medium": rng.choice(np.array(["referral", "map", "(none)"], dtype=object), 200),
+        "source": sources[rng.integers(0, len(sources), 200)],
+    })
+    expected = ga4.classify_source_channel(df, custom_channels={"Group": [r"dentamap\.jp"]})
+    with parallel.workers(3, min_values=1):
+        actual = ga4.classify_source_channel(df, custom_channels={"Group": [r"dentamap\.jp"]})
+    pd.testing.assert_frame_equal(actual, expected)
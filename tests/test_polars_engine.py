@@ -0,0 +1,115 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from megaton.start import ReportResult, SearchResult
+
+
+def _gsc_df(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    queries = np.array([f'q{i % 37}' + (' x' if i % 5 else 'x') for i in range(200)], dtype=object)
+    pages = np.array([f'https://example.com/p{i}?a={i % 3}#f' for i in range(50)] + [None], dtype=object)
+    impressions = rng.integers(0, 50, rows).astype(float)
+    impressions[::97] = np.nan
+    return pd.DataFrame({
+        'site': rng.choice(np.array(['a', 'b', 'c'], dtype=object), rows),
+        'query': queries[rng.integers(0, len(queries), rows)],
+        'page': pages[rng.integers(0, len(pages), rows)],
+        'clicks': rng.integers(0, 5, rows),
+        'impressions': impressions,
+        'ctr': rng.random(rows),
+        'position': rng.integers(1, 40, rows) / 4,
+    })
+
+
+def _ga4_df(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    sources = np.array(['google', 'yahoo', '(direct)', None], dtype=object)
+    users = rng.integers(0, 30, rows).astype(float)
+    users[::13] = np.nan
+    return pd.DataFrame({
+        'month': rng.choice(np.array(['202401', '202402', '202403'], dtype=object), rows),
+        'sessionSource': sources[rng.integers(0, len(sources), rows)],
+        'sessions': rng.integers(0, 100, rows),
+        'users': users,
+    })
+
+
+@pytest.fixture
+def polars():
+    pytest.importorskip('polars')
+    pytest.importorskip('pyarrow')
+
+
+def _assert_same(actual, expected):
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_categorical=False, rtol=1e-9)
+
+
+def test_search_chain_matches_pandas_engine(polars):
+    def chain(result):
+        return (
+            result
+            .decode(group=False)
+            .remove_params()
+            .classify('query', by={'q1': 'one'})
+            .normalize_queries(prefer_by='impressions')
+            .aggregate(['site', 'page'])
+        )
+
+    default = chain(SearchResult(_gsc_df(), None, ['site', 'query', 'page']))
+    engine = chain(SearchResult(_gsc_df(), None, ['site', 'query', 'page']).with_engine('polars'))
+    assert engine._engine == 'polars'
+    _assert_same(engine.df, default.df)
+
+
+@pytest.mark.parametrize('prefer_by', ['impressions', 'position'])
+def test_normalize_queries_top_query_matches_pandas_engine(polars, prefer_by):
+    df = _gsc_df()
+    default = SearchResult(df, None, ['site', 'query']).normalize_queries(prefer_by=prefer_by).df
+    engine = SearchResult(df, None, ['site', 'query']).with_engine('polars').normalize_queries(prefer_by=prefer_by).df
+    _assert_same(engine, default)
+
+
+def test_lazy_chain_uses_engine(polars):
+    result = SearchResult(_gsc_df(), None, ['site', 'query', 'page']).lazy().remove_params()
+    default = result.collect().df
+    engine = result.with_engine('polars').collect()
+    assert engine._engine == 'polars'
+    _assert_same(engine.df, default)
+
+
+@pytest.mark.parametrize('method', ['sum', 'mean', 'count', 'min', 'max'])
+@pytest.mark.parametrize('dropna', [True, False])
+def test_report_group_matches_pandas_engine(polars, method, dropna):
+    df = _ga4_df()
+    by = ['month', 'sessionSource']
+    default = ReportResult(df).group(by, method=method, dropna=dropna).df
+    engine = ReportResult(df).with_engine('polars').group(by, method=method, dropna=dropna).df
+    _assert_same(engine, default)
+
+
+def test_report_chain_with_compact_and_min_count(polars):
+    df = _ga4_df()
+    df.loc[df['month'] == '202403', 'users'] = np.nan
+
+    def chain(result):
+        return result.compact().fill().group(['month', 'sessionSource'], min_count=1).sort('month')
+
+    default = chain(ReportResult(df)).df
+    engine = chain(ReportResult(df).with_engine('polars')).df
+    assert engine.loc[engine['month'] == '202403', 'users'].isna().all()
+    _assert_same(engine, default)
+
+
+def test_with_engine_validates_before_running(monkeypatch):
+    result = ReportResult(_ga4_df(10))
+    with pytest.raises(ValueError, match="engine"):
+        result.with_engine('spark')
+
+    monkeypatch.setitem(sys.modules, 'polars', None)
+    with pytest.raises(ImportError, match="pip install polars"):
+        result.with_engine('polars')
+    # pandas エンジンは常に使える
+    assert result.with_engine('pandas').group('month').df['sessions'].sum() == _ga4_df(10)['sessions'].sum()
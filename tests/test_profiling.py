@@ -0,0 +1,100 @@
+import logging
+import tracemalloc
+from types import SimpleNamespace
+
+import pandas as pd
+
+from megaton import profiling
+from megaton.start import Megaton, ReportResult, SearchResult
+
+
+def _gsc_df():
+    return pd.DataFrame({
+        'query': ['a b', 'ab', 'c', 'c', 'd'],
+        'page': ['/x', '/x', '/y', '/y', '/z'],
+        'clicks': [1, 2, 0, 4, 0],
+        'impressions': [10, 20, 1, 40, 3],
+        'position': [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+
+def _chain(result):
+    return result.normalize_queries().classify('page', by={'x': 'X'}).filter_impressions(min=5)
+
+
+def test_profile_records_each_chain_call():
+    default = _chain(SearchResult(_gsc_df(), None, ['query', 'page']))
+    assert default.profile().empty
+    assert list(default.profile().columns) == profiling.COLUMNS
+
+    with profiling.enabled():
+        result = _chain(SearchResult(_gsc_df(), None, ['query', 'page']))
+    pd.testing.assert_frame_equal(result.df, default.df)
+
+    profile = result.profile()
+    assert profile['step'].tolist() == ['normalize_queries', 'classify', 'filter_impressions']
+    assert profile['rows_in'].tolist() == [5, 3, 3]
+    assert profile['rows_out'].tolist() == [3, 3, 2]
+    assert profile['aggregated'].tolist() == [True, True, False]
+    assert (profile['seconds'] >= 0).all() and (profile['peak_bytes'] >= 0).all()
+
+    # 分岐したチェーンは互いの記録を共有しない。ブロックの外の呼び出しは記録しない
+    with profiling.enabled(memory=False):
+        branch = result.aggregate(['page'])
+    assert branch.profile()['step'].tolist()[-1] == 'aggregate'
+    assert branch.profile()['peak_bytes'].isna().iloc[-1]
+    assert len(result.profile()) == 3
+    assert len(branch.filter_clicks(min=1).profile()) == 4
+
+
+def test_profile_nested_and_lazy_calls():
+    report = ReportResult(_gsc_df(), ['query', 'page'])
+    with profiling.enabled():
+        grouped = report.classify('page', by={'x': 'X'}).to_int()
+        lazy = SearchResult(_gsc_df(), None, ['query', 'page']).lazy().decode().filter_impressions(min=5)
+        collected = lazy.collect()
+
+    # classify が内部で呼ぶ normalize / group は classify の 1 行にまとまる
+    profile = grouped.profile()
+    assert profile['step'].tolist() == ['classify', 'to_int']
+    assert profile['aggregated'].tolist() == [True, False]
+
+    profile = collected.profile()
+    assert profile['step'].tolist() == ['decode', 'filter_impressions', 'collect']
+    assert profile['rows_out'].isna().tolist() == [True, True, False]
+    assert profile['rows_out'].iloc[-1] == len(collected.df)
+
+
+def test_profile_keeps_an_outside_tracemalloc_peak():
+    tracemalloc.start()
+    try:
+        blob = bytearray(10_000_000)
+        del blob
+        before = tracemalloc.get_traced_memory()[1]
+        with profiling.enabled():
+            result = ReportResult(_gsc_df(), ['query', 'page']).group('page')
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[1] >= before >= 10_000_000
+    finally:
+        tracemalloc.stop()
+    assert result.profile()['peak_bytes'].iloc[0] >= 0
+
+
+def test_set_profile_applies_to_run_results(monkeypatch, caplog):
+    app = Megaton(None, headless=True)
+    app.ga = {
+        "4": SimpleNamespace(report=SimpleNamespace(start_date="2024-01-01", end_date="2024-01-31"))
+    }
+    app.search.use("https://example.com")
+    monkeypatch.setattr(app._gsc_service, "query", lambda **kwargs: _gsc_df())
+
+    assert app.search.run(dimensions=['query', 'page'], clean=False).filter_clicks(min=1).profile().empty
+
+    assert app.set.profile(True, log=True) == {"enabled": True, "log": True}
+    with caplog.at_level(logging.INFO, logger="megaton.profiling"):
+        result = _chain(app.search.run(dimensions=['query', 'page'], clean=False))
+    assert result.profile()['step'].tolist() == ['normalize_queries', 'classify', 'filter_impressions']
+    assert "normalize_queries" in caplog.text and "(aggregated)" in caplog.text
+
+    assert app.set.profile(False) == {"enabled": False, "log": True}
+    assert app.search.run(dimensions=['query', 'page'], clean=False).filter_clicks(min=1).profile().empty
@@ -507,6 +507,25 @@ def test_report_result_replace_regex_multiple():
     assert replaced.df['campaign'].values[2] == 'plain'
 
 
+
+def test_report_result_replace_and_month_key_match_per_row_results():
+    """replace() / month_key() はユニーク値ごとに処理しても行ごとの結果と同じ"""
+    df = pd.DataFrame({
+        'date': ['20240131', '20240201', None, '20240131', 'bad', '20240201'],
+        'campaign': ['a(1)', 'b', None, 'a(1)', 'oo', 'b'],
+        'sessions': [1, 2, 3, 4, 5, 6],
+    })
+    by = {r'\([^)]*\)': '', r'o': '0', r'0': 'O'}
+
+    replaced = ReportResult(df).replace('campaign', by)
+    pd.testing.assert_series_equal(replaced.df['campaign'], df['campaign'].replace(by, regex=True))
+
+    monthly = ReportResult(df).month_key('date', into='month', fmt='%Y%m')
+    expected = pd.to_datetime(df['date'], errors='coerce').dt.strftime('%Y%m')
+    pd.testing.assert_series_equal(monthly.df['month'], expected.rename('month'))
+    assert monthly.df['month'].tolist()[:2] == ['202401', '202402']
+    assert 'month' in monthly.dimensions
+
 def test_report_result_clean_url():
     """clean_url() のテスト"""
     df = pd.DataFrame({
@@ -874,3 +893,95 @@ def test_to_int_robust_on_object_dtype_column():
     out = ReportResult(df, ["k"]).to_int("ad_cost").df
     assert out["ad_cost"].tolist() == [10, 2, 0]
     assert str(out["ad_cost"].dtype) == "int64"
+
+
+def test_chain_shares_untouched_columns_and_keeps_source():
+    """列を置き換えるだけの変換は他の列のバッファを共有し、元 df は変更しない"""
+    import numpy as np
+    from megaton import _result
+
+    if not _result._copy_on_write():
+        pytest.skip("copy-on-write is off; deep copies are used")
+
+    df = pd.DataFrame({
+        "date": ["20240105", "20240210"],
+        "sessionSource": ["Google", None],
+        "sessions": [1.5, None],
+        "users": [1.0, 2.0],
+    })
+    snapshot = df.copy()
+
+    out = (
+        ReportResult(df, ["date", "sessionSource"])
+        .fill()
+        .normalize("sessionSource", {"google": "G"})
+        .month_key("date", into="month")
+        .to_int("sessions")
+        .df
+    )
+
+    pd.testing.assert_frame_equal(df, snapshot)
+    assert out["sessionSource"].tolist() == ["G", "(not set)"]
+    assert out["sessions"].tolist() == [1, 0]
+    assert np.shares_memory(out["users"].to_numpy(), df["users"].to_numpy())
+
+
+def test_inplace_edits_of_result_df_do_not_leak():
+    """result.df を in-place で書き換えても元 df / 親の結果は変わらない"""
+    from megaton import wrap
+
+    df = pd.DataFrame({"page": ["/a", "/b"], "sessions": [1, 2]})
+    result = wrap(df)
+    result.df.loc[0, "sessions"] = 99
+    assert df["sessions"].tolist() == [1, 2]
+
+    base = ReportResult(df, ["page"])
+    child = base.fill()
+    child.df.loc[0, "sessions"] = 77
+    assert base.df["sessions"].tolist() == [1, 2]
+    assert df["sessions"].tolist() == [1, 2]
+
+
+def test_report_result_cube_answers_group_from_preaggregate():
+    """cube() 後の group() は全行からの group() と同じ結果"""
+    df = pd.DataFrame({
+        'month': ['202401', '202401', '202402', '202402', None, '202401'],
+        'channel': ['Organic', 'Direct', 'Organic', 'Organic', 'Direct', 'Organic'],
+        'site': ['a', 'b', 'a', 'b', 'a', 'a'],
+        'sessions': [10, 5, 7, 3, 2, 1],
+        'cv': [1.0, None, 2.0, None, None, 0.5],
+        'engagementRate': [0.5, 0.1, 0.2, 0.3, 0.4, 0.6],
+    })
+    base = ReportResult(df, ['month', 'channel', 'site'])
+    cube = base.cube()
+    assert cube._cube is not None
+    assert cube._cube.metrics == ('sessions', 'cv')
+    pd.testing.assert_frame_equal(cube.df, df)
+
+    for by, kwargs in [
+        ('month', {}),
+        (['month', 'channel'], {'dropna': False}),
+        (['site'], {'metrics': ['cv'], 'min_count': 1}),
+        (['channel'], {'method': 'count'}),
+        (['month'], {'method': 'max', 'metrics': 'cv'}),
+    ]:
+        pd.testing.assert_frame_equal(cube.group(by, **kwargs).df, base.group(by, **kwargs).df)
+
+    # dims 外の指標・method は全行から集計
+    pd.testing.assert_frame_equal(cube.group('month', method='mean').df, base.group('month', method='mean').df)
+    pd.testing.assert_frame_equal(base.cube(['month']).group('site').df, base.group('site').df)
+    # 変換後は事前集計を引き継がない
+    assert cube.fill()._cube is None
+
+
+def test_report_result_cube_rejects_non_additive_metrics():
+    df = pd.DataFrame({'month': ['202401'], 'sessions': [1], 'engagementRate': [0.5], 'sessionsPerUser': [1.2]})
+    result = ReportResult(df, ['month'])
+    with pytest.raises(ValueError, match="engagementRate"):
+        result.cube(metrics=['sessions', 'engagementRate'])
+    with pytest.raises(ValueError, match="sessionsPerUser"):
+        result.cube(metrics=['sessionsPerUser'])
+    with pytest.raises(ValueError, match="numeric"):
+        result.cube(metrics=['month'])
+    with pytest.raises(KeyError):
+        result.cube(dims=['site'])
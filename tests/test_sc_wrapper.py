@@ -160,3 +160,51 @@ def test_search_run_requires_site():
 def test_sc_aliases_search():
     app = Megaton(None, headless=True)
     assert app.sc is app.search
+
+
+def test_search_run_clean_is_handled_by_service_in_one_pass(monkeypatch):
+    app = Megaton(None, headless=True)
+    app.search.use("https://example.com")
+    app.search.set.dates("2024-01-01", "2024-01-31")
+
+    called = {}
+
+    def fake_query(**kwargs):
+        called["kwargs"] = kwargs
+        return pd.DataFrame({"page": ["https://example.com/Page?x=1"], "clicks": [1]})
+
+    monkeypatch.setattr(app._gsc_service, "query", fake_query)
+
+    result = app.search.run(dimensions=["page"], metrics=["clicks"], clean=True)
+
+    assert called["kwargs"]["clean"] is True
+    # The result chain does not re-clean / re-aggregate what the service returned.
+    assert result.df["page"].tolist() == ["https://example.com/Page?x=1"]
+
+
+def test_search_run_sink_exports_instead_of_querying(monkeypatch, tmp_path):
+    app = Megaton(None, headless=True)
+    app.search.use("https://example.com")
+    app.search.set.dates("2024-01-01", "2024-01-31")
+
+    called = {}
+
+    def fake_export(path, **kwargs):
+        called["path"] = path
+        called["kwargs"] = kwargs
+        return 0
+
+    def fail_query(**kwargs):
+        raise AssertionError("query must not run when sink is given")
+
+    monkeypatch.setattr(app._gsc_service, "export", fake_export)
+    monkeypatch.setattr(app._gsc_service, "query", fail_query)
+
+    sink = tmp_path / "out.csv"
+    result = app.search.run(dimensions=["page"], sink=sink, clean=True, max_rows=10**6)
+
+    assert result == str(sink)
+    assert called["path"] == sink
+    assert called["kwargs"]["clean"] is True
+    assert called["kwargs"]["max_rows"] == 10**6
+    assert app.search.data is None
@@ -0,0 +1,198 @@
+import pandas as pd
+import pytest
+
+from megaton.start import SearchResult
+
+
+def _gsc_df():
+    return pd.DataFrame({
+        'site': ['a', 'a', 'a', 'b', 'b', 'b'],
+        'query': ['矯正 歯科', '矯正歯科', 'Foo', 'foo', 'bar', None],
+        'page': [
+            'https://example.com/%E3%83%86?x=1',
+            'https://Example.com/%E3%83%86#top',
+            'https://example.com/A',
+            'https://example.com/a?utm=1',
+            None,
+            'https://example.com/B',
+        ],
+        'clicks': [1, 2, 0, 3, 0, 5],
+        'impressions': [10, 20, 5, 30, 8, 50],
+        'ctr': [0.1, 0.1, 0.0, 0.1, 0.0, 0.1],
+        'position': [1.5, 2.5, 9.0, 3.0, 12.0, 4.0],
+    })
+
+
+PAGE_MAP = {'/テ': 'te', '/a$': 'a'}
+
+
+def _chain(result):
+    return (
+        result
+        .decode()
+        .remove_params()
+        .remove_fragment()
+        .lower(['page', 'query'])
+        .filter_impressions(min=6, keep_clicked=True)
+        .classify('page', by=PAGE_MAP)
+        .normalize_queries(prefer_by='impressions')
+        .filter_position(max=10)
+    )
+
+
+def test_lazy_chain_matches_eager():
+    """lazy().collect() は eager と同じ結果になる"""
+    dims = ['site', 'query', 'page']
+    eager = _chain(SearchResult(_gsc_df(), None, dims)).df
+    lazy = _chain(SearchResult(_gsc_df(), None, dims).lazy()).collect().df
+
+    pd.testing.assert_frame_equal(lazy, eager)
+
+
+def test_lazy_group_false_chain_matches_eager():
+    dims = ['site', 'query', 'page']
+
+    def chain(result):
+        return (
+            result
+            .decode(group=False)
+            .lower(['page'], group=False)
+            .filter_clicks(min=1)
+            .clean_url(group=False)
+            .normalize('page', by=PAGE_MAP)
+            .categorize('page', by={'^te$': 'TE'}, into='page_type')
+        )
+
+    eager = chain(SearchResult(_gsc_df(), None, dims))
+    lazy = chain(SearchResult(_gsc_df(), None, dims).lazy()).collect()
+
+    pd.testing.assert_frame_equal(lazy.df, eager.df)
+    assert lazy.dimensions == eager.dimensions == dims + ['page_type']
+
+
+def test_lazy_collapses_consecutive_aggregations(monkeypatch):
+    """連続する group=True は最後の 1 回の集約にまとめられる"""
+    calls = []
+    original = SearchResult._aggregate_gsc
+
+    def counting_aggregate(self, df, dims):
+        calls.append(list(dims))
+        return original(self, df, dims)
+
+    monkeypatch.setattr(SearchResult, '_aggregate_gsc', counting_aggregate)
+
+    dims = ['query', 'page']
+    result = SearchResult(_gsc_df(), None, dims)
+    eager = result.decode().remove_params().remove_fragment().lower().df
+    assert len(calls) == 4
+
+    calls.clear()
+    lazy = result.lazy().decode().remove_params().remove_fragment().lower().collect().df
+    assert calls == [dims]
+    pd.testing.assert_frame_equal(lazy, eager)
+
+
+def test_lazy_keeps_aggregation_before_filter():
+    """指標フィルタの前の集約はまとめない（集約後の値でフィルタする）"""
+    df = pd.DataFrame({
+        'page': ['/A', '/a'],
+        'clicks': [0, 0],
+        'impressions': [4, 4],
+        'position': [1.0, 1.0],
+    })
+    result = SearchResult(df, None, ['page'])
+
+    eager = result.lower().filter_impressions(min=5).df
+    lazy = result.lazy().lower().filter_impressions(min=5).collect().df
+
+    assert eager['impressions'].tolist() == [8]
+    pd.testing.assert_frame_equal(lazy, eager)
+
+
+def test_lazy_pushes_filter_before_column_maps():
+    seen = []
+    dims = ['query', 'page']
+    result = SearchResult(_gsc_df(), None, dims).lazy()
+
+    def spy(value):
+        seen.append(value)
+        return value
+
+    lazy = (
+        result
+        .normalize('query', by=spy, lower=False, strip=False)
+        .filter_clicks(min=3)
+    )
+    plan = SearchResult._optimize(lazy._plan)
+    assert [step.kind for step in plan] == ['frame', 'map']
+
+    out = lazy.collect().df
+    assert sorted(seen) == ['foo']
+    assert out['clicks'].tolist() == [3, 5]
+
+
+def test_lazy_fuses_maps_on_same_column_per_unique():
+    df = pd.DataFrame({
+        'page': ['/A?x=1', '/A?x=1', '/A?x=1', '/B'],
+        'clicks': [1, 1, 1, 1],
+        'impressions': [1, 1, 1, 1],
+        'position': [1.0, 1.0, 1.0, 1.0],
+    })
+    seen = []
+
+    def spy(value):
+        seen.append(value)
+        return value
+
+    result = SearchResult(df, None, ['page'])
+    lazy = result.lazy().remove_params(group=False).normalize('page', by=spy).collect()
+
+    assert sorted(seen) == ['/a', '/b']
+    pd.testing.assert_frame_equal(lazy.df, result.remove_params(group=False).normalize('page', by=spy).df)
+
+
+def test_lazy_fused_maps_keep_mixed_object_values_apart():
+    """1 / 1.0 / True は object のハッシュで同一視されるため、融合せず順に実行する"""
+    df = pd.DataFrame({
+        'page': pd.Series([1, 1.0, True, '/a%41'], dtype=object),
+        'clicks': [1, 1, 1, 1],
+        'impressions': [1, 1, 1, 1],
+        'position': [1.0, 1.0, 1.0, 1.0],
+    })
+    result = SearchResult(df, None, ['page'])
+    lazy = result.lazy().decode(group=False).remove_fragment(group=False).collect()
+
+    assert lazy.df['page'].tolist() == ['1', '1.0', 'True', '/aA']
+    pd.testing.assert_frame_equal(lazy.df, result.decode(group=False).remove_fragment(group=False).df)
+
+
+def test_lazy_does_not_touch_source_and_reports_errors_on_collect():
+    df = _gsc_df()
+    snapshot = df.copy()
+    lazy = SearchResult(df, None, ['page']).lazy().decode().clean_url('missing')
+
+    pd.testing.assert_frame_equal(df, snapshot)
+    with pytest.raises(ValueError, match="Column 'missing' not found"):
+        lazy.collect()
+    pd.testing.assert_frame_equal(df, snapshot)
+
+
+def test_lazy_df_collects_and_mode_switches_are_idempotent():
+    result = SearchResult(_gsc_df(), None, ['page'])
+    assert result.collect() is result
+
+    lazy = result.lazy()
+    assert lazy.lazy() is lazy
+    chained = lazy.lower(group=False)
+    assert chained.df['page'].iloc[2] == 'https://example.com/a'
+    assert chained.collect() is chained.collect()
+    # lazy().aggregate(by=...) updates dimensions without running anything
+    assert lazy.aggregate(by='site').dimensions == ['site']
+
+
+def test_lazy_apply_if_records_step():
+    result = SearchResult(_gsc_df(), None, ['site']).lazy()
+    chained = result.apply_if(True, 'filter_clicks', min=3)
+
+    assert len(chained._plan) == 1
+    assert chained.collect().df['clicks'].tolist() == [3, 5]
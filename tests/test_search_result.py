@@ -718,6 +718,26 @@ def test_filter_with_sites_keep_clicked_max():
     assert 500 not in filtered.df['impressions'].values
 
 
+def test_filter_keep_clicked_preserves_row_order_and_index():
+    """keep_clicked でも元の行順・index のまま 1 回で抽出される"""
+    df = pd.DataFrame({
+        'site': ['A', 'B', 'A', None, 'B', 'C'],
+        'impressions': [5, 50, 500, 1, 8, 3],
+        'clicks': [0, None, 0, 0, 2, 0],
+    }, index=[10, 11, 12, 13, 14, 15])
+    sites = [
+        {'site': 'A', 'min_impressions': 10},
+        {'site': 'B', 'min_impressions': 10, 'max_impressions': 40},
+        {'site': 'A', 'min_impressions': 100},  # 同じサイトは後勝ち
+    ]
+    result = SearchResult(df, None, ['site'])
+    filtered = result.filter_impressions(sites=sites, site_key='site', keep_clicked=True)
+
+    # A: min=100 → 500 のみ / B: NaN と clicked は無条件 / site 欠損・未知サイトは閾値なし
+    assert filtered.df.index.tolist() == [11, 12, 13, 14, 15]
+    assert list(filtered.df.columns) == ['site', 'impressions', 'clicks']
+
+
 # ---------------------------------------------------------------------------
 # aggregate with no by
 # ---------------------------------------------------------------------------
@@ -734,3 +754,27 @@ def test_aggregate_no_by():
     assert len(aggregated.df) == 1
     assert aggregated.df['clicks'].iloc[0] == 30
     assert aggregated.dimensions == ['query']
+
+
+def test_search_chain_keeps_source_unchanged():
+    """チェーンは元の DataFrame を変更しない（浅いコピー + 列の置き換え）"""
+    df = pd.DataFrame({
+        'page': ['https://Example.com/A?x=1#f', 'https://example.com/b'],
+        'query': ['Foo', 'bar'],
+        'clicks': [0, 3],
+        'impressions': [10, 20],
+        'position': [1.0, 2.0],
+    })
+    snapshot = df.copy()
+
+    result = (
+        SearchResult(df, None, ['page', 'query'])
+        .decode(group=False)
+        .remove_params(group=False)
+        .lower(['page', 'query'], group=False)
+        .categorize('page', by={'/a': 'A'})
+        .filter_impressions(min=5, sites=[{'site': 'x'}], keep_clicked=True)
+    )
+
+    pd.testing.assert_frame_equal(df, snapshot)
+    assert sorted(result.df['page']) == ['https://example.com/a#f', 'https://example.com/b']
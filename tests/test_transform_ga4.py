@@ -210,3 +210,32 @@ def test_classify_source_channel_search_normalization():
     
     assert result["source"].tolist() == ["docomo.ne.jp", "bing", "bing", "auone.jp", "auone.jp"]
     assert all(ch == "Organic Search" for ch in result["channel"].tolist())
+
+
+def test_classify_source_channel_priority_and_repeated_rows():
+    """優先順（AI → Map → Referral の再分類 → 元の channel）が行の重複や index に関係なく同じ"""
+    rows = [
+        # AI は medium でも判定され、Map より優先
+        {"channel": "Direct", "medium": "chatgpt", "source": "maps.google.com"},
+        {"channel": "Direct", "medium": "MAP", "source": "example.com"},
+        # Referral 以外は再分類しない
+        {"channel": "Organic Search", "medium": "organic", "source": "facebook.com"},
+        # Organic Search → Organic Social → カスタムの順
+        {"channel": "Referral", "medium": "referral", "source": "search.example.com"},
+        {"channel": "Referral", "medium": "referral", "source": "www.Instagram.com"},
+        {"channel": "Referral", "medium": "referral", "source": "example.com"},
+        {"channel": "Referral", "medium": "referral", "source": None},
+    ]
+    df = pd.DataFrame(rows * 3, index=range(100, 100 + len(rows) * 3))
+
+    result = classify_source_channel(df, custom_channels={"Group": [r"example\.com"]})
+
+    assert result.index.tolist() == df.index.tolist()
+    assert result["channel"].tolist() == [
+        "AI", "Map", "Organic Search", "Organic Search", "Organic Social", "Group", "Referral",
+    ] * 3
+    # 欠損の source は行ごとの str() と同じ（pandas 3 は "nan"、2.x は "None"）
+    missing = str(df["source"].iloc[6])
+    assert result["source"].tolist() == [
+        "maps.google.com", "example.com", "Facebook", "search.example.com", "Instagram", "example.com", missing,
+    ] * 3
@@ -0,0 +1,132 @@
+"""Tests for megaton.transform.gsc (shared clean + aggregate stage)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from megaton.services.gsc_service import GSCService
+from megaton.start import SearchResult
+from megaton.transform import gsc
+
+
+class TestCleanPage:
+    def test_matches_scalar_cleaner(self):
+        values = [
+            "https://example.com/%E3%81%82?x=1",
+            "https://EXAMPLE.com/Page#frag",
+            "https://example.com/%E3%81%82?x=1",
+            " https://example.com/a?b#c ",
+            np.nan,
+            None,
+        ]
+        series = pd.Series(values, index=[10, 11, 12, 13, 14, 15], name="page", dtype=object)
+
+        result = gsc.clean_page(series)
+
+        assert result.tolist() == [GSCService._clean_page(v) for v in values]
+        assert result.index.tolist() == [10, 11, 12, 13, 14, 15]
+        assert result.name == "page"
+
+    def test_runs_once_per_unique_value(self, monkeypatch):
+        calls = []
+        original = gsc.clean_page_value
+
+        def counting(value):
+            calls.append(value)
+            return original(value)
+
+        monkeypatch.setattr(gsc, "clean_page_value", counting)
+        gsc.clean_page(pd.Series(["https://a/X?1", "https://a/X?1", "https://a/Y"] * 100))
+
+        assert len([c for c in calls if isinstance(c, str)]) == 2
+
+    def test_all_missing(self):
+        result = gsc.clean_page(pd.Series([None, None], dtype=object))
+
+        assert result.tolist() == ["none", "none"]
+
+
+class TestAggregate:
+    def test_weighted_position_and_ctr(self):
+        df = pd.DataFrame({
+            "page": ["a", "a", "b"],
+            "clicks": [1, 2, 3],
+            "impressions": [10, 30, 0],
+            "ctr": [0.1, 0.06, 0.0],
+            "position": [2.0, 4.0, 1.0],
+        })
+
+        result = gsc.aggregate(df, ["page"])
+
+        assert result.columns.tolist() == ["page", "clicks", "impressions", "position", "ctr"]
+        row_a = result.iloc[0]
+        assert row_a["clicks"] == 3
+        assert row_a["position"] == pytest.approx((2 * 10 + 4 * 30) / 40)
+        assert row_a["ctr"] == pytest.approx(3 / 40)
+        assert result.iloc[1]["ctr"] == 0
+
+    def test_search_result_and_service_share_the_stage(self):
+        df = pd.DataFrame({
+            "page": ["a", "a"],
+            "clicks": [1, 2],
+            "impressions": [10, 30],
+            "position": [2.0, 4.0],
+        })
+
+        via_result = SearchResult(df, None, ["page"])._aggregate_gsc(df, ["page"])
+        via_service = GSCService._aggregate(df, ["page"])
+
+        pd.testing.assert_frame_equal(via_result, via_service)
+
+    def test_does_not_mutate_input(self):
+        df = pd.DataFrame({"page": ["a", "a"], "clicks": [1, 2], "impressions": [1, 1], "position": [1.0, 2.0]})
+        before = df.copy()
+
+        gsc.aggregate(df, ["page"])
+
+        pd.testing.assert_frame_equal(df, before)
+
+
+class TestStreamingAggregate:
+    def test_matches_single_aggregate(self):
+        df = pd.DataFrame(
+            {
+                "page": ["a", "b", "a", "a"],
+                "clicks": [1, 2, 3, 4],
+                "impressions": [10, 20, 30, 40],
+                "position": [1.0, 2.0, 3.0, 4.0],
+            }
+        )
+        agg = gsc.StreamingAggregate(["page"])
+        agg.add(df.iloc[:1])
+        agg.add(df.iloc[1:3])
+        agg.add(df.iloc[3:])
+
+        pd.testing.assert_frame_equal(agg.result(), gsc.aggregate(df, ["page"]))
+
+    def test_many_pages_fold_in_batches(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(
+            {
+                "page": rng.integers(0, 40, 600).astype(str),
+                "month": rng.choice(["202401", "202402"], 600),
+                "clicks": rng.integers(0, 5, 600),
+                "impressions": rng.integers(1, 50, 600),
+                "position": rng.random(600) * 10,
+            }
+        )
+        agg = gsc.StreamingAggregate(["page", "month"], fold_rows=30)
+        folds = 0
+        for start in range(0, len(df), 20):
+            before = agg._sums
+            agg.add(df.iloc[start:start + 20])
+            folds += agg._sums is not before
+        # 一定行数たまるまでは表に足し込まない（ページ数に比例して再集計しない）
+        assert 0 < folds < 30
+
+        expected = gsc.aggregate(df, ["page", "month"])
+        result = agg.result()
+        pd.testing.assert_frame_equal(result.drop(columns="position"), expected.drop(columns="position"))
+        np.testing.assert_allclose(result["position"], expected["position"], atol=1e-6)
+
+    def test_empty_result(self):
+        assert gsc.StreamingAggregate(["page"]).result().empty
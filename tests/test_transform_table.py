@@ -1,3 +1,4 @@
+import pytest
 import pandas as pd
 
 from megaton.transform import table
@@ -45,3 +46,76 @@ def test_weighted_avg_calculates_weighted_value():
     result = result.sort_values("g").reset_index(drop=True)
     assert result.loc[0, "val"] == 17.5
     assert result.loc[1, "val"] == 100.0
+
+
+def test_normalize_key_cols_copy_false_updates_frame_in_place():
+    df = pd.DataFrame({"k": [1, 2, 1], "s": [" A.0", "b ", " A.0"]})
+    result = table.normalize_key_cols(df, ["k", "s"], lower=True, copy=False)
+    assert result is df
+    assert df["k"].tolist() == ["1", "2", "1"]
+    assert df["s"].tolist() == ["a", "b", "a"]
+
+    original = pd.DataFrame({"k": [1.0, 2.0]})
+    copied = table.normalize_key_cols(original, ["k"])
+    assert copied["k"].tolist() == ["1", "2"]
+    assert original["k"].tolist() == [1.0, 2.0]
+
+
+def test_dedup_by_key_matches_sort_then_drop_duplicates():
+    df = pd.DataFrame(
+        {
+            "k": ["b", "a", "b", None, "a", None, "c"],
+            "score": [1.0, float("nan"), 3.0, 2.0, float("nan"), 2.0, float("nan")],
+            "val": range(7),
+        },
+        index=[10, 11, 12, 13, 14, 15, 16],
+    )
+    for ascending in (False, True):
+        expected = df.sort_values(["k", "score"], ascending=[True, ascending]).drop_duplicates(subset=["k"])
+        result = table.dedup_by_key(df, ["k"], prefer_by="score", prefer_ascending=ascending)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+def test_dedup_by_key_copy_false_returns_frame_when_nothing_dropped():
+    unique = pd.DataFrame({"k": ["a", "b", "c"], "score": [3, 1, 2]})
+    assert table.dedup_by_key(unique, ["k"], copy=False) is unique
+    assert table.dedup_by_key(unique, ["k"], prefer_by="score", copy=False) is unique
+    assert table.dedup_by_key(unique, ["k"], prefer_by=["score"], keep="last", copy=False) is unique
+    assert table.dedup_by_key(unique, ["k"]) is not unique
+
+    # 行が減る・並びが変わる場合は copy=True と同じ新しい DataFrame
+    df = pd.DataFrame({"k": ["b", "a", "b"], "score": [1, 5, 3]})
+    for prefer_by in (None, "score", ["score"]):
+        result = table.dedup_by_key(df, ["k"], prefer_by=prefer_by, copy=False)
+        assert result is not df
+        pd.testing.assert_frame_equal(result, table.dedup_by_key(df, ["k"], prefer_by=prefer_by))
+    assert df["k"].tolist() == ["b", "a", "b"]
+
+
+def test_group_sum_with_weighted_average():
+    df = pd.DataFrame({"g": ["a", "a", "b", "c"], "val": [10, 20, 100, 5], "w": [1, 3, 2, 0], "x": [1, 2, 3, 4]})
+    result = table.group_sum(df, ["g"], ["x", "w"], weighted={"avg": ("val", "w")})
+    assert list(result.columns) == ["g", "x", "w", "avg"]
+    assert result["x"].tolist() == [3, 3, 4]
+    assert result["avg"].tolist()[:2] == [17.5, 100.0]
+    assert pd.isna(result["avg"].iloc[2])
+    pd.testing.assert_frame_equal(
+        result[["g", "avg"]].rename(columns={"avg": "val"}),
+        table.weighted_avg(df, ["g"], "val", "w"),
+    )
+
+
+def test_upsert_frames_replaces_rows_with_stripped_keys():
+    existing = pd.DataFrame({"d": [" 1", "2", "3", None], "s": ["a", "b ", "c", "x"], "v": [1, 2, 3, 4]})
+    new = pd.DataFrame({"d": ["2", "1 ", None], "s": ["b", "a", "x"], "v": [20, 10, 40]})
+    combined, removed = table.upsert_frames(existing, new, ["d", "s"])
+    assert removed == 3
+    # 欠損キーは astype(str) の結果どうしで一致する（pandas 3 は NaN、2.x は "None"）
+    expected_d = pd.Series(["3", "2", "1", None], name="d").astype(str)
+    pd.testing.assert_series_equal(combined["d"], expected_d)
+    assert combined["v"].tolist() == [3, 20, 10, 40]
+    # 入力は変更しない
+    assert existing["d"].tolist()[:3] == [" 1", "2", "3"]
+
+    with pytest.raises(KeyError):
+        table.upsert_frames(existing, new.drop(columns=["s"]), ["d", "s"])
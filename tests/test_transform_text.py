@@ -1,4 +1,7 @@
+from functools import partial
+
 import pandas as pd
+import pytest
 
 from megaton.transform import text
 
@@ -55,6 +58,29 @@ def test_force_text_if_numeric_prefixes_digits():
     assert result.tolist() == ["'123", "abc", "'123"]
 
 
+@pytest.mark.parametrize("mode, repl", [("remove_all", ""), ("collapse", " ")])
+def test_normalize_whitespace_matches_regex_on_unicode_spaces(mode, repl):
+    import re
+
+    values = ["矯正　歯科", " a\x1c\x1fb\u00a0c\u200b ", "x\r\n\vy", None, 3, "矯正　歯科"]
+    result = text.normalize_whitespace(pd.Series(values, dtype=object), mode=mode)
+
+    def reference(value):
+        if not isinstance(value, str):
+            return value
+        out = re.sub(r"\s+", repl, value)
+        return out.strip() if mode == "collapse" else out
+
+    assert result.tolist() == [reference(value) for value in values]
+
+
+def test_force_text_if_numeric_unicode_digits_and_int_column():
+    assert text.force_text_if_numeric(pd.Series(["１２３", "٣", "12a", "", None])).tolist()[:4] == [
+        "'１２３", "'٣", "12a", "",
+    ]
+    assert text.force_text_if_numeric(pd.Series([7, -7, 7])).tolist() == ["'7", -7, "'7"]
+
+
 def test_infer_site_from_url_domain_match():
     sites = [
         {"clinic": "札幌", "domain": "sapporo.example.com"},
@@ -116,3 +142,209 @@ def test_infer_site_from_url_duplicate_domains():
     ]
     # 最初に見つかった「札幌」が返される（安定順序）
     assert text.infer_site_from_url("https://example.com/page", sites, site_key="clinic") == "札幌"
+
+
+def test_site_index_infer_sites_matches_scalar():
+    sites = [
+        {"clinic": "札幌", "domain": "example.com", "dentamap_id": "7"},
+        {"clinic": "東京", "url": "https://tokyo.example.com/"},
+        {"clinic": "大阪", "domain": "osaka.example.com", "dentamap_id": "7"},  # 重複IDは先勝ち
+        {"clinic": "", "domain": "ignored.example.com"},
+    ]
+    urls = pd.Series(
+        [
+            "https://tokyo.example.com/a",
+            "https://www.example.com/",
+            "https://badexample.com/",  # 末尾一致（ドットの境界は見ない）
+            "https://osaka.example.com/?id=7",
+            "https://unknown.net/?id=8&id=7",
+            "https://ignored.example.com/",
+            "https://tokyo.example.com/a",
+            None,
+            "",
+        ],
+        index=list("abcdefghi"),
+    )
+    index = text.SiteIndex(sites, site_key="clinic", id_key="dentamap_id")
+
+    result = index.infer_sites(urls)
+
+    assert result.index.tolist() == list("abcdefghi")
+    assert result.tolist() == ["東京", "札幌", "札幌", "札幌", "札幌", "札幌", "東京", "不明", "不明"]
+    assert result.tolist() == [
+        text.infer_site_from_url(url, sites, site_key="clinic", id_key="dentamap_id") for url in urls
+    ]
+
+
+def _loop_first_match(mapping, value, flags=0):
+    import re
+
+    for index, pattern in enumerate(mapping):
+        try:
+            if re.search(pattern, value, flags):
+                return index
+        except re.error:
+            continue
+    return -1
+
+
+def test_regex_mapper_first_pattern_wins_not_leftmost_match():
+    mapper = text.RegexMapper({"b": "B", "a": "A"})
+    assert mapper.lookup("ab") == "B"
+    assert mapper.lookup("a") == "A"
+    assert mapper.lookup("zzz", "none") == "none"
+
+
+def test_regex_mapper_matches_search_loop():
+    mapping = {
+        r"^/blog/": "blog",
+        r"(foo|bar)+\d": "foobar",
+        r"[": "invalid",
+        r"x$": "ends-x",
+        r"(?i:CaSe)": "case",
+        r"\bword\b": "word",
+        r"": "any",
+    }
+    mapper = text.RegexMapper(mapping)
+    values = ["/blog/x", "a bar1", "box", "CASE", "a word here", "", "line\nx", "/Blog/"]
+
+    assert mapper._compiled.combined is not None
+    assert mapper.invalid == ["["]
+    for value in values:
+        assert mapper.search(value) == _loop_first_match(mapping, value), value
+
+
+def test_regex_mapper_falls_back_for_standalone_constructs():
+    mapping = {r"(a)\1": "double-a", r"(?i)abc": "abc", r"z": "z"}
+    mapper = text.RegexMapper(mapping)
+
+    assert mapper._compiled.combined is None
+    for value in ["xaax", "ABC", "z", "a"]:
+        assert mapper.search(value) == _loop_first_match(mapping, value), value
+
+
+def test_regex_mapper_honours_flags_and_caches_compilation():
+    import re
+
+    mapping = {r"^b": "B"}
+    assert text.RegexMapper(mapping, re.MULTILINE).lookup("a\nb") == "B"
+    assert text.RegexMapper(mapping).lookup("a\nb") is None
+    assert text.RegexMapper(dict(mapping))._compiled is text.RegexMapper(mapping)._compiled
+
+
+def test_map_by_regex_keeps_unmatched_value_without_default():
+    series = pd.Series([" Foo ", "other", None])
+    result = text.map_by_regex(series, {r"^foo$": "X", r"[": "bad"})
+    assert result.tolist()[:2] == ["X", "other"]
+    assert pd.isna(result.iloc[2])
+
+
+def test_apply_unique_calls_once_per_value_and_matches_apply():
+    import numpy as np
+
+    calls = []
+
+    def upper(value):
+        calls.append(value)
+        return value.upper() if isinstance(value, str) else value
+
+    series = pd.Series(["a", "b", "a", None, "b", np.nan, "a"], index=list("abcdefg"), name="col", dtype=object)
+    result = text.apply_unique(series, upper)
+
+    assert sorted(v for v in calls if isinstance(v, str)) == ["a", "b"]
+    pd.testing.assert_series_equal(result, series.apply(upper))
+
+
+def test_apply_unique_falls_back_for_mixed_types():
+    """1 / 1.0 / True は object のハッシュで同一視されるため apply にフォールバック"""
+    series = pd.Series([1, 1.0, True, "1"], dtype=object)
+    result = text.apply_unique(series, lambda value: type(value).__name__)
+    assert result.tolist() == ["int", "float", "bool", "str"]
+
+
+def test_unique_helpers_keep_nul_strings_distinct():
+    """pandas のハッシュは NUL で文字列を打ち切るため、NUL を含む列は 1 行ずつ処理する"""
+    from megaton.transform import table
+
+    series = pd.Series(["a\x00b", "a\x00c", "", "\x00", "a\x00b", None], dtype=object)
+    pd.testing.assert_series_equal(text.apply_unique(series, repr), series.apply(repr))
+
+    urls = pd.Series(["https://x.com/a\x00b?q=1", "https://x.com/a\x00c?q=1", "https://x.com/a\x00b?q=1"])
+    expected = urls.apply(partial(text._url_value, strip=True, unquote=True, drop_query=True, drop_hash=True, lower=True))
+    pd.testing.assert_series_equal(text.clean_url(urls), expected)
+    assert text.clean_url(urls).tolist()[:2] == ["https://x.com/a\x00b", "https://x.com/a\x00c"]
+
+    keys = table.normalize_key_cols(pd.DataFrame({"k": [" a\x00b", "a\x00c ", "\x00"]}), ["k"])
+    assert keys["k"].tolist() == ["a\x00b", "a\x00c", "\x00"]
+
+
+def test_clean_url_matches_rowwise_on_repeated_values():
+    series = pd.Series(["https://A.com/%7Ex?q=1#f", None, "https://A.com/%7Ex?q=1#f", " ", "https://b.com/"] * 3)
+    expected = series.apply(partial(text._url_value, strip=True, unquote=True, drop_query=True, drop_hash=True, lower=True))
+    pd.testing.assert_series_equal(text.clean_url(series), expected)
+
+
+URL_EDGE_CASES = [
+    "https://example.com/%E3%83%86/p1?utm_source=x&id=1#s",
+    "https://example.com/%E3%83%86/p1?utm_source=x&id=1#s",
+    "/Path/%E3%81%82?ref=x&ref=y#frag",
+    "https://example.com/?#",
+    "https://example.com?a=1",
+    "https://example.com/a%2Fb%zz%E3/%83",
+    "HTTPS://Example.com/Upper?x=1",
+    "http:relative/path?x=1",
+    "//cdn.example.com/a?b=1#c",
+    "https://user:pw@example.com:8080/p;v=1?q=a b#f",
+    "https://[::1]:80/p?x#y",
+    "https://テスト.jp/%E3%83%86?x=1",
+    "  https://example.com/pad?x=1  ",
+    "https://example.com/tab\tnew\nline?x=1",
+    "\x00https://example.com/ctrl?x=1",
+    "mailto:someone@example.com?subject=hi",
+    "no scheme?x=1#y",
+    "",
+    None,
+    float("nan"),
+]
+
+
+def _reference_url_value(value, kind, keep=None):
+    """URL 系メソッドの従来実装（urllib で 1 行ずつ処理）"""
+    from urllib.parse import parse_qs, unquote, urlencode, urlparse, urlsplit, urlunparse, urlunsplit
+
+    if kind == "clean_url":
+        if not isinstance(value, str) or not value.strip():
+            return value.strip() if isinstance(value, str) else value
+        parsed = urlsplit(value.strip())
+        return urlunsplit(parsed._replace(path=unquote(parsed.path), query="", fragment="")).lower()
+    if pd.isna(value):
+        return value
+    if kind == "decode":
+        return unquote(str(value))
+    parsed = urlparse(str(value))
+    if kind == "remove_fragment":
+        return urlunparse(parsed._replace(fragment=""))
+    if keep:
+        params = {k: v for k, v in parse_qs(parsed.query).items() if k in keep}
+        return urlunparse(parsed._replace(query=urlencode(params, doseq=True)))
+    return urlunparse(parsed._replace(query=""))
+
+
+@pytest.mark.parametrize(
+    "kind, options",
+    [
+        ("clean_url", dict(strip=True, unquote=True, drop_query=True, drop_hash=True, lower=True)),
+        ("decode", dict(decode=True, coerce=True)),
+        ("remove_fragment", dict(drop_hash=True, coerce=True, params=True)),
+        ("remove_params", dict(drop_query=True, coerce=True, params=True)),
+        ("remove_params_keep", dict(drop_query=True, keep=["ref", "x"], coerce=True, params=True)),
+    ],
+)
+def test_normalize_url_matches_urllib_reference(kind, options):
+    """ベクトル化カーネルは urllib による 1 行ずつの処理と同一の結果になる"""
+    series = pd.Series(URL_EDGE_CASES * 2)
+    reference = partial(_reference_url_value, kind=kind.replace("_keep", ""), keep=options.get("keep"))
+
+    result = text.normalize_url(series, **options)
+
+    pd.testing.assert_series_equal(result, series.apply(reference))
@@ -1,12 +1,19 @@
 """Tests for megaton.transform.traffic (promoted from megaton_lib/traffic.py)."""
+import warnings
+
 import pandas as pd
+import pytest
 
 from megaton.transform import (
+    SourceNormalizer,
     apply_source_normalization,
     ensure_trailing_slash,
     is_non_public_dev_source,
+    non_public_dev_sources,
     normalize_domain,
+    normalize_domains,
     source_host,
+    source_hosts,
 )
 
 
@@ -73,3 +80,33 @@ class TestApplySourceNormalization:
         df = pd.DataFrame({"source": ["GOOGLE.com"]})
         apply_source_normalization(df, {r"google": "google"})
         assert df["source"].tolist() == ["GOOGLE.com"]
+
+    def test_invalid_pattern_warned_once_and_skipped(self):
+        df = pd.DataFrame({"source": ["a.com", "b.com", "c.com", "fb.com"]})
+        with pytest.warns(UserWarning, match=r"invalid regex pattern in source_map: \(bad") as record:
+            normalizer = SourceNormalizer({r"(bad": "x", r"fb": "facebook"})
+        assert len(record) == 1
+        assert record[0].filename == __file__
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            out = apply_source_normalization(df, normalizer)
+        assert out["source"].tolist() == ["a.com", "b.com", "c.com", "facebook"]
+
+    def test_invalid_pattern_warning_points_at_caller(self):
+        df = pd.DataFrame({"source": ["a.com"]})
+        with pytest.warns(UserWarning, match="invalid regex pattern") as record:
+            apply_source_normalization(df, {r"(bad": "x"})
+        assert len(record) == 1
+        assert record[0].filename == __file__
+
+
+class TestSeriesHelpers:
+    def test_match_scalar_functions(self):
+        values = pd.Series(["https://www.Example.com/a", "user@example.com:8080", "[::1]:443",
+                            "10.0.0.5", "(not set)", None, "https://www.Example.com/a"], index=list("abcdefg"))
+        assert source_hosts(values).tolist() == [source_host(v) for v in values]
+        assert non_public_dev_sources(values).tolist() == [is_non_public_dev_source(v) for v in values]
+        domains = values.fillna("")
+        assert normalize_domains(domains).tolist() == [normalize_domain(v) for v in domains]
+        assert source_hosts(values).index.tolist() == list("abcdefg")